@@ -0,0 +1,16 @@
+# benchmarks/__init__.py
+"""
+Suite de benchmarks offline de py_toolbox. Se ejecuta desde la raíz del repositorio con:
+
+    python -m benchmarks.run --sizes small,medium
+
+S3, Athena, Textract y Secrets Manager se simulan con moto; Tika con un servidor HTTP local y Drive
+con un servicio en memoria, así que no se necesita red ni credenciales.
+"""
+import sys
+from pathlib import Path
+
+# Permite ejecutar la suite sin instalar el paquete (pip install -e .).
+_SRC = Path(__file__).resolve().parent.parent / "src"
+if _SRC.is_dir() and str(_SRC) not in sys.path:
+    sys.path.insert(0, str(_SRC))
@@ -0,0 +1,257 @@
+# benchmarks/cases.py
+"""
+Casos de benchmark. Cada caso se registra con @case y es una función `(size, env) -> Workload`: la
+preparación (datos sintéticos, objetos en moto, archivos de entrada) ocurre al llamarla y solo
+`Workload.run` se mide. `run` debe poder ejecutarse varias veces seguidas con el mismo resultado.
+"""
+import itertools
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from py_toolbox.aws.athena import Athena
+from py_toolbox.aws.clients import get_client
+from py_toolbox.aws.s3 import S3
+from py_toolbox.aws.secrets_manager import SecretsManager
+from py_toolbox.aws.textract_processor import TextractProcessor
+from py_toolbox.processing.html_parser import HtmlParser
+from py_toolbox.processing.tika_parser import TikaParser
+from py_toolbox.utils.file_handler import FileHandler
+
+from . import fixtures
+from .fakes import DriveTree, StubDrive, serve_pages
+
+REGION = "us-east-1"
+BUCKET = "py-toolbox-benchmarks"
+
+
+@dataclass
+class Workload:
+    """Trabajo a medir: `run` hace el trabajo; `units` y `nbytes` son el volumen procesado por ejecución."""
+    run: Callable[[], object]
+    units: int
+    nbytes: int = 0
+    cleanup: Callable[[], None] | None = None
+
+
+@dataclass
+class Case:
+    name: str
+    sizes: dict  # 'small' / 'medium' / 'large' -> parámetro de tamaño
+    unit: str
+    build: Callable
+
+
+CASES = {}
+
+
+def case(name: str, sizes: dict, unit: str):
+    """Registra una función como caso de benchmark con sus tamaños de datos."""
+    def decorator(build):
+        CASES[name] = Case(name, sizes, unit, build)
+        return build
+    return decorator
+
+
+@dataclass
+class Environment:
+    """Recursos compartidos por los casos: directorio temporal y URL del servidor Tika de pruebas."""
+    work_dir: Path
+    tika_url: str
+
+    def new_dir(self, prefix: str) -> Path:
+        return Path(tempfile.mkdtemp(prefix=prefix, dir=self.work_dir))
+
+
+def _ensure_bucket():
+    s3_client = get_client("s3", REGION)
+    existing = {bucket["Name"] for bucket in s3_client.list_buckets().get("Buckets", [])}
+    if BUCKET not in existing:
+        s3_client.create_bucket(Bucket=BUCKET)
+
+
+@case("file_handler.write_json", sizes={"small": 10_000, "medium": 100_000, "large": 500_000}, unit="registros")
+def bench_write_json(size: int, env: Environment) -> Workload:
+    records = fixtures.make_json_records(size)
+    path = env.new_dir("write_json") / "registros.json"
+
+    def run():
+        FileHandler.write_json(path, records, pretty=False)
+
+    run()
+    return Workload(run, size, path.stat().st_size)
+
+
+@case("file_handler.write_json[orjson]", sizes={"small": 10_000, "medium": 100_000, "large": 500_000}, unit="registros")
+def bench_write_json_orjson(size: int, env: Environment) -> Workload:
+    records = fixtures.make_json_records(size)
+    path = env.new_dir("write_json_orjson") / "registros.json"
+
+    def run():
+        FileHandler.write_json(path, records, pretty=False, use_orjson=True)
+
+    run()
+    return Workload(run, size, path.stat().st_size)
+
+
+@case("s3.upload_dataframe_as_parquet", sizes={"small": 50_000, "medium": 500_000, "large": 2_000_000}, unit="filas")
+def bench_upload_parquet(size: int, env: Environment) -> Workload:
+    _ensure_bucket()
+    df = fixtures.make_dataframe(size)
+    s3 = S3(REGION)
+    key = f"parquet/df_{size}.parquet"
+
+    def run():
+        if not s3.upload_dataframe_as_parquet(df, BUCKET, key):
+            raise RuntimeError("upload_dataframe_as_parquet devolvió False.")
+
+    run()
+    nbytes = get_client("s3", REGION).head_object(Bucket=BUCKET, Key=key)["ContentLength"]
+    return Workload(run, size, nbytes)
+
+
+@case("athena._get_query_results_dataframe", sizes={"small": 10_000, "medium": 100_000, "large": 500_000}, unit="filas")
+def bench_athena_results(size: int, env: Environment) -> Workload:
+    athena = Athena("benchmarks", f"s3://{BUCKET}/athena/", region_name=REGION)
+    pages = fixtures.make_athena_pages(size)
+
+    def run():
+        # moto devuelve GetQueryResults en una sola respuesta; las páginas se sirven en el evento before-call.
+        with serve_pages(athena.athena_client, "GetQueryResults", pages):
+            df = athena._get_query_results_dataframe("00000000-0000-0000-0000-000000000000")
+        if len(df) != size:
+            raise RuntimeError(f"Se esperaban {size} filas y se obtuvieron {len(df)}.")
+
+    return Workload(run, size)
+
+
+@case("textract.get_full_results", sizes={"small": 10, "medium": 100, "large": 400}, unit="bloques")
+def bench_textract_results(size: int, env: Environment) -> Workload:
+    processor = TextractProcessor(REGION)
+    blocks = fixtures.make_textract_blocks(size)
+    pages = fixtures.paginate_blocks(blocks)
+
+    def run():
+        with serve_pages(processor.textract_client, "GetDocumentAnalysis", pages):
+            results = processor.get_full_results("0" * 64)
+        if len(results) != len(blocks):
+            raise RuntimeError(f"Se esperaban {len(blocks)} bloques y se obtuvieron {len(results)}.")
+
+    return Workload(run, len(blocks))
+
+
+@case("secrets_manager.get_secrets", sizes={"small": 20, "medium": 100, "large": 400}, unit="secretos")
+def bench_get_secrets(size: int, env: Environment) -> Workload:
+    client = get_client("secretsmanager", REGION)
+    names = [f"benchmarks/secreto_{i:04d}" for i in range(size)]
+    existing = set()
+    for page in client.get_paginator("list_secrets").paginate():
+        existing.update(secret["Name"] for secret in page["SecretList"])
+    for name in names:
+        if name not in existing:
+            client.create_secret(Name=name, SecretString=f'{{"usuario": "u{name[-4:]}", "clave": "c{name[-4:]}"}}')
+
+    def run():
+        # Sin caché, para medir las llamadas a Secrets Manager y no los aciertos en memoria.
+        secrets = SecretsManager(REGION, cache_ttl_seconds=None).get_secrets(names)
+        if len(secrets) != size:
+            raise RuntimeError(f"Se esperaban {size} secretos y se obtuvieron {len(secrets)}.")
+
+    return Workload(run, size)
+
+
+@case("html_parser.get_soup", sizes={"small": 50, "medium": 500, "large": 2000}, unit="tablas")
+def bench_get_soup(size: int, env: Environment) -> Workload:
+    path = env.new_dir("get_soup") / "documento.html"
+    path.write_bytes(fixtures.make_html(size))
+
+    def run():
+        if HtmlParser.get_soup(path) is None:
+            raise RuntimeError("get_soup devolvió None.")
+
+    return Workload(run, size, path.stat().st_size)
+
+
+@case("html_parser.get_soup[auto,only=table]", sizes={"small": 50, "medium": 500, "large": 2000}, unit="tablas")
+def bench_get_soup_tables(size: int, env: Environment) -> Workload:
+    path = env.new_dir("get_soup_tables") / "documento.html"
+    path.write_bytes(fixtures.make_html(size))
+
+    def run():
+        soup = HtmlParser.get_soup(path, parser="auto", only="table")
+        if soup is None or len(soup.find_all("table")) != size:
+            raise RuntimeError("get_soup no devolvió todas las tablas.")
+
+    return Workload(run, size, path.stat().st_size)
+
+
+@case("html_parser.extract_tables", sizes={"small": 50, "medium": 500, "large": 2000}, unit="tablas")
+def bench_extract_tables(size: int, env: Environment) -> Workload:
+    path = env.new_dir("extract_tables") / "documento.html"
+    path.write_bytes(fixtures.make_html(size))
+
+    def run():
+        tables = HtmlParser.extract_tables(path)
+        if tables is None or len(tables) != size:
+            raise RuntimeError("extract_tables no devolvió todas las tablas.")
+
+    return Workload(run, size, path.stat().st_size)
+
+
+def _write_pdfs(env: Environment, prefix: str, count: int, pdf_size: int) -> list[str]:
+    pdf_dir = env.new_dir(prefix)
+    paths = []
+    for i in range(count):
+        path = pdf_dir / f"documento_{i:04d}.pdf"
+        path.write_bytes(fixtures.make_pdf_bytes(pdf_size, seed=i))
+        paths.append(str(path))
+    return paths
+
+
+@case("tika_parser.pdf_to_html", sizes={"small": 10, "medium": 50, "large": 200}, unit="PDFs")
+def bench_pdf_to_html(size: int, env: Environment) -> Workload:
+    pdf_size = 256 * 1024
+    pdf_paths = _write_pdfs(env, "pdf_to_html", size, pdf_size)
+    output_dir = str(env.new_dir("pdf_to_html_out"))
+
+    def run():
+        for pdf_path in pdf_paths:
+            if TikaParser.pdf_to_html(pdf_path, output_dir) is None:
+                raise RuntimeError(f"No se pudo convertir {pdf_path}.")
+
+    return Workload(run, size, size * pdf_size)
+
+
+@case("tika_parser.convert_many", sizes={"small": 10, "medium": 50, "large": 200}, unit="PDFs")
+def bench_convert_many(size: int, env: Environment) -> Workload:
+    pdf_size = 256 * 1024
+    pdf_paths = _write_pdfs(env, "convert_many", size, pdf_size)
+    output_dir = str(env.new_dir("convert_many_out"))
+    parser = TikaParser(env.tika_url)
+
+    def run():
+        results = parser.convert_many(pdf_paths, output_dir, workers=4)
+        if any(html_path is None for html_path in results.values()):
+            raise RuntimeError("convert_many no convirtió todos los PDFs.")
+
+    return Workload(run, size, size * pdf_size)
+
+
+@case("drive.download_many", sizes={"small": 20, "medium": 100, "large": 400}, unit="archivos")
+def bench_drive_download(size: int, env: Environment) -> Workload:
+    file_size = 512 * 1024
+    # Dos niveles de 4 subcarpetas: la raíz y cada subcarpeta reparten los archivos a partes iguales.
+    tree = DriveTree(depth=2, fanout=4, files_per_folder=max(1, size // 5), file_size=file_size)
+    drive = StubDrive(tree)
+    dest_root = env.new_dir("drive")
+    run_ids = itertools.count()
+
+    def run():
+        # Un directorio nuevo por ejecución: el manifiesto haría que las siguientes se saltaran todo.
+        summary = drive.download_many("root", str(dest_root / f"run_{next(run_ids)}"), workers=8, chunk_size=256 * 1024)
+        if summary["failed"]:
+            raise RuntimeError(f"Fallaron {len(summary['failed'])} descargas de Drive.")
+
+    return Workload(run, len(tree.content), tree.total_bytes, cleanup=lambda: shutil.rmtree(dest_root, ignore_errors=True))
@@ -0,0 +1,262 @@
+# benchmarks/fakes.py
+"""
+Sustitutos locales de los servicios remotos que moto no cubre (o no cubre con paginación):
+un servidor HTTP que imita a Apache Tika, un servicio de Google Drive en memoria y un servidor de
+páginas para operaciones de boto3 que moto devuelve en una única respuesta.
+"""
+import contextlib
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from googleapiclient.errors import HttpError
+
+from py_toolbox.google.drive import FOLDER_MIME_TYPE, Drive
+
+
+class _TikaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Bytes de HTML devueltos por cada byte de PDF recibido (Tika suele producir algo más que el PDF).
+    expansion = 2
+    chunk_size = 64 * 1024
+
+    def do_GET(self):
+        body = b"Apache Tika 2.9.2 (benchmark)\n"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        digest = hashlib.sha256()
+        remaining = length
+        while remaining:
+            data = self.rfile.read(min(remaining, self.chunk_size))
+            if not data:
+                break
+            digest.update(data)
+            remaining -= len(data)
+        self.server.requests += 1
+        row = f"<tr><td>{digest.hexdigest()}</td><td>celda</td></tr>".encode()
+        n_rows = max(1, length * self.expansion // len(row))
+        head = b"<html><body><table>"
+        tail = b"</table></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(head) + n_rows * len(row) + len(tail)))
+        self.end_headers()
+        self.wfile.write(head)
+        rows_per_chunk = max(1, self.chunk_size // len(row))
+        for start in range(0, n_rows, rows_per_chunk):
+            self.wfile.write(row * min(rows_per_chunk, n_rows - start))
+        self.wfile.write(tail)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTikaServer:
+    """
+    Servidor HTTP local que responde como el endpoint /tika (PUT de un PDF -> HTML) y /version.
+    Se usa como gestor de contexto; `url` es la URL del endpoint /tika.
+    """
+    def __init__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _TikaHandler)
+        self._server.daemon_threads = True
+        self._server.requests = 0
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-tika", daemon=True)
+        self.url = f"http://127.0.0.1:{self._server.server_port}/tika"
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+
+class _HttpResponse:
+    """Respuesta HTTP mínima que botocore acepta cuando un handler de before-call responde por él."""
+    status_code = 200
+
+    def __init__(self, content_length: int):
+        self.headers = {"content-length": str(content_length)}
+
+
+@contextlib.contextmanager
+def serve_pages(client, operation_name: str, pages: list[dict]):
+    """
+    Responde a las llamadas `operation_name` del cliente con `pages`, encadenadas por NextToken, sin
+    hacer peticiones HTTP. El cliente, el paginador y los hooks de instrumentación de boto3 funcionan
+    igual que contra el servicio real; solo se omite el transporte.
+    """
+    sizes = [len(json.dumps(page)) for page in pages]
+
+    def respond(model, params, **kwargs):
+        if model.name != operation_name:
+            return None
+        body = params.get("body") or b"{}"
+        token = json.loads(body).get("NextToken")
+        index = int(token) if token else 0
+        page = dict(pages[index])
+        if index + 1 < len(pages):
+            page["NextToken"] = str(index + 1)
+        page["ResponseMetadata"] = {"HTTPStatusCode": 200, "RetryAttempts": 0}
+        return _HttpResponse(sizes[index]), page
+
+    # Se registra al final del evento genérico: botocore detiene before-call en la primera respuesta, y
+    # los handlers de eventos más específicos se llaman antes que los genéricos (como el de instrumentación).
+    unique_id = f"benchmarks-serve-pages-{operation_name}"
+    client.meta.events.register_last("before-call", respond, unique_id=unique_id)
+    try:
+        yield
+    finally:
+        client.meta.events.unregister("before-call", unique_id=unique_id)
+
+
+class _Resp(dict):
+    def __init__(self, status: int):
+        super().__init__(status=str(status))
+        self.status = status
+        self.reason = "error"
+
+
+class _Request:
+    def __init__(self, handler, **kwargs):
+        self._handler = handler
+        self._kwargs = kwargs
+        self.headers = {}
+
+    def execute(self, num_retries=0):
+        return self._handler(headers=self.headers, **self._kwargs)
+
+
+class _Files:
+    def __init__(self, service):
+        self._service = service
+
+    def list(self, **kwargs):
+        return _Request(self._service.handle_list, **kwargs)
+
+    def get(self, fileId, fields=None):
+        return _Request(self._service.handle_get, fileId=fileId)
+
+    def get_media(self, fileId):
+        return _Request(self._service.handle_media, fileId=fileId)
+
+
+class _Batch:
+    def __init__(self, callback):
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request, request_id))
+
+    def execute(self):
+        for request, request_id in self._requests:
+            try:
+                self._callback(request_id, request.execute(), None)
+            except HttpError as e:
+                self._callback(request_id, None, e)
+
+
+class StubDriveService:
+    """
+    Servicio de Drive v3 en memoria con la parte de la API que usa py_toolbox: files().list (con
+    paginación), files().get, files().get_media (con cabecera Range) y new_batch_http_request.
+    """
+    def __init__(self, tree: "DriveTree"):
+        self.tree = tree
+
+    def files(self):
+        return _Files(self)
+
+    def new_batch_http_request(self, callback):
+        return _Batch(callback)
+
+    def handle_list(self, headers, q, pageSize=100, pageToken=None, **kwargs):
+        parent = q.split("' in parents")[0].rsplit("'", 1)[1]
+        children = self.tree.children.get(parent, [])
+        if "name='" in q:
+            name = q.split("name='")[1].split("'")[0]
+            return {"files": [child for child in children if child["name"] == name]}
+        start = int(pageToken or 0)
+        response = {"files": children[start:start + pageSize]}
+        if start + pageSize < len(children):
+            response["nextPageToken"] = str(start + pageSize)
+        return response
+
+    def handle_get(self, headers, fileId):
+        metadata = self.tree.files.get(fileId)
+        if metadata is None:
+            raise HttpError(_Resp(404), b"File not found")
+        return dict(metadata)
+
+    def handle_media(self, headers, fileId):
+        content = self.tree.content[fileId]
+        start, end = headers["range"].split("=")[1].split("-")
+        return content[int(start):int(end) + 1]
+
+
+class DriveTree:
+    """Árbol de carpetas de Drive sintético: `fanout` subcarpetas por nivel y `files_per_folder` PDFs en cada una."""
+    def __init__(self, depth: int, fanout: int, files_per_folder: int, file_size: int):
+        self.children = {}
+        self.files = {}
+        self.content = {}
+        self._counter = 0
+        self._build("root", depth, fanout, files_per_folder, file_size)
+
+    def _next_id(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter:06d}"
+
+    def _build(self, folder_id: str, depth: int, fanout: int, files_per_folder: int, file_size: int):
+        children = []
+        for index in range(files_per_folder):
+            file_id = self._next_id("file")
+            content = (file_id.encode() * (file_size // len(file_id) + 1))[:file_size]
+            metadata = {
+                "id": file_id, "name": f"documento_{index:04d}.pdf", "mimeType": "application/pdf",
+                "md5Checksum": hashlib.md5(content).hexdigest(), "modifiedTime": "2024-06-01T12:00:00.000Z",
+                "size": str(file_size),
+            }
+            self.files[file_id] = metadata
+            self.content[file_id] = content
+            children.append(metadata)
+        if depth > 1:
+            for index in range(fanout):
+                child_id = self._next_id("folder")
+                folder = {"id": child_id, "name": f"carpeta_{index:02d}", "mimeType": FOLDER_MIME_TYPE}
+                self.files[child_id] = folder
+                children.append(folder)
+                self._build(child_id, depth - 1, fanout, files_per_folder, file_size)
+        self.children[folder_id] = children
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(len(content) for content in self.content.values())
+
+
+class StubDrive(Drive):
+    """Drive que usa un StubDriveService en lugar de credenciales y de la API real."""
+    def __init__(self, tree: DriveTree, **kwargs):
+        self.tree = tree
+        super().__init__({}, **kwargs)
+
+    def _create_drive_service(self, credentials_dict: dict):
+        self._credentials = None
+        return self._build_service()
+
+    def _build_service(self):
+        return StubDriveService(self.tree)
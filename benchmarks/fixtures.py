@@ -0,0 +1,159 @@
+# benchmarks/fixtures.py
+"""
+Datos sintéticos y deterministas para los benchmarks: DataFrames, páginas de resultados de Athena,
+bloques de Textract, HTML al estilo de la salida de Tika, registros JSON y "PDFs" de relleno.
+"""
+import random
+
+import numpy as np
+import pandas as pd
+
+SEED = 1234
+
+
+def make_dataframe(rows: int) -> pd.DataFrame:
+    """DataFrame con columnas numéricas, de texto de baja cardinalidad y fechas."""
+    rng = np.random.default_rng(SEED)
+    return pd.DataFrame({
+        "id": np.arange(rows, dtype="int64"),
+        "amount": rng.normal(1000, 250, rows).round(2),
+        "quantity": rng.integers(0, 500, rows),
+        "category": rng.choice(["alpha", "beta", "gamma", "delta", "epsilon"], rows),
+        "created_at": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, rows), unit="s"),
+        "description": [f"registro {i % 997}" for i in range(rows)],
+    })
+
+
+ATHENA_COLUMN_INFO = [
+    {"Name": "id", "Label": "id", "Type": "bigint"},
+    {"Name": "amount", "Label": "amount", "Type": "double"},
+    {"Name": "category", "Label": "category", "Type": "varchar"},
+    {"Name": "active", "Label": "active", "Type": "boolean"},
+    {"Name": "day", "Label": "day", "Type": "date"},
+    {"Name": "created_at", "Label": "created_at", "Type": "timestamp"},
+]
+
+
+def make_athena_pages(rows: int, page_size: int = 1000) -> list[dict]:
+    """
+    Respuestas de get_query_results tal como las devuelve Athena: la primera página incluye la fila de
+    encabezados y cada página trae como máximo `page_size` filas.
+    """
+    rng = random.Random(SEED)
+    header = {"Data": [{"VarCharValue": column["Name"]} for column in ATHENA_COLUMN_INFO]}
+    all_rows = [header]
+    for i in range(rows):
+        all_rows.append({"Data": [
+            {"VarCharValue": str(i)},
+            {"VarCharValue": f"{rng.uniform(0, 10_000):.2f}"},
+            {"VarCharValue": rng.choice(("norte", "sur", "este", "oeste"))},
+            {"VarCharValue": "true" if i % 3 else "false"},
+            {"VarCharValue": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}"},
+            {"VarCharValue": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d} {i % 24:02d}:{i % 60:02d}:00.000"} if i % 50 else {},
+        ]})
+    pages = []
+    for start in range(0, len(all_rows), page_size):
+        pages.append({
+            "ResultSet": {
+                "Rows": all_rows[start:start + page_size],
+                "ResultSetMetadata": {"ColumnInfo": ATHENA_COLUMN_INFO},
+            },
+            "UpdateCount": 0,
+        })
+    return pages
+
+
+def make_textract_blocks(n_pages: int, lines_per_page: int = 40, words_per_line: int = 8,
+                         tables_per_page: int = 1, table_rows: int = 10, table_columns: int = 4) -> list[dict]:
+    """Bloques de un análisis de Textract (PAGE, LINE, WORD, TABLE, CELL) con sus relaciones CHILD."""
+    blocks = []
+    counter = 0
+
+    def new_id() -> str:
+        nonlocal counter
+        counter += 1
+        return f"b{counter:08d}"
+
+    geometry = {"BoundingBox": {"Width": 0.1, "Height": 0.02, "Left": 0.1, "Top": 0.1}}
+    for page in range(1, n_pages + 1):
+        page_block = {"BlockType": "PAGE", "Id": new_id(), "Page": page, "Geometry": geometry, "Relationships": []}
+        blocks.append(page_block)
+        page_children = []
+        for line_number in range(lines_per_page):
+            word_ids = []
+            words = []
+            for word_number in range(words_per_line):
+                word = {"BlockType": "WORD", "Id": new_id(), "Page": page, "Confidence": 99.1,
+                        "Text": f"palabra{line_number}_{word_number}", "Geometry": geometry}
+                word_ids.append(word["Id"])
+                words.append(word)
+            line = {"BlockType": "LINE", "Id": new_id(), "Page": page, "Confidence": 99.5, "Geometry": geometry,
+                    "Text": " ".join(word["Text"] for word in words), "Relationships": [{"Type": "CHILD", "Ids": word_ids}]}
+            page_children.append(line["Id"])
+            blocks.append(line)
+            blocks.extend(words)
+        for _ in range(tables_per_page):
+            cell_ids = []
+            cells = []
+            for row in range(1, table_rows + 1):
+                for column in range(1, table_columns + 1):
+                    word = {"BlockType": "WORD", "Id": new_id(), "Page": page, "Confidence": 98.0,
+                            "Text": f"c{row}x{column}", "Geometry": geometry}
+                    cell = {"BlockType": "CELL", "Id": new_id(), "Page": page, "Confidence": 97.0, "RowIndex": row,
+                            "ColumnIndex": column, "Geometry": geometry, "Relationships": [{"Type": "CHILD", "Ids": [word["Id"]]}]}
+                    cell_ids.append(cell["Id"])
+                    cells.extend((cell, word))
+            table = {"BlockType": "TABLE", "Id": new_id(), "Page": page, "Confidence": 96.0, "Geometry": geometry,
+                     "Relationships": [{"Type": "CHILD", "Ids": cell_ids}]}
+            page_children.append(table["Id"])
+            blocks.append(table)
+            blocks.extend(cells)
+        page_block["Relationships"].append({"Type": "CHILD", "Ids": page_children})
+    return blocks
+
+
+def paginate_blocks(blocks: list[dict], page_size: int = 1000) -> list[dict]:
+    """Respuestas de get_document_analysis con como máximo `page_size` bloques cada una."""
+    return [
+        {"JobStatus": "SUCCEEDED", "DocumentMetadata": {"Pages": 1}, "Blocks": blocks[start:start + page_size]}
+        for start in range(0, max(len(blocks), 1), page_size)
+    ]
+
+
+def make_html(n_tables: int, rows_per_table: int = 20, columns: int = 5, paragraphs_per_table: int = 10) -> bytes:
+    """HTML con la estructura que produce Tika: un <div class="page"> por página con párrafos y tablas."""
+    parts = ['<html xmlns="http://www.w3.org/1999/xhtml"><head><meta name="Content-Type" content="application/pdf"/>'
+             '<title>documento</title></head><body>']
+    for table in range(n_tables):
+        parts.append('<div class="page">')
+        for paragraph in range(paragraphs_per_table):
+            parts.append(f"<p>Párrafo {paragraph} de la página {table}: texto de relleno con acentos áéíóú y ñ.</p>")
+        parts.append("<table><tbody>")
+        parts.append("<tr>" + "".join(f"<th>col{column}</th>" for column in range(columns)) + "</tr>")
+        for row in range(rows_per_table):
+            parts.append("<tr>" + "".join(f"<td>{table}-{row}-{column}</td>" for column in range(columns)) + "</tr>")
+        parts.append("</tbody></table></div>")
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def make_json_records(n_records: int) -> list[dict]:
+    """Registros al estilo de una extracción: campos planos, una lista anidada y texto con caracteres no ASCII."""
+    return [
+        {
+            "id": i,
+            "document": f"doc_{i // 100:05d}.pdf",
+            "page": i % 100 + 1,
+            "text": f"Línea {i} con información extraída: importe {i * 1.5:.2f}",
+            "confidence": 0.5 + (i % 50) / 100,
+            "cells": [{"row": r, "value": f"v{i}-{r}"} for r in range(3)],
+        }
+        for i in range(n_records)
+    ]
+
+
+def make_pdf_bytes(size: int, seed: int = 0) -> bytes:
+    """Bytes con cabecera de PDF y relleno determinista; el servidor Tika de pruebas no los interpreta."""
+    rng = random.Random(SEED + seed)
+    header = b"%PDF-1.7\n"
+    return header + rng.randbytes(max(size - len(header), 0))
@@ -0,0 +1,210 @@
+# benchmarks/run.py
+"""
+Ejecuta los benchmarks y los compara con una línea base guardada.
+
+Por cada caso y tamaño se hace una ejecución de calentamiento y `--repeats` ejecuciones medidas (se
+reporta la mediana), una ejecución con la instrumentación activa para contar las llamadas remotas y
+otra con tracemalloc para el pico de memoria. tracemalloc solo ve la memoria reservada desde Python
+(incluidos los buffers de numpy/pandas), no la de librerías nativas como Arrow.
+
+    python -m benchmarks.run                              # small y medium, compara con baseline.json
+    python -m benchmarks.run --sizes large --only athena
+    python -m benchmarks.run --update-baseline
+
+El proceso termina con código 1 si algún caso empeora más que la tolerancia respecto de la línea base.
+Los tiempos solo son comparables con una línea base tomada en la misma máquina (y en máquinas virtuales
+compartidas varían bastante entre ejecuciones); el número de llamadas y el pico de memoria son deterministas.
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from .cases import CASES, Environment
+from .fakes import FakeTikaServer
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+SIZE_LABELS = ("small", "medium", "large")
+# Diferencias absolutas por debajo de estos márgenes se consideran ruido, aunque superen la tolerancia relativa.
+MIN_SECONDS_SLACK = 0.01
+MIN_PEAK_MB_SLACK = 1.0
+
+
+def _measure(workload, repeats: int) -> dict:
+    """Mide un Workload: mediana del tiempo, llamadas remotas por operación y pico de memoria."""
+    from py_toolbox.utils.instrumentation import enable_metrics, remove_hook
+
+    workload.run()  # Calentamiento: conexiones, imports diferidos, cachés del sistema de archivos.
+    timings = []
+    for _ in range(repeats):
+        gc.collect()  # Que la basura de la ejecución anterior no se cobre en esta.
+        start = time.perf_counter()
+        workload.run()
+        timings.append(time.perf_counter() - start)
+
+    metrics = enable_metrics()
+    try:
+        workload.run()
+    finally:
+        remove_hook(metrics)
+    summary = metrics.summary()
+
+    tracemalloc.start()
+    try:
+        workload.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    seconds = statistics.median(timings)
+    return {
+        "seconds": seconds,
+        "min_seconds": min(timings),
+        "units": workload.units,
+        "units_per_second": workload.units / seconds if seconds else 0.0,
+        "mb_per_second": workload.nbytes / (1024 * 1024) / seconds if seconds and workload.nbytes else None,
+        "peak_mb": peak / (1024 * 1024),
+        "calls": {f"{row['service']}.{row['operation']}": row["count"] for row in summary["operations"]},
+        "events": {
+            f"{service}.{name}": count for service, events in summary["events"].items() for name, count in events.items()
+        },
+    }
+
+
+def _compare(result: dict, base: dict | None, tolerance: float) -> list[str]:
+    """Devuelve la lista de regresiones de un resultado respecto de su línea base."""
+    if base is None:
+        return []
+    problems = []
+    limit = max(base["seconds"] * (1 + tolerance), base["seconds"] + MIN_SECONDS_SLACK)
+    if result["seconds"] > limit:
+        problems.append(f"tiempo {result['seconds']:.3f}s > {base['seconds']:.3f}s")
+    limit = max(base["peak_mb"] * (1 + tolerance), base["peak_mb"] + MIN_PEAK_MB_SLACK)
+    if result["peak_mb"] > limit:
+        problems.append(f"memoria {result['peak_mb']:.1f}MB > {base['peak_mb']:.1f}MB")
+    for operation, count in result["calls"].items():
+        if count > base["calls"].get(operation, 0):
+            problems.append(f"llamadas {operation} {count} > {base['calls'].get(operation, 0)}")
+    return problems
+
+
+def _format_row(key: str, unit: str, result: dict, base: dict | None, problems: list[str]) -> str:
+    throughput = f"{result['units_per_second']:,.0f} {unit}/s"
+    if result["mb_per_second"] is not None:
+        throughput += f" ({result['mb_per_second']:.1f} MB/s)"
+    calls = sum(result["calls"].values())
+    if base is None:
+        change = "nuevo"
+    else:
+        change = f"{(result['seconds'] / base['seconds'] - 1) * 100:+.0f}%" if base["seconds"] else "-"
+    status = "REGRESIÓN: " + "; ".join(problems) if problems else "ok"
+    return (f"{key:<52}{result['seconds']:>10.3f}{throughput:>38}{result['peak_mb']:>10.1f}{calls:>9}"
+            f"{change:>9}  {status}")
+
+
+def _load_baseline(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("results", {})
+
+
+def _save_baseline(path: Path, results: dict, sizes: list[str], repeats: int):
+    merged = _load_baseline(path)
+    merged.update(results)
+    content = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "sizes": sizes,
+            "repeats": repeats,
+        },
+        "results": dict(sorted(merged.items())),
+    }
+    path.write_text(json.dumps(content, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks offline de py_toolbox.")
+    parser.add_argument("--sizes", default="small,medium", help="Tamaños separados por comas: small, medium, large.")
+    parser.add_argument("--only", default="", help="Ejecuta solo los casos cuyo nombre contenga alguno de estos textos (separados por comas).")
+    parser.add_argument("--repeats", type=int, default=5, help="Ejecuciones medidas por caso (se reporta la mediana).")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Archivo JSON con la línea base.")
+    parser.add_argument("--update-baseline", action="store_true", help="Guarda los resultados como nueva línea base.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento relativo tolerado (0.25 = 25%%).")
+    parser.add_argument("--output", type=Path, help="Guarda también los resultados de esta ejecución en un JSON.")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZE_LABELS]
+    if unknown:
+        parser.error(f"Tamaños no reconocidos: {', '.join(unknown)}.")
+    filters = [text.strip() for text in args.only.split(",") if text.strip()]
+    selected = [c for name, c in CASES.items() if not filters or any(text in name for text in filters)]
+    if not selected:
+        parser.error("Ningún caso coincide con --only.")
+
+    # Los logs INFO del toolbox (uno o más por llamada) distorsionarían los tiempos.
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    # moto intercepta las llamadas de botocore; las credenciales nunca salen del proceso.
+    for variable in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SECURITY_TOKEN", "AWS_SESSION_TOKEN"):
+        os.environ[variable] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+    from moto import mock_aws
+    from py_toolbox.aws.clients import clear_clients
+    from py_toolbox.processing.tika_parser import TikaParser
+
+    baseline = _load_baseline(args.baseline)
+    results = {}
+    regressions = 0
+    work_dir = Path(tempfile.mkdtemp(prefix="py_toolbox_bench_"))
+    print(f"{'caso':<52}{'mediana s':>10}{'rendimiento':>38}{'pico MB':>10}{'llamadas':>9}{'vs base':>9}")
+    try:
+        with mock_aws(), FakeTikaServer() as tika:
+            clear_clients()
+            TikaParser.TIKA_SERVER_URL = tika.url
+            TikaParser._default_instance = None
+            env = Environment(work_dir, tika.url)
+            for bench in selected:
+                for size_label in sizes:
+                    key = f"{bench.name}[{size_label}]"
+                    workload = bench.build(bench.sizes[size_label], env)
+                    try:
+                        result = _measure(workload, args.repeats)
+                    finally:
+                        if workload.cleanup is not None:
+                            workload.cleanup()
+                    result["unit"] = bench.unit
+                    problems = _compare(result, baseline.get(key), args.tolerance)
+                    regressions += bool(problems)
+                    results[key] = result
+                    print(_format_row(key, bench.unit, result, baseline.get(key), problems), flush=True)
+            clear_clients()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        _save_baseline(args.baseline, results, sizes, args.repeats)
+        print(f"Línea base actualizada en {args.baseline} ({len(results)} resultados).")
+        return 0
+    if regressions:
+        print(f"{regressions} caso(s) con regresión respecto de {args.baseline} (tolerancia {args.tolerance:.0%}).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
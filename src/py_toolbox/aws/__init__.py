@@ -0,0 +1 @@
+from .clients import clear_clients, configure_clients, get_client
@@ -1,94 +1,645 @@
 # src/py_toolbox/aws/athena.py
-import boto3
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import random
 import time
-import pandas as pd
+import uuid
 import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from botocore.exceptions import ClientError, ParamValidationError
+from decimal import Decimal
+from typing import Iterator
+from .athena_cache import InMemoryResultCache, ParquetResultCache, make_cache_key
+from .clients import get_client
+from ..utils.instrumentation import record_event
+from ..utils.lazy_import import lazy_import
+
+# pandas se carga de forma diferida, al leer los primeros resultados.
+pd = lazy_import("pandas")
+
+# Tipos de Athena (ResultSetMetadata.ColumnInfo[].Type) agrupados por el dtype al que se convierten.
+_ATHENA_INTEGER_TYPES = {"tinyint", "smallint", "integer", "int", "bigint"}
+_ATHENA_FLOAT_TYPES = {"float", "real", "double"}
+_ATHENA_BOOLEAN_VALUES = {"true": True, "false": False}
+
+_FETCH_MODES = {"auto", "api", "s3", "unload"}
+_BATCH_GET_MAX_IDS = 50
+_MAX_CONSECUTIVE_POLL_FAILURES = 5
+
+
+def _parse_int(value: str | None) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 
 class Athena:
-    def __init__(self, database, s3_output_location, region_name="us-east-1"):
-        self.athena_client = boto3.client("athena", region_name=region_name)
+    # En modo 'auto', los resultados cuyo CSV supere este tamaño se descargan directamente de S3
+    # en lugar de paginarse con GetQueryResults (1000 filas por llamada).
+    BULK_FETCH_THRESHOLD_BYTES = 4 * 1024 * 1024
+    # Tamaño de cada GET por rangos y número de descargas concurrentes para objetos grandes.
+    RANGE_PART_SIZE_BYTES = 8 * 1024 * 1024
+    MAX_DOWNLOAD_WORKERS = 8
+    # Pausas (en segundos) del backoff exponencial al sondear el estado de las consultas.
+    POLL_INITIAL_DELAY = 0.25
+    POLL_MAX_DELAY = 10.0
+
+    def __init__(self, database, s3_output_location, region_name="us-east-1",
+                 cache: InMemoryResultCache | ParquetResultCache | None = None,
+                 result_reuse_max_age_minutes: int | None = None):
+        """
+        :param database: Base de datos de Athena sobre la que se ejecutan las consultas.
+        :param s3_output_location: URI de S3 donde Athena escribe los resultados.
+        :param region_name: La región de AWS donde operará el cliente.
+        :param cache: Caché local opcional de resultados (InMemoryResultCache o ParquetResultCache),
+                      indexada por el texto normalizado de la consulta y la base de datos.
+        :param result_reuse_max_age_minutes: Si se indica, pide a Athena que reutilice en el servidor
+                                             resultados de consultas idénticas con esa antigüedad máxima
+                                             (ResultReuseConfiguration, requiere el motor v3).
+        """
+        self.region_name = region_name
+        self._athena_client = None
+        self._s3_client = None
         self.database = database
         self.s3_output_location = s3_output_location
+        self.cache = cache
+        self.result_reuse_max_age_minutes = result_reuse_max_age_minutes
+        self.server_reuse_hits = 0
         logging.info(f"Conector de Athena inicializado para la base de datos '{database}'.")
 
-    # ... los métodos _execute_query y _get_query_results_dataframe no cambian ...
+    @property
+    def athena_client(self):
+        """Cliente de Athena compartido, obtenido del registro de clientes la primera vez que se usa."""
+        if self._athena_client is None:
+            self._athena_client = get_client("athena", self.region_name)
+        return self._athena_client
+
+    @athena_client.setter
+    def athena_client(self, client):
+        self._athena_client = client
+
+    @property
+    def s3_client(self):
+        """Cliente de S3 compartido, usado para leer los resultados directamente del bucket de salida."""
+        if self._s3_client is None:
+            self._s3_client = get_client("s3", self.region_name)
+        return self._s3_client
+
+    @s3_client.setter
+    def s3_client(self, client):
+        self._s3_client = client
+
     def _execute_query(self, query):
+        params = {
+            "QueryString": query,
+            "QueryExecutionContext": {"Database": self.database},
+            "ResultConfiguration": {"OutputLocation": self.s3_output_location},
+        }
+        if self.result_reuse_max_age_minutes:
+            params["ResultReuseConfiguration"] = {
+                "ResultReuseByAgeConfiguration": {"Enabled": True, "MaxAgeInMinutes": self.result_reuse_max_age_minutes}
+            }
         try:
-            response = self.athena_client.start_query_execution(
-                QueryString=query,
-                QueryExecutionContext={"Database": self.database},
-                ResultConfiguration={"OutputLocation": self.s3_output_location},
-            )
+            try:
+                response = self.athena_client.start_query_execution(**params)
+            except (ClientError, ParamValidationError) as e:
+                if "ResultReuseConfiguration" not in params or not self._is_result_reuse_rejection(e):
+                    raise
+                # El workgroup (o la versión de botocore) no admite la reutilización de resultados:
+                # se desactiva y se reintenta sin ella.
+                logging.warning(f"La reutilización de resultados de Athena no está disponible; se desactiva. Error: {e}")
+                self.result_reuse_max_age_minutes = None
+                del params["ResultReuseConfiguration"]
+                response = self.athena_client.start_query_execution(**params)
             logging.info(f"Consulta de Athena iniciada. ID de ejecución: {response['QueryExecutionId']}")
             return response["QueryExecutionId"]
         except Exception as e:
             logging.error(f"No se pudo iniciar la consulta de Athena. Error: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def _is_result_reuse_rejection(error: Exception) -> bool:
+        """
+        Indica si un error de start_query_execution se debe a ResultReuseConfiguration: la versión de
+        botocore no conoce el parámetro, o el workgroup lo rechaza (InvalidRequestException que menciona
+        la reutilización de resultados). Throttling, permisos y demás errores no desactivan la opción.
+        """
+        if isinstance(error, ParamValidationError):
+            return "ResultReuseConfiguration" in str(error)
+        error_info = error.response.get("Error", {})
+        message = error_info.get("Message", "").lower()
+        return error_info.get("Code") == "InvalidRequestException" and ("reuse" in message or "reutiliz" in message)
+
+    @staticmethod
+    def _cast_column(values: pd.Series, athena_type: str) -> pd.Series:
+        """
+        Convierte una columna de strings (VarCharValue) al dtype que corresponde a su tipo de Athena.
+        Los tipos no reconocidos (varchar, char, json, array, map...) se dejan como strings.
+        """
+        athena_type = athena_type.lower()
+        if athena_type in _ATHENA_INTEGER_TYPES:
+            # Conversión exacta desde el string: con to_numeric, una columna con nulos pasa por float64
+            # y los bigint mayores que 2**53 pierden precisión.
+            return pd.Series(pd.array([_parse_int(v) for v in values], dtype="Int64"), index=values.index)
+        if athena_type in _ATHENA_FLOAT_TYPES:
+            return pd.to_numeric(values, errors="coerce").astype("float64")
+        if athena_type == "boolean":
+            return values.map(_ATHENA_BOOLEAN_VALUES).astype("boolean")
+        if athena_type == "date":
+            return pd.to_datetime(values, format="%Y-%m-%d", errors="coerce").astype("datetime64[ns]")
+        if athena_type.startswith("timestamp") and "time zone" in athena_type:
+            # Los valores traen su zona ('... UTC', '... America/Santiago'); se normalizan a UTC.
+            return pd.to_datetime(values, errors="coerce", utc=True).astype("datetime64[ns, UTC]")
+        if athena_type.startswith("timestamp"):
+            return pd.to_datetime(values, errors="coerce").astype("datetime64[ns]")
+        if athena_type == "decimal":
+            return values.map(lambda v: Decimal(v) if v is not None else None)
+        return values
+
+    def _build_chunk(self, column_values: list, column_info: list) -> pd.DataFrame:
+        """Construye un DataFrame tipado a partir de las listas de valores de cada columna."""
+        chunk = pd.DataFrame({
+            i: self._cast_column(pd.Series(values, dtype=object), info["Type"])
+            for i, (values, info) in enumerate(zip(column_values, column_info))
+        })
+        chunk.columns = [info["Label"] for info in column_info]
+        return chunk
+
+    def _iter_query_results_chunks(self, query_execution_id: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        Pagina los resultados de una consulta finalizada y los devuelve en DataFrames tipados
+        de como máximo `chunk_rows` filas. Si la consulta no devuelve filas, produce un único
+        DataFrame vacío con las columnas y dtypes del resultado.
+        """
+        results_paginator = self.athena_client.get_paginator("get_query_results")
+        results_iter = results_paginator.paginate(
+            QueryExecutionId=query_execution_id, PaginationConfig={"PageSize": 1000}
+        )
+        column_info = []
+        column_values = []
+        buffered_rows = 0
+        yielded = False
+        first_page = True
+        for page in results_iter:
+            if first_page:
+                column_info = page["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+                column_values = [[] for _ in column_info]
+                rows = page["ResultSet"]["Rows"][1:] # La primera fila contiene los encabezados
+                first_page = False
+            else:
+                rows = page["ResultSet"]["Rows"]
+
+            for row in rows:
+                for values, item in zip(column_values, row["Data"]):
+                    values.append(item.get("VarCharValue"))
+                buffered_rows += 1
+                if buffered_rows >= chunk_rows:
+                    yield self._build_chunk(column_values, column_info)
+                    yielded = True
+                    column_values = [[] for _ in column_info]
+                    buffered_rows = 0
+
+        if buffered_rows or not yielded:
+            yield self._build_chunk(column_values, column_info)
+
     def _get_query_results_dataframe(self, query_execution_id):
         try:
-            results_paginator = self.athena_client.get_paginator("get_query_results")
-            results_iter = results_paginator.paginate(
-                QueryExecutionId=query_execution_id, PaginationConfig={"PageSize": 1000}
-            )
-            data = []
-            columns = []
-            first_page = True
-            for page in results_iter:
-                if first_page:
-                    if not page["ResultSet"]["Rows"]: return pd.DataFrame(columns=columns) # Tabla vacía
-                    columns = [col["Label"] for col in page["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]]
-                    rows = page["ResultSet"]["Rows"][1:]
-                    first_page = False
-                else:
-                    rows = page["ResultSet"]["Rows"]
-
-                for row in rows:
-                    data.append([item.get("VarCharValue") for item in row["Data"]])
-            
+            chunks = list(self._iter_query_results_chunks(query_execution_id, chunk_rows=100_000))
+            df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
             logging.info(f"Resultados de la consulta {query_execution_id} convertidos a DataFrame.")
-            return pd.DataFrame(data, columns=columns)
+            return df
         except Exception as e:
             logging.error(f"No se pudieron obtener los resultados de la consulta {query_execution_id}. Error: {e}", exc_info=True)
             raise
     
+    @staticmethod
+    def _parse_query_execution(execution: dict) -> dict:
+        """Extrae el estado, la salida y las estadísticas de un objeto QueryExecution de Athena."""
+        status = execution["Status"]
+        return {
+            "State": status.get("State"),
+            "StateChangeReason": status.get("StateChangeReason", "No reason provided."),
+            "OutputLocation": execution.get("ResultConfiguration", {}).get("OutputLocation"),
+            "Statistics": execution.get("Statistics", {}),
+        }
+
+    def _record_execution(self, query_execution_id: str, details: dict):
+        """Registra si Athena reutilizó en el servidor el resultado de una ejecución anterior."""
+        if details.get("Statistics", {}).get("ResultReuseInformation", {}).get("ReusedPreviousResult"):
+            self.server_reuse_hits += 1
+            logging.info(f"Athena reutilizó un resultado previo para la consulta {query_execution_id}.")
+
+    def _stop_query(self, query_execution_id: str):
+        """Cancela una consulta en curso. Los errores solo se registran: la consulta pudo haber terminado ya."""
+        try:
+            self.athena_client.stop_query_execution(QueryExecutionId=query_execution_id)
+        except Exception as e:
+            logging.warning(f"No se pudo cancelar la consulta de Athena {query_execution_id}. Error: {e}")
+
+    def _cache_key(self, query: str, fetch_mode: str) -> str:
+        return make_cache_key(query, self.database, fetch_mode)
+
+    def cache_stats(self) -> dict:
+        """
+        Devuelve los contadores de la caché local (aciertos, fallos, bytes y tiempo de escaneo ahorrados)
+        junto con el número de consultas cuyo resultado Athena reutilizó en el servidor.
+        """
+        stats = self.cache.stats() if self.cache is not None else {}
+        stats["server_reuse_hits"] = self.server_reuse_hits
+        return stats
+
     def get_query_execution_details(self, query_execution_id: str) -> dict:
         """
         Obtiene el estado y la razón del fallo de una consulta.
         """
         try:
             response = self.athena_client.get_query_execution(QueryExecutionId=query_execution_id)
-            status = response["QueryExecution"]["Status"]
-            return {
-                "State": status.get("State"),
-                "StateChangeReason": status.get("StateChangeReason", "No reason provided.")
-            }
+            return self._parse_query_execution(response["QueryExecution"])
         except Exception as e:
             logging.error(f"Fallo al verificar el estado de la consulta {query_execution_id}. Error: {e}", exc_info=True)
             raise
 
-    def get_query_results(self, query: str) -> pd.DataFrame:
+    def _poll_delays(self) -> Iterator[float]:
         """
-        Orquesta la ejecución de una consulta y devuelve los resultados.
-        Si la consulta falla, lanza una excepción con el motivo del fallo.
+        Genera las pausas entre sondeos de estado: crecen exponencialmente desde POLL_INITIAL_DELAY
+        hasta POLL_MAX_DELAY, con jitter para no sincronizar las llamadas de varios procesos.
         """
-        query_execution_id = self._execute_query(query)
+        delay = self.POLL_INITIAL_DELAY
+        while True:
+            yield delay / 2 + random.uniform(0, delay / 2)
+            delay = min(delay * 2, self.POLL_MAX_DELAY)
 
+    def _wait_for_query_completion(self, query_execution_id: str) -> dict:
+        """
+        Espera a que una consulta finalice y devuelve sus detalles de ejecución.
+        Si la consulta falla, lanza una excepción con el motivo del fallo.
+        """
+        delays = self._poll_delays()
         while True:
             details = self.get_query_execution_details(query_execution_id)
+            record_event("athena", "polls")
             state = details["State"]
 
             if state in ["SUCCEEDED", "FAILED", "CANCELLED"]:
                 logging.info(f"La consulta {query_execution_id} ha finalizado con estado: {state}")
                 break
-            time.sleep(1)
+            time.sleep(next(delays))
 
-        if state == "SUCCEEDED":
-            return self._get_query_results_dataframe(query_execution_id)
-        else:
-            # <<< LÓGICA MEJORADA >>>
-            # Ahora incluimos la razón del fallo en el mensaje de error.
+        if state != "SUCCEEDED":
             error_reason = details["StateChangeReason"]
             error_message = f"La consulta de Athena {query_execution_id} falló. Razón: {error_reason}"
             logging.error(error_message)
-            raise Exception(error_message)
\ No newline at end of file
+            raise Exception(error_message)
+        return details
+
+    @staticmethod
+    def _split_s3_uri(s3_uri: str) -> tuple[str, str]:
+        """Separa una URI 's3://bucket/clave' en bucket y clave."""
+        bucket, _, key = s3_uri.removeprefix("s3://").partition("/")
+        return bucket, key
+
+    def _download_s3_object(self, bucket: str, key: str, size: int) -> bytearray:
+        """
+        Descarga un objeto de S3 en memoria. Los objetos mayores que RANGE_PART_SIZE_BYTES se
+        descargan con GETs por rangos en paralelo, escribiendo cada parte directamente en su
+        posición de un único buffer preasignado.
+        """
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        part_size = self.RANGE_PART_SIZE_BYTES
+
+        def fetch_range(start: int):
+            end = min(start + part_size, size) - 1
+            response = self.s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")
+            view[start:end + 1] = response["Body"].read()
+
+        offsets = range(0, size, part_size)
+        if len(offsets) <= 1:
+            if size:
+                fetch_range(0)
+            return buffer
+        with ThreadPoolExecutor(max_workers=min(self.MAX_DOWNLOAD_WORKERS, len(offsets))) as executor:
+            list(executor.map(fetch_range, offsets))
+        return buffer
+
+    def _get_column_info(self, query_execution_id: str) -> list:
+        """Obtiene los metadatos de columnas (nombre y tipo) de una consulta finalizada."""
+        response = self.athena_client.get_query_results(QueryExecutionId=query_execution_id, MaxResults=1)
+        return response["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+
+    def _read_csv_output(self, query_execution_id: str, bucket: str, key: str, size: int) -> pd.DataFrame:
+        """
+        Lee el CSV de resultados que Athena escribió en S3 con el lector CSV de pyarrow, que consume el objeto
+        a medida que llegan sus GETs por rangos en paralelo (sin una copia en memoria del archivo completo), y
+        aplica después los dtypes de las columnas de Athena columna a columna. Athena escribe NULL como un
+        campo vacío sin comillas y '' como "", así que solo el primero se lee como None (igual que en modo 'api').
+        """
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        from .s3_stream import RangedReader
+
+        column_info = self._get_column_info(query_execution_id)
+        names = [str(i) for i in range(len(column_info))]
+        with RangedReader(self.s3_client, bucket, key, size, self.RANGE_PART_SIZE_BYTES, self.MAX_DOWNLOAD_WORKERS) as reader:
+            table = pa_csv.read_csv(
+                reader,
+                read_options=pa_csv.ReadOptions(column_names=names, skip_rows=1),
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={name: pa.string() for name in names},
+                    null_values=[""],
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=False,
+                ),
+            )
+        columns = table.columns
+        del table
+        typed = {}
+        for i, info in enumerate(column_info):
+            # Cada columna se libera en cuanto se convierte, para no tener dos copias del resultado.
+            values = pd.Series(columns[i].to_numpy(zero_copy_only=False), dtype=object)
+            columns[i] = None
+            typed[i] = self._cast_column(values, info["Type"])
+        typed = pd.DataFrame(typed)
+        typed.columns = [info["Label"] for info in column_info]
+        return typed
+
+    def _build_unload_query(self, query: str) -> tuple[str, str]:
+        """
+        Envuelve la consulta en un UNLOAD a Parquet sobre un prefijo único dentro de
+        s3_output_location. Devuelve la consulta UNLOAD y la URI del prefijo de destino.
+        """
+        unload_location = f"{self.s3_output_location.rstrip('/')}/unload/{uuid.uuid4().hex}/"
+        inner_query = query.strip().rstrip(";")
+        unload_query = f"UNLOAD ({inner_query}) TO '{unload_location}' WITH (format = 'PARQUET', compression = 'SNAPPY')"
+        return unload_query, unload_location
+
+    def _read_unload_output(self, unload_location: str) -> pd.DataFrame:
+        """
+        Lee de forma concurrente los archivos Parquet escritos por un UNLOAD y los combina
+        en un único DataFrame respaldado por Arrow.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        bucket, prefix = self._split_s3_uri(unload_location)
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        objects = [
+            obj for page in paginator.paginate(Bucket=bucket, Prefix=prefix)
+            for obj in page.get("Contents", []) if obj["Size"] > 0
+        ]
+        if not objects:
+            logging.info(f"El UNLOAD en {unload_location} no produjo archivos; se devuelve un DataFrame vacío.")
+            return pd.DataFrame()
+
+        def read_part(obj: dict):
+            raw = self._download_s3_object(bucket, obj["Key"], obj["Size"])
+            return pq.read_table(pa.BufferReader(raw))
+
+        with ThreadPoolExecutor(max_workers=min(self.MAX_DOWNLOAD_WORKERS, len(objects))) as executor:
+            tables = list(executor.map(read_part, objects))
+        table = pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    def _resolve_fetch_mode(self, fetch_mode: str, output_location: str) -> tuple[str, int]:
+        """
+        Decide cómo leer los resultados de una consulta finalizada. En modo 'auto' consulta el
+        tamaño del CSV de salida y usa la descarga directa de S3 si supera BULK_FETCH_THRESHOLD_BYTES.
+        Devuelve el modo elegido y el tamaño del objeto de salida (0 si no se consultó).
+        """
+        if fetch_mode == "api" or not output_location:
+            return "api", 0
+        bucket, key = self._split_s3_uri(output_location)
+        try:
+            size = self.s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        except Exception as e:
+            if fetch_mode != "auto":
+                raise
+            logging.warning(f"No se pudo consultar el tamaño de {output_location}; se usará GetQueryResults. Error: {e}")
+            return "api", 0
+        if fetch_mode == "auto":
+            fetch_mode = "s3" if size >= self.BULK_FETCH_THRESHOLD_BYTES else "api"
+        logging.info(f"Resultados de {size} bytes en {output_location}; modo de lectura: '{fetch_mode}'.")
+        return fetch_mode, size
+
+    def iter_query_results(self, query: str, chunk_rows: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Ejecuta una consulta y devuelve sus resultados como un generador de DataFrames de tamaño acotado.
+        Cada bloque se convierte a los dtypes correspondientes a los tipos de columna de Athena
+        (bigint, double, boolean, date, timestamp, decimal...), por lo que la memoria usada
+        queda limitada a un bloque de `chunk_rows` filas.
+
+        :param query: La consulta SQL a ejecutar.
+        :param chunk_rows: Número máximo de filas de cada DataFrame producido.
+        :return: Un generador de DataFrames tipados.
+        """
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows debe ser mayor que 0.")
+        query_execution_id = self._execute_query(query)
+        self._wait_for_query_completion(query_execution_id)
+        yield from self._iter_query_results_chunks(query_execution_id, chunk_rows)
+
+    def _validate_fetch_mode(self, fetch_mode: str):
+        if fetch_mode not in _FETCH_MODES:
+            raise ValueError(f"fetch_mode debe ser uno de {sorted(_FETCH_MODES)}, se recibió '{fetch_mode}'.")
+        if fetch_mode == "unload" and importlib.util.find_spec("pyarrow") is None:
+            raise ImportError("La librería 'pyarrow' es necesaria para el modo 'unload'. Por favor, instálala.")
+
+    def _start_query(self, query: str, fetch_mode: str) -> tuple[str, str | None]:
+        """
+        Inicia la consulta (envuelta en un UNLOAD si fetch_mode es 'unload').
+        Devuelve el ID de ejecución y, en modo 'unload', el prefijo S3 donde se escribirá el Parquet.
+        """
+        if fetch_mode == "unload":
+            unload_query, unload_location = self._build_unload_query(query)
+            return self._execute_query(unload_query), unload_location
+        return self._execute_query(query), None
+
+    def _fetch_query_results(self, query_execution_id: str, output_location: str | None,
+                             fetch_mode: str, unload_location: str | None = None) -> pd.DataFrame:
+        """Lee los resultados de una consulta ya finalizada con éxito según el fetch_mode indicado."""
+        if fetch_mode == "unload":
+            try:
+                df = self._read_unload_output(unload_location)
+                logging.info(f"Resultados del UNLOAD {query_execution_id} leídos desde {unload_location}.")
+                return df
+            except Exception as e:
+                logging.error(f"No se pudieron leer los resultados del UNLOAD {query_execution_id}. Error: {e}", exc_info=True)
+                raise
+
+        try:
+            fetch_mode, size = self._resolve_fetch_mode(fetch_mode, output_location)
+            if fetch_mode == "s3":
+                bucket, key = self._split_s3_uri(output_location)
+                df = self._read_csv_output(query_execution_id, bucket, key, size)
+                logging.info(f"Resultados de la consulta {query_execution_id} descargados de {output_location}.")
+                return df
+        except Exception as e:
+            logging.error(f"No se pudieron descargar los resultados de la consulta {query_execution_id} desde S3. Error: {e}", exc_info=True)
+            raise
+        return self._get_query_results_dataframe(query_execution_id)
+
+    def get_query_results(self, query: str, fetch_mode: str = "auto") -> pd.DataFrame:
+        """
+        Orquesta la ejecución de una consulta y devuelve los resultados en un DataFrame tipado.
+        Si la consulta falla, lanza una excepción con el motivo del fallo.
+        Si el conector tiene una caché configurada, se consulta antes de ejecutar y se actualiza después.
+
+        :param query: La consulta SQL a ejecutar.
+        :param fetch_mode: Cómo se leen los resultados:
+                           'api' pagina GetQueryResults (1000 filas por llamada);
+                           's3' descarga directamente el CSV de resultados con GETs por rangos en paralelo;
+                           'auto' elige entre 'api' y 's3' según el tamaño del CSV de resultados;
+                           'unload' envuelve la consulta en un UNLOAD a Parquet y lee los archivos
+                           en paralelo en un DataFrame respaldado por Arrow (requiere pyarrow).
+        :return: Un DataFrame con los resultados de la consulta.
+        """
+        self._validate_fetch_mode(fetch_mode)
+        if self.cache is not None:
+            cached = self.cache.get(self._cache_key(query, fetch_mode))
+            if cached is not None:
+                logging.info("Resultados de la consulta obtenidos de la caché local.")
+                return cached
+
+        query_execution_id, unload_location = self._start_query(query, fetch_mode)
+        details = self._wait_for_query_completion(query_execution_id)
+        self._record_execution(query_execution_id, details)
+        df = self._fetch_query_results(query_execution_id, details.get("OutputLocation"), fetch_mode, unload_location)
+        if self.cache is not None:
+            self.cache.put(self._cache_key(query, fetch_mode), df, details.get("Statistics"))
+        return df
+
+    def _batch_get_query_states(self, query_execution_ids: list) -> dict:
+        """
+        Consulta el estado de varias consultas con batch_get_query_execution (máximo 50 IDs por llamada).
+        Devuelve un diccionario ID -> detalles con el mismo formato que get_query_execution_details.
+        Los IDs que Athena no pudo procesar se omiten y se vuelven a consultar en el siguiente sondeo.
+        """
+        states = {}
+        for start in range(0, len(query_execution_ids), _BATCH_GET_MAX_IDS):
+            batch = query_execution_ids[start:start + _BATCH_GET_MAX_IDS]
+            response = self.athena_client.batch_get_query_execution(QueryExecutionIds=batch)
+            for execution in response.get("QueryExecutions", []):
+                states[execution["QueryExecutionId"]] = self._parse_query_execution(execution)
+        return states
+
+    def _iter_run_queries(self, queries: list, max_concurrency: int, fetch_mode: str) -> Iterator[tuple[int, dict]]:
+        """
+        Ejecuta las consultas con como máximo `max_concurrency` en curso a la vez, sondea su estado en
+        lote con backoff exponencial y lee los resultados de cada una en cuanto finaliza.
+        Produce tuplas (índice de la consulta, resultado) en orden de finalización.
+        """
+        pending = deque(enumerate(queries))
+        running = {}  # QueryExecutionId -> (índice, consulta, prefijo de UNLOAD)
+        fetching = {}  # Future -> (índice, consulta, QueryExecutionId, estadísticas)
+
+        def result(query, query_execution_id, state, df=None, error=None):
+            return {"Query": query, "QueryExecutionId": query_execution_id, "State": state, "DataFrame": df, "Error": error}
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as fetch_executor:
+            delays = self._poll_delays()
+            poll_failures = 0
+            while pending or running or fetching:
+                submitted = False
+                while pending and len(running) < max_concurrency:
+                    index, query = pending.popleft()
+                    if self.cache is not None:
+                        cached = self.cache.get(self._cache_key(query, fetch_mode))
+                        if cached is not None:
+                            yield index, result(query, None, "SUCCEEDED", df=cached)
+                            continue
+                    try:
+                        query_execution_id, unload_location = self._start_query(query, fetch_mode)
+                        running[query_execution_id] = (index, query, unload_location)
+                        submitted = True
+                    except Exception as e:
+                        yield index, result(query, None, "FAILED", error=str(e))
+
+                done_fetches = [future for future in fetching if future.done()]
+                for future in done_fetches:
+                    index, query, query_execution_id, statistics = fetching.pop(future)
+                    try:
+                        df = future.result()
+                    except Exception as e:
+                        yield index, result(query, query_execution_id, "FAILED", error=str(e))
+                        continue
+                    if self.cache is not None:
+                        self.cache.put(self._cache_key(query, fetch_mode), df, statistics)
+                    yield index, result(query, query_execution_id, "SUCCEEDED", df=df)
+
+                if not running:
+                    if fetching:
+                        wait(fetching, return_when=FIRST_COMPLETED)
+                    continue
+
+                if submitted:
+                    delays = self._poll_delays()
+                time.sleep(next(delays))
+
+                try:
+                    states = self._batch_get_query_states(list(running))
+                    record_event("athena", "polls")
+                    poll_failures = 0
+                except Exception as e:
+                    poll_failures += 1
+                    if poll_failures < _MAX_CONSECUTIVE_POLL_FAILURES:
+                        logging.warning(f"Fallo al sondear el estado de las consultas de Athena; se reintentará. Error: {e}")
+                        continue
+                    logging.error(f"No se pudo sondear el estado de las consultas de Athena; se cancelan. Error: {e}", exc_info=True)
+                    for query_execution_id, (index, query, _) in list(running.items()):
+                        del running[query_execution_id]
+                        self._stop_query(query_execution_id)
+                        yield index, result(query, query_execution_id, "CANCELLED", error=str(e))
+                    continue
+
+                for query_execution_id, details in states.items():
+                    state = details["State"]
+                    if state not in ["SUCCEEDED", "FAILED", "CANCELLED"]:
+                        continue
+                    index, query, unload_location = running.pop(query_execution_id)
+                    logging.info(f"La consulta {query_execution_id} ha finalizado con estado: {state}")
+                    if state == "SUCCEEDED":
+                        self._record_execution(query_execution_id, details)
+                        future = fetch_executor.submit(
+                            self._fetch_query_results, query_execution_id,
+                            details["OutputLocation"], fetch_mode, unload_location,
+                        )
+                        fetching[future] = (index, query, query_execution_id, details["Statistics"])
+                    else:
+                        error_message = f"La consulta de Athena {query_execution_id} falló. Razón: {details['StateChangeReason']}"
+                        logging.error(error_message)
+                        yield index, result(query, query_execution_id, state, error=error_message)
+
+    def run_queries(self, queries: list[str], max_concurrency: int = 5, fetch_mode: str = "auto") -> list[dict]:
+        """
+        Ejecuta varias consultas independientes en paralelo y devuelve sus resultados.
+        Las consultas se envían respetando el límite de concurrencia, su estado se sondea en lote
+        con batch_get_query_execution (con backoff exponencial y jitter) y los resultados de cada
+        consulta se leen en cuanto esta finaliza. Un fallo en una consulta no interrumpe las demás.
+
+        :param queries: Lista de consultas SQL a ejecutar.
+        :param max_concurrency: Número máximo de consultas en ejecución simultánea en Athena.
+        :param fetch_mode: Modo de lectura de resultados (ver get_query_results).
+        :return: Una lista, en el mismo orden que `queries`, de diccionarios con las claves
+                 'Query', 'QueryExecutionId', 'State', 'DataFrame' (None si falló) y 'Error' (None si tuvo éxito).
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser mayor que 0.")
+        self._validate_fetch_mode(fetch_mode)
+        results = [None] * len(queries)
+        for index, query_result in self._iter_run_queries(list(queries), max_concurrency, fetch_mode):
+            results[index] = query_result
+        failed = sum(1 for r in results if r["Error"] is not None)
+        logging.info(f"Se ejecutaron {len(results)} consultas de Athena ({failed} con error).")
+        return results
+
+    async def run_queries_async(self, queries: list[str], max_concurrency: int = 5, fetch_mode: str = "auto") -> list[dict]:
+        """
+        Versión asyncio de run_queries. La orquestación se ejecuta en un hilo aparte para no
+        bloquear el event loop mientras se sondean y leen las consultas.
+        """
+        return await asyncio.to_thread(self.run_queries, queries, max_concurrency, fetch_mode)
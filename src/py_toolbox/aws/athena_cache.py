@@ -0,0 +1,216 @@
+# src/py_toolbox/aws/athena_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+
+from ..utils.lazy_import import lazy_import
+
+# pandas se carga de forma diferida, al leer o guardar la primera entrada.
+pd = lazy_import("pandas")
+
+# Literales de texto, identificadores entre comillas, comentarios y espacios en blanco de una consulta SQL.
+_SQL_TOKEN_PATTERN = re.compile(
+    r"(?P<literal>'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")"
+    r"|(?P<space>(?:\s+|--[^\n]*|/\*.*?\*/)+)",
+    re.DOTALL,
+)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normaliza el texto de una consulta SQL para usarlo como clave de caché: elimina comentarios,
+    colapsa los espacios en blanco y el ';' final, sin alterar los literales entre comillas.
+    """
+    def replace(match: re.Match) -> str:
+        if match.group("literal"):
+            return match.group("literal")
+        return " "
+
+    return _SQL_TOKEN_PATTERN.sub(replace, query).strip().rstrip(";").strip()
+
+
+def make_cache_key(query: str, database: str, fetch_mode: str = "auto") -> str:
+    """
+    Genera la clave de caché de una consulta a partir de su texto normalizado, la base de datos y el
+    modo de lectura (los DataFrames de 'unload' están respaldados por Arrow y no son intercambiables).
+    """
+    payload = f"{database}\0{fetch_mode}\0{normalize_query(query)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class _ResultCache(ABC):
+    """
+    Base común de los backends de caché: contadores de aciertos/fallos y del coste de escaneo ahorrado.
+    """
+    def __init__(self, ttl_seconds: float | None = None):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._saved_bytes_scanned = 0
+        self._saved_execution_ms = 0
+
+    def _record_hit(self, statistics: dict):
+        with self._lock:
+            self._hits += 1
+            self._saved_bytes_scanned += statistics.get("DataScannedInBytes", 0)
+            self._saved_execution_ms += statistics.get("TotalExecutionTimeInMillis", 0)
+
+    def _record_miss(self):
+        with self._lock:
+            self._misses += 1
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de la caché: aciertos, fallos, tasa de aciertos y los bytes escaneados
+        y milisegundos de ejecución en Athena que se ahorraron gracias a los aciertos.
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "saved_bytes_scanned": self._saved_bytes_scanned,
+                "saved_execution_ms": self._saved_execution_ms,
+            }
+
+    @abstractmethod
+    def get(self, key: str) -> pd.DataFrame | None:
+        """Devuelve el DataFrame guardado con la clave, o None si no existe o expiró."""
+
+    @abstractmethod
+    def put(self, key: str, df: pd.DataFrame, statistics: dict | None = None, ttl_seconds: float | None = None):
+        """Guarda un DataFrame con las estadísticas de la ejecución que lo produjo."""
+
+
+class InMemoryResultCache(_ResultCache):
+    """
+    Caché LRU en memoria de resultados de Athena, con TTL opcional por entrada.
+    """
+    def __init__(self, max_entries: int = 128, ttl_seconds: float | None = None):
+        """
+        :param max_entries: Número máximo de resultados guardados; al superarlo se descarta el menos usado.
+        :param ttl_seconds: Vigencia por defecto de cada entrada. None para que no expiren.
+        """
+        super().__init__(ttl_seconds)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # clave -> (DataFrame, estadísticas, instante de expiración)
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.time():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            self._record_miss()
+            return None
+        self._record_hit(entry[1])
+        return entry[0].copy()
+
+    def put(self, key: str, df: pd.DataFrame, statistics: dict | None = None, ttl_seconds: float | None = None):
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (df.copy(), statistics or {}, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class ParquetResultCache(_ResultCache):
+    """
+    Caché en disco de resultados de Athena en formato Parquet. Cada entrada tiene su TTL y el
+    directorio se mantiene por debajo de `max_bytes` eliminando las entradas usadas hace más tiempo.
+    """
+    def __init__(self, cache_dir: str | Path, max_bytes: int = 1024 ** 3, ttl_seconds: float | None = 24 * 3600):
+        """
+        :param cache_dir: Directorio donde se guardan los archivos de la caché.
+        :param max_bytes: Tamaño máximo total de los archivos Parquet de la caché.
+        :param ttl_seconds: Vigencia por defecto de cada entrada. None para que no expiren.
+        """
+        super().__init__(ttl_seconds)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.cache_dir / f"{key}.parquet", self.cache_dir / f"{key}.json"
+
+    def _remove(self, key: str):
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        data_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta["expires_at"] is not None and meta["expires_at"] < time.time():
+                self._remove(key)
+                self._record_miss()
+                return None
+            df = pd.read_parquet(data_path)
+            os.utime(data_path)  # Marca la entrada como usada recientemente para la expulsión LRU.
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            self._record_miss()
+            return None
+        except Exception as e:
+            logging.warning(f"No se pudo leer la entrada {key} de la caché de Athena; se descarta. Error: {e}")
+            self._remove(key)
+            self._record_miss()
+            return None
+        self._record_hit(meta.get("statistics", {}))
+        return df
+
+    def put(self, key: str, df: pd.DataFrame, statistics: dict | None = None, ttl_seconds: float | None = None):
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        data_path, meta_path = self._paths(key)
+        tmp_suffix = f".{uuid.uuid4().hex}.tmp"
+        tmp_data = data_path.with_name(data_path.name + tmp_suffix)
+        tmp_meta = meta_path.with_name(meta_path.name + tmp_suffix)
+        try:
+            df.to_parquet(tmp_data, index=False, engine="pyarrow")
+            tmp_meta.write_text(json.dumps({
+                "expires_at": time.time() + ttl if ttl is not None else None,
+                "statistics": statistics or {},
+            }), encoding="utf-8")
+            # Se escribe primero a archivos temporales y se renombran para que un lector concurrente
+            # nunca vea una entrada a medio escribir.
+            os.replace(tmp_data, data_path)
+            os.replace(tmp_meta, meta_path)
+        except Exception as e:
+            logging.warning(f"No se pudo guardar el resultado en la caché de Athena: {e}")
+            tmp_data.unlink(missing_ok=True)
+            tmp_meta.unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta que la caché quede por debajo de max_bytes."""
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*.parquet"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path.stem))
+            total = sum(size for _, size, _ in entries)
+            for _, size, key in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(key)
+                total -= size
@@ -0,0 +1,93 @@
+# src/py_toolbox/aws/clients.py
+import logging
+import threading
+from ..utils.instrumentation import instrument_client
+
+# Valores por defecto de los clientes compartidos; se pueden cambiar con configure_clients().
+_defaults = {
+    "max_pool_connections": 50,
+    "retry_mode": "standard",
+    "max_attempts": 5,
+}
+_clients = {}
+_session = None
+_lock = threading.Lock()
+
+
+def configure_clients(max_pool_connections: int | None = None, retry_mode: str | None = None,
+                      max_attempts: int | None = None):
+    """
+    Cambia la configuración por defecto de los clientes que se creen a partir de ahora.
+    Los clientes ya creados no se modifican (ver clear_clients).
+
+    :param max_pool_connections: Tamaño del pool de conexiones HTTP de cada cliente.
+    :param retry_mode: Modo de reintentos de botocore: 'standard', 'adaptive' o 'legacy'.
+    :param max_attempts: Número máximo de intentos por llamada, incluido el primero.
+    """
+    with _lock:
+        if max_pool_connections is not None:
+            _defaults["max_pool_connections"] = max_pool_connections
+        if retry_mode is not None:
+            _defaults["retry_mode"] = retry_mode
+        if max_attempts is not None:
+            _defaults["max_attempts"] = max_attempts
+
+
+def get_client(service_name: str, region_name: str | None = None, max_pool_connections: int | None = None,
+               retry_mode: str | None = None, max_attempts: int | None = None, endpoint_url: str | None = None):
+    """
+    Devuelve un cliente de boto3 compartido por todo el proceso para el servicio, región y configuración
+    indicados, creándolo la primera vez que se pide. Los clientes de boto3 son thread-safe, por lo que
+    pueden usarse desde varios hilos; boto3 se importa aquí, solo cuando se necesita el primer cliente.
+
+    :param service_name: Nombre del servicio de AWS (ej. 's3', 'athena').
+    :param region_name: La región de AWS donde operará el cliente.
+    :param max_pool_connections: Tamaño del pool de conexiones. Por defecto, el de configure_clients().
+    :param retry_mode: Modo de reintentos ('standard' o 'adaptive'). Por defecto, el de configure_clients().
+    :param max_attempts: Número máximo de intentos. Por defecto, el de configure_clients().
+    :param endpoint_url: Endpoint alternativo (ej. un servidor local de pruebas).
+    :return: El cliente de boto3.
+    """
+    key = (
+        service_name,
+        region_name,
+        max_pool_connections or _defaults["max_pool_connections"],
+        retry_mode or _defaults["retry_mode"],
+        max_attempts or _defaults["max_attempts"],
+        endpoint_url,
+    )
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            global _session
+            import boto3
+            from botocore.config import Config
+
+            if _session is None:
+                _session = boto3.session.Session()
+            _, _, pool_size, mode, attempts, _ = key
+            client = _session.client(
+                service_name,
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                config=Config(max_pool_connections=pool_size, retries={"mode": mode, "max_attempts": attempts}),
+            )
+            # Cada llamada del cliente queda medida si hay hooks de instrumentación registrados.
+            _clients[key] = instrument_client(client)
+            logging.info(
+                f"Cliente compartido de '{service_name}' creado en la región {region_name} "
+                f"(pool de {pool_size} conexiones, reintentos '{mode}')."
+            )
+    return client
+
+
+def clear_clients():
+    """Descarta todos los clientes compartidos; los siguientes get_client() crearán clientes nuevos."""
+    global _session
+    with _lock:
+        _clients.clear()
+        _session = None
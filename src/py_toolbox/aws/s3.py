@@ -1,27 +1,87 @@
 # src/py_toolbox/aws/s3.py
 import logging
-import boto3
 from botocore.exceptions import ClientError
 import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .clients import get_client
+from ..utils.lazy_import import lazy_import
+
+MB = 1024 * 1024
+# Máximo de claves que admite una llamada a delete_objects.
+_DELETE_BATCH_SIZE = 1000
+# Número de objetos cuya metadata se mantiene en la caché LRU de cada instancia.
+_METADATA_CACHE_SIZE = 10_000
+# Hasta este número de archivos, upload_from_drive comprueba cada destino con un head_object en lugar de
+# listar el prefijo común (que puede contener muchos más objetos que los que se copian).
+_HEAD_CHECK_MAX_FILES = 100
 
 # Asegúrate de tener pandas y pyarrow instalados si usas el método del dataframe.
 # pip install pandas pyarrow
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
+# pandas se carga de forma diferida, al usarlo por primera vez.
+pd = lazy_import("pandas")
 
 class S3:
     """
     Una clase de utilidad para interactuar con el servicio AWS S3.
     """
-    def __init__(self, region_name: str):
+    def __init__(self, region_name: str, part_size_mb: int = 8, max_concurrency: int = 10,
+                 max_pool_connections: int | None = None, endpoint_url: str | None = None):
         """
-        Inicializa el cliente de S3.
+        Inicializa el cliente de S3 y el perfil de transferencia usado en subidas y descargas.
+        Los archivos mayores que `part_size_mb` se transfieren en partes (multipart / GETs por rangos)
+        de forma concurrente.
+
         :param region_name: La región de AWS donde operará el cliente.
+        :param part_size_mb: Tamaño de cada parte, en MB, y umbral a partir del cual se usa multipart.
+        :param max_concurrency: Número de hilos que transfieren partes en paralelo.
+        :param max_pool_connections: Tamaño del pool de conexiones HTTP. Por defecto, el del registro de
+                                     clientes compartidos (ver py_toolbox.aws.configure_clients).
+        :param endpoint_url: Endpoint alternativo de S3 (ej. un servidor local de moto para pruebas de rendimiento).
         """
-        self.s3_client = boto3.client('s3', region_name=region_name)
-        logging.info(f"Cliente de S3 inicializado en la región {region_name}.")
+        self.region_name = region_name
+        self.part_size_mb = part_size_mb
+        self.max_concurrency = max_concurrency
+        self.max_pool_connections = max_pool_connections
+        self.endpoint_url = endpoint_url
+        self._s3_client = None
+        self._transfer_config = None
+        # Caché LRU (bucket, clave) -> (ETag, metadata de usuario), validada con el ETag de los listados.
+        self._metadata_cache = OrderedDict()
+        self._metadata_cache_lock = threading.Lock()
+        logging.info(
+            f"Cliente de S3 inicializado en la región {region_name} "
+            f"(partes de {part_size_mb} MB, concurrencia {max_concurrency})."
+        )
+
+    @property
+    def s3_client(self):
+        """Cliente de S3 compartido, obtenido del registro de clientes la primera vez que se usa."""
+        if self._s3_client is None:
+            self._s3_client = get_client(
+                's3', self.region_name, max_pool_connections=self.max_pool_connections, endpoint_url=self.endpoint_url,
+            )
+        return self._s3_client
+
+    @s3_client.setter
+    def s3_client(self, client):
+        self._s3_client = client
+
+    @property
+    def transfer_config(self):
+        """Perfil de transferencia (TransferConfig de boto3) usado en subidas, descargas y copias."""
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+
+            self._transfer_config = TransferConfig(
+                multipart_threshold=self.part_size_mb * MB,
+                multipart_chunksize=self.part_size_mb * MB,
+                max_concurrency=self.max_concurrency,
+                use_threads=self.max_concurrency > 1,
+            )
+        return self._transfer_config
 
     def upload_file(self, local_path: str, bucket: str, key: str, extra_args: dict = None) -> bool:
         """
@@ -34,7 +94,8 @@ class S3:
         :return: True si la subida fue exitosa, False en caso contrario.
         """
         try:
-            self.s3_client.upload_file(local_path, bucket, key, ExtraArgs=extra_args or {})
+            self.s3_client.upload_file(local_path, bucket, key, ExtraArgs=extra_args or {}, Config=self.transfer_config)
+            self._invalidate_metadata(bucket, key)
             logging.info(f"Archivo '{local_path}' subido exitosamente a s3://{bucket}/{key}")
             return True
         except ClientError as e:
@@ -54,12 +115,14 @@ class S3:
         :return: True si la subida fue exitosa, False en caso contrario.
         """
         try:
-            self.s3_client.put_object(
-                Bucket=bucket_name,
-                Key=s3_key,
-                Body=json_data.encode('utf-8'),
-                ContentType='application/json'
+            self.s3_client.upload_fileobj(
+                io.BytesIO(json_data.encode('utf-8')),
+                bucket_name,
+                s3_key,
+                ExtraArgs={'ContentType': 'application/json'},
+                Config=self.transfer_config,
             )
+            self._invalidate_metadata(bucket_name, s3_key)
             logging.info(f"Archivo JSON subido exitosamente a s3://{bucket_name}/{s3_key}")
             return True
         except ClientError as e:
@@ -85,7 +148,9 @@ class S3:
             df.to_parquet(out_buffer, index=index, engine='pyarrow')
             out_buffer.seek(0)
             
-            self.s3_client.put_object(Bucket=bucket, Key=key, Body=out_buffer.read())
+            # upload_fileobj lee el buffer por partes y las sube en paralelo, sin hacer una segunda copia completa.
+            self.s3_client.upload_fileobj(out_buffer, bucket, key, Config=self.transfer_config)
+            self._invalidate_metadata(bucket, key)
             
             logging.info(f"DataFrame subido exitosamente como Parquet a s3://{bucket}/{key}")
             return True
@@ -97,6 +162,140 @@ class S3:
             logging.error(f"Fallo al subir el DataFrame como Parquet a S3: {e}", exc_info=True)
             return False
 
+    def write_parquet_dataset(self, frames_or_iterator, bucket: str, prefix: str, partition_cols: list | None = None,
+                              target_file_size: int = 128 * MB, row_group_size: int | None = None, schema=None) -> list:
+        """
+        Escribe uno o varios DataFrames como un dataset Parquet en S3, particionado estilo Hive
+        (prefijo/col=valor/part-....parquet) y consultable directamente desde Athena.
+        Los datos se suben por partes (multipart) a medida que se escriben los row groups, de modo que
+        la memoria usada queda acotada por el bloque en curso y una parte pendiente por archivo abierto.
+
+        :param frames_or_iterator: Un DataFrame o un iterable/generador de DataFrames con el mismo esquema.
+        :param bucket: El nombre del bucket de S3 de destino.
+        :param prefix: Prefijo (carpeta) raíz del dataset.
+        :param partition_cols: Columnas por las que particionar. Se eliminan de los archivos, como espera Hive.
+        :param target_file_size: Tamaño aproximado, en bytes, a partir del cual se cierra un archivo y se abre otro.
+        :param row_group_size: Número máximo de filas por row group. Por defecto, el de pyarrow.
+        :param schema: Esquema de pyarrow de los archivos (sin las columnas de partición). Por defecto se toma del
+                       primer bloque; una columna toda nula en ese bloque toma su tipo del primero que traiga
+                       valores, pero los archivos ya abiertos la conservan como null. Conviene indicarlo cuando
+                       los bloques pueden traer columnas vacías.
+        :return: Lista de claves S3 de los archivos escritos.
+        """
+        if pd is None:
+            raise ImportError("La librería 'pandas' no está instalada. No se puede escribir el dataset.")
+        from .s3_parquet import ParquetDatasetWriter
+        frames = [frames_or_iterator] if isinstance(frames_or_iterator, pd.DataFrame) else frames_or_iterator
+        writer = ParquetDatasetWriter(
+            self.s3_client, bucket, prefix, partition_cols=partition_cols, target_file_size=target_file_size,
+            part_size=self.part_size_mb * MB, row_group_size=row_group_size, schema=schema,
+        )
+        try:
+            for df in frames:
+                writer.write(df)
+            keys = writer.close()
+            self._invalidate_metadata(bucket, *keys)
+        except Exception as e:
+            writer.abort()
+            logging.error(f"Fallo al escribir el dataset Parquet en s3://{bucket}/{prefix}: {e}", exc_info=True)
+            raise e
+        logging.info(f"Dataset Parquet escrito en s3://{bucket}/{prefix} ({len(keys)} archivos).")
+        return keys
+
+    def read_parquet(self, bucket: str, key_or_prefix: str, columns: list | None = None, filters: list | None = None):
+        """
+        Lee un archivo Parquet, o todos los archivos .parquet bajo un prefijo, en un DataFrame.
+        De cada archivo solo se descargan (con GETs por rangos) el footer y los column chunks de las
+        columnas pedidas, y se omiten los row groups cuyas estadísticas descartan los filtros. Los archivos
+        de un prefijo se leen en paralelo y las particiones estilo Hive de su ruta se añaden como columnas.
+
+        :param bucket: El nombre del bucket de S3.
+        :param key_or_prefix: La clave de un archivo Parquet o un prefijo (carpeta) de un dataset.
+        :param columns: Columnas a leer. None para leer todas.
+        :param filters: Lista de condiciones (columna, operador, valor) combinadas con AND, con los operadores
+                        '=', '==', '!=', '<', '<=', '>', '>=', 'in' y 'not in', al estilo de pyarrow.
+        :return: Un DataFrame con las filas que cumplen los filtros.
+        """
+        from .s3_parquet import pa, parse_partition_values, read_parquet_object
+        if pd is None or pa is None:
+            raise ImportError("Las librerías 'pandas' y 'pyarrow' son necesarias para leer Parquet.")
+        filters = [tuple(f) for f in (filters or [])]
+        try:
+            objects = list(self._list_objects(bucket, key_or_prefix))
+            exact = [obj for obj in objects if obj['Key'] == key_or_prefix]
+            if exact:
+                objects = exact
+                prefix = key_or_prefix.rsplit('/', 1)[0] + '/' if '/' in key_or_prefix else ''
+            else:
+                prefix = key_or_prefix
+                objects = [
+                    obj for obj in objects
+                    if obj['Key'].endswith('.parquet') and not obj['Key'].rsplit('/', 1)[-1].startswith(('_', '.'))
+                ]
+            if not objects:
+                logging.warning(f"No se encontraron archivos Parquet en s3://{bucket}/{key_or_prefix}")
+                return pd.DataFrame(columns=columns)
+
+            def read_object(obj):
+                partition_values = {} if exact else parse_partition_values(obj['Key'], prefix)
+                return read_parquet_object(
+                    self.s3_client, bucket, obj['Key'], obj['Size'], columns=columns, filters=filters,
+                    partition_values=partition_values, max_workers=self.max_concurrency,
+                )
+
+            if len(objects) == 1:
+                tables = [read_object(objects[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(objects))) as executor:
+                    tables = list(executor.map(read_object, objects))
+            tables = [t for t in tables if t is not None and t.num_rows]
+            if not tables:
+                return pd.DataFrame(columns=columns)
+            table = pa.concat_tables(tables, promote_options="default") if len(tables) > 1 else tables[0]
+            logging.info(f"Leídas {table.num_rows} filas de {len(objects)} archivos Parquet en s3://{bucket}/{key_or_prefix}")
+            return table.to_pandas()
+        except Exception as e:
+            logging.error(f"Fallo al leer Parquet desde s3://{bucket}/{key_or_prefix}: {e}", exc_info=True)
+            raise e
+
+    def download_file(self, bucket: str, key: str, local_path: str) -> bool:
+        """
+        Descarga un objeto de S3 a una ruta local usando GETs por rangos concurrentes.
+
+        :param bucket: Nombre del bucket de S3 de origen.
+        :param key: La ruta completa del objeto en S3.
+        :param local_path: Ruta local donde se guardará el archivo.
+        :return: True si la descarga fue exitosa, False en caso contrario.
+        """
+        try:
+            self.s3_client.download_file(bucket, key, local_path, Config=self.transfer_config)
+            logging.info(f"Archivo s3://{bucket}/{key} descargado exitosamente en {local_path}")
+            return True
+        except ClientError as e:
+            logging.error(f"Error de cliente al descargar el archivo de S3: {e}", exc_info=True)
+            return False
+        except OSError as e:
+            logging.error(f"No se pudo escribir el archivo local en la ruta {local_path}: {e}", exc_info=True)
+            return False
+
+    def download_to_buffer(self, bucket: str, key: str) -> io.BytesIO | None:
+        """
+        Descarga un objeto de S3 a un buffer en memoria usando GETs por rangos concurrentes.
+
+        :param bucket: Nombre del bucket de S3 de origen.
+        :param key: La ruta completa del objeto en S3.
+        :return: Un BytesIO posicionado al inicio con el contenido del objeto, o None si falla.
+        """
+        try:
+            buffer = io.BytesIO()
+            self.s3_client.download_fileobj(bucket, key, buffer, Config=self.transfer_config)
+            buffer.seek(0)
+            logging.info(f"Objeto s3://{bucket}/{key} descargado a memoria ({buffer.getbuffer().nbytes} bytes).")
+            return buffer
+        except ClientError as e:
+            logging.error(f"Error de cliente al descargar s3://{bucket}/{key} a memoria: {e}", exc_info=True)
+            return None
+
     def get_object_metadata(self, bucket: str, key: str, metadata_key: str, default=None):
         """
         Obtiene un valor de metadato específico de un objeto S3.
@@ -108,8 +307,7 @@ class S3:
         :return: El valor del metadato o el valor por defecto.
         """
         try:
-            head_object = self.s3_client.head_object(Bucket=bucket, Key=key)
-            return head_object.get('Metadata', {}).get(metadata_key, default)
+            return self._get_user_metadata(bucket, key).get(metadata_key, default)
         except ClientError as e:
             if e.response['Error']['Code'] == '404':
                 logging.warning(f"El objeto s3://{bucket}/{key} no fue encontrado para obtener metadata.")
@@ -117,16 +315,90 @@ class S3:
                 logging.error(f"Error al obtener metadata para s3://{bucket}/{key}: {e}", exc_info=True)
             return default
 
+    def _invalidate_metadata(self, bucket: str, *keys: str):
+        """Elimina de la caché de metadata los objetos indicados, tras escribirlos, moverlos o eliminarlos."""
+        with self._metadata_cache_lock:
+            for key in keys:
+                self._metadata_cache.pop((bucket, key), None)
+
+    def _get_user_metadata(self, bucket: str, key: str, etag: str | None = None) -> dict:
+        """
+        Devuelve la metadata de usuario de un objeto. La caché solo se usa si se conoce el ETag actual del
+        objeto (por ejemplo, de un listado) y coincide con el de la entrada; sin ETag siempre se hace un
+        head_object, que además actualiza la caché, para no devolver nunca metadata cambiada fuera del proceso.
+        Lanza ClientError si el head_object falla (ej. 404).
+        """
+        cache_key = (bucket, key)
+        with self._metadata_cache_lock:
+            cached = self._metadata_cache.get(cache_key)
+            if cached is not None and etag is not None and cached[0] == etag:
+                self._metadata_cache.move_to_end(cache_key)
+                return cached[1]
+        head_object = self.s3_client.head_object(Bucket=bucket, Key=key)
+        metadata = head_object.get('Metadata', {})
+        with self._metadata_cache_lock:
+            self._metadata_cache[cache_key] = (head_object.get('ETag'), metadata)
+            self._metadata_cache.move_to_end(cache_key)
+            while len(self._metadata_cache) > _METADATA_CACHE_SIZE:
+                self._metadata_cache.popitem(last=False)
+        return metadata
+
+    def get_objects_metadata(self, bucket: str, keys: list, metadata_keys: list | None = None) -> dict:
+        """
+        Obtiene la metadata de usuario de muchos objetos, lanzando los head_object en paralelo sobre un
+        pool acotado. Los objetos cuyo ETag se conoce reutilizan la caché LRU de la instancia.
+
+        :param bucket: Nombre del bucket.
+        :param keys: Lista de claves, o de diccionarios de list_objects_info / list_objects_v2 (con 'Key' y
+                     'ETag'). La caché solo se usa con los diccionarios, y solo si el ETag no cambió.
+        :param metadata_keys: Claves de metadata a devolver (las ausentes valen None). None para devolver todas.
+        :return: Un diccionario clave -> metadata, con None para los objetos que no existen o fallaron.
+        """
+        items = [(item['Key'], item.get('ETag')) if isinstance(item, dict) else (item, None) for item in keys]
+
+        def fetch(item):
+            key, etag = item
+            try:
+                metadata = self._get_user_metadata(bucket, key, etag)
+            except ClientError as e:
+                if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                    logging.warning(f"El objeto s3://{bucket}/{key} no fue encontrado para obtener metadata.")
+                else:
+                    logging.error(f"Error al obtener metadata para s3://{bucket}/{key}: {e}", exc_info=True)
+                return key, None
+            if metadata_keys is not None:
+                metadata = {name: metadata.get(name) for name in metadata_keys}
+            return key, dict(metadata)
+
+        if not items:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(items))) as executor:
+            return dict(executor.map(fetch, items))
+
+    def list_objects_info(self, bucket: str, prefix: str) -> list:
+        """
+        Lista los objetos bajo un prefijo con su tamaño, ETag y fecha de modificación, usando solo
+        list_objects_v2 (1000 objetos por llamada, sin ningún head_object).
+
+        :param bucket: Nombre del bucket.
+        :param prefix: Prefijo a listar.
+        :return: Lista de diccionarios con 'Key', 'Size', 'ETag' y 'LastModified'.
+        """
+        return [
+            {'Key': obj['Key'], 'Size': obj['Size'], 'ETag': obj.get('ETag'), 'LastModified': obj.get('LastModified')}
+            for obj in self._list_objects(bucket, prefix)
+        ]
+
     def move_file(self, bucket: str, source_key: str, dest_prefix: str):
         """Mueve un archivo a una nueva ubicación (prefijo) dentro del mismo bucket."""
         try:
             file_name = source_key.split('/')[-1]
             dest_key = f"{dest_prefix.strip('/')}/{file_name}"
-            copy_source = {'Bucket': bucket, 'Key': source_key}
             
             logging.info(f"Moviendo de s3://{bucket}/{source_key} a s3://{bucket}/{dest_key}")
-            self.s3_client.copy_object(CopySource=copy_source, Bucket=bucket, Key=dest_key)
+            self._copy_object(bucket, source_key, bucket, dest_key)
             self.s3_client.delete_object(Bucket=bucket, Key=source_key)
+            self._invalidate_metadata(bucket, source_key)
             logging.info("Movimiento completado exitosamente.")
         except Exception as e:
             logging.error(f"Fallo al mover el archivo {source_key}: {e}", exc_info=True)
@@ -136,7 +408,281 @@ class S3:
         """Elimina un archivo de S3."""
         try:
             self.s3_client.delete_object(Bucket=bucket, Key=key)
+            self._invalidate_metadata(bucket, key)
             logging.info(f"Archivo s3://{bucket}/{key} eliminado exitosamente.")
         except Exception as e:
             logging.error(f"Fallo al eliminar el archivo {key}: {e}", exc_info=True)
-            raise e
\ No newline at end of file
+            raise e
+
+    def _list_objects(self, bucket: str, prefix: str):
+        """Genera los objetos (dicts de list_objects_v2 con Key, Size, ETag...) bajo un prefijo, paginando."""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            yield from page.get('Contents', [])
+
+    def _copy_object(self, source_bucket: str, source_key: str, dest_bucket: str, dest_key: str, size: int | None = None):
+        """
+        Copia un objeto del lado del servidor. Los objetos pequeños se copian con un único copy_object;
+        los grandes (o de tamaño desconocido) con la copia gestionada de boto3, que usa upload_part_copy
+        en paralelo y admite objetos de más de 5 GB.
+        """
+        copy_source = {'Bucket': source_bucket, 'Key': source_key}
+        if size is not None and size < self.part_size_mb * MB:
+            self.s3_client.copy_object(CopySource=copy_source, Bucket=dest_bucket, Key=dest_key)
+        else:
+            self.s3_client.copy(copy_source, dest_bucket, dest_key, Config=self.transfer_config)
+        self._invalidate_metadata(dest_bucket, dest_key)
+
+    def _resolve_sources(self, bucket: str, keys: list | None, prefix: str | None) -> list:
+        """Devuelve la lista de (clave, tamaño o None) a partir de una lista de claves o de un prefijo."""
+        if (keys is None) == (prefix is None):
+            raise ValueError("Se debe indicar exactamente uno de 'keys' o 'prefix'.")
+        if keys is not None:
+            return [(key, None) for key in dict.fromkeys(keys)]
+        return [(obj['Key'], obj['Size']) for obj in self._list_objects(bucket, prefix)]
+
+    def copy_many(self, bucket: str, dest_prefix: str, keys: list | None = None, prefix: str | None = None,
+                  dest_bucket: str | None = None) -> dict:
+        """
+        Copia en paralelo, del lado del servidor, una lista de objetos o todos los objetos bajo un prefijo.
+        Con `prefix`, se conserva la ruta relativa de cada objeto bajo `dest_prefix`; con `keys`, solo
+        el nombre del archivo (como en move_file). Los objetos cuyo destino coincide con el de otro (p. ej. dos
+        claves con el mismo nombre en carpetas distintas) o con su propio origen no se copian y se informan
+        como fallidos, de modo que ninguna copia sobrescribe a otra y move_many no elimina su origen.
+
+        :param bucket: Bucket de origen.
+        :param dest_prefix: Prefijo de destino.
+        :param keys: Lista de claves a copiar.
+        :param prefix: Prefijo cuyos objetos se copiarán (alternativa a `keys`).
+        :param dest_bucket: Bucket de destino. Por defecto, el mismo de origen.
+        :return: Un informe {'succeeded': [claves origen], 'failed': {clave origen: mensaje de error}}.
+        """
+        dest_bucket = dest_bucket or bucket
+        report = {'succeeded': [], 'failed': {}}
+
+        def destination(key: str) -> str:
+            relative = key[len(prefix):].lstrip('/') if prefix is not None else key.split('/')[-1]
+            return f"{dest_prefix.strip('/')}/{relative}" if dest_prefix.strip('/') else relative
+
+        by_dest = {}
+        for key, size in self._resolve_sources(bucket, keys, prefix):
+            by_dest.setdefault(destination(key), []).append((key, size, destination(key)))
+        sources = []
+        for dest_key, group in by_dest.items():
+            if len(group) > 1:
+                for key, _, _ in group:
+                    others = ', '.join(other for other, _, _ in group if other != key)
+                    report['failed'][key] = (
+                        f"El destino s3://{dest_bucket}/{dest_key} también corresponde a {others}; "
+                        f"no se copió para que ninguna copia sobrescriba a otra."
+                    )
+            elif dest_bucket == bucket and dest_key == group[0][0]:
+                report['failed'][dest_key] = "El destino coincide con el origen."
+            else:
+                sources.extend(group)
+
+        def copy_one(source):
+            key, size, dest_key = source
+            try:
+                self._copy_object(bucket, key, dest_bucket, dest_key, size)
+                return key, None
+            except Exception as e:
+                return key, str(e)
+
+        if sources:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(sources))) as executor:
+                for key, error in executor.map(copy_one, sources):
+                    if error is None:
+                        report['succeeded'].append(key)
+                    else:
+                        report['failed'][key] = error
+        for key, error in report['failed'].items():
+            logging.error(f"Fallo al copiar s3://{bucket}/{key}: {error}")
+        logging.info(
+            f"Copia a s3://{dest_bucket}/{dest_prefix} finalizada: {len(report['succeeded'])} objetos copiados, "
+            f"{len(report['failed'])} con error."
+        )
+        return report
+
+    def delete_many(self, bucket: str, keys: list | None = None, prefix: str | None = None) -> dict:
+        """
+        Elimina una lista de objetos o todos los objetos bajo un prefijo usando delete_objects
+        en lotes de 1000 claves.
+
+        :param bucket: Nombre del bucket.
+        :param keys: Lista de claves a eliminar.
+        :param prefix: Prefijo cuyos objetos se eliminarán (alternativa a `keys`).
+        :return: Un informe {'succeeded': [claves], 'failed': {clave: mensaje de error}}.
+        """
+        all_keys = [key for key, _ in self._resolve_sources(bucket, keys, prefix)]
+        report = {'succeeded': [], 'failed': {}}
+
+        def delete_batch(batch):
+            self._invalidate_metadata(bucket, *batch)
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=bucket, Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True},
+                )
+                return {error['Key']: f"{error.get('Code')}: {error.get('Message')}" for error in response.get('Errors', [])}
+            except Exception as e:
+                return {key: str(e) for key in batch}
+
+        batches = [all_keys[i:i + _DELETE_BATCH_SIZE] for i in range(0, len(all_keys), _DELETE_BATCH_SIZE)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                for batch, errors in zip(batches, executor.map(delete_batch, batches)):
+                    for key in batch:
+                        if key in errors:
+                            report['failed'][key] = errors[key]
+                        else:
+                            report['succeeded'].append(key)
+        for key, error in report['failed'].items():
+            logging.error(f"Fallo al eliminar s3://{bucket}/{key}: {error}")
+        logging.info(
+            f"Eliminación en s3://{bucket} finalizada: {len(report['succeeded'])} objetos eliminados, "
+            f"{len(report['failed'])} con error."
+        )
+        return report
+
+    def move_many(self, bucket: str, dest_prefix: str, keys: list | None = None, prefix: str | None = None,
+                  dest_bucket: str | None = None) -> dict:
+        """
+        Mueve una lista de objetos o todos los objetos bajo un prefijo: los copia en paralelo del lado del
+        servidor y elimina en lote solo los que se copiaron correctamente.
+
+        :param bucket: Bucket de origen.
+        :param dest_prefix: Prefijo de destino.
+        :param keys: Lista de claves a mover.
+        :param prefix: Prefijo cuyos objetos se moverán (alternativa a `keys`).
+        :param dest_bucket: Bucket de destino. Por defecto, el mismo de origen.
+        :return: Un informe {'succeeded': [claves origen], 'failed': {clave origen: mensaje de error}}.
+        """
+        copy_report = self.copy_many(bucket, dest_prefix, keys=keys, prefix=prefix, dest_bucket=dest_bucket)
+        delete_report = self.delete_many(bucket, keys=copy_report['succeeded']) if copy_report['succeeded'] else {
+            'succeeded': [], 'failed': {},
+        }
+        failed = {**copy_report['failed'], **delete_report['failed']}
+        logging.info(f"Movimiento finalizado: {len(delete_report['succeeded'])} objetos movidos, {len(failed)} con error.")
+        return {'succeeded': delete_report['succeeded'], 'failed': failed}
+
+    def _existing_drive_copies(self, bucket: str, files_by_key: dict) -> dict:
+        """
+        Devuelve la metadata de usuario de los destinos de upload_from_drive que ya existen con el mismo tamaño
+        que el archivo de Drive (los demás hay que transferirlos de todos modos). Con pocos archivos se hace un
+        head_object por clave; con más, se lista solo el prefijo común más largo de las claves y se consulta la
+        metadata de los objetos cuyo tamaño coincide.
+
+        :param bucket: Bucket de destino.
+        :param files_by_key: Diccionario clave de destino -> metadatos del archivo de Drive.
+        :return: Un diccionario clave -> metadata de usuario, solo con los objetos existentes del mismo tamaño.
+        """
+        if not files_by_key:
+            return {}
+
+        def same_size(file_info: dict, size) -> bool:
+            return file_info.get('size') is None or int(file_info['size']) == size
+
+        if len(files_by_key) <= _HEAD_CHECK_MAX_FILES:
+            def head(key: str):
+                try:
+                    response = self.s3_client.head_object(Bucket=bucket, Key=key)
+                except ClientError as e:
+                    # Sin permiso s3:ListBucket, S3 responde 403 en lugar de 404: en la duda, el archivo se transfiere.
+                    if e.response['Error']['Code'] not in ('404', 'NoSuchKey', 'NotFound'):
+                        logging.warning(f"No se pudo comprobar s3://{bucket}/{key}; se transferirá de nuevo: {e}")
+                    return key, None
+                if not same_size(files_by_key[key], response.get('ContentLength')):
+                    return key, None
+                return key, response.get('Metadata', {})
+
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(files_by_key))) as executor:
+                return {key: metadata for key, metadata in executor.map(head, files_by_key) if metadata is not None}
+
+        prefix = os.path.commonprefix(list(files_by_key))
+        existing = [
+            obj for obj in self.list_objects_info(bucket, prefix)
+            if obj['Key'] in files_by_key and same_size(files_by_key[obj['Key']], obj['Size'])
+        ]
+        metadata = self.get_objects_metadata(bucket, existing, ['drive-md5', 'drive-modified-time'])
+        return {key: value for key, value in metadata.items() if value is not None}
+
+    def upload_from_drive(self, drive, file_ids_or_folder, bucket: str, prefix: str, workers: int = 4,
+                          chunk_size: int = 8 * MB, max_buffered_chunks: int = 4, max_depth: int | None = None) -> dict:
+        """
+        Transfiere archivos de Google Drive a S3 sin pasar por el disco local: los bloques descargados de Drive
+        se suben directamente como partes de una carga multipart, a través de un búfer en memoria acotado,
+        de modo que descarga y subida se solapan. El id, md5Checksum y modifiedTime de Drive se guardan como
+        metadata del objeto (drive-id, drive-md5, drive-modified-time) y los archivos cuya copia en S3 ya
+        coincide se omiten (ver _existing_drive_copies para cómo se comprueban sin listar todo el prefijo).
+
+        :param drive: Una instancia de py_toolbox.google.drive.Drive.
+        :param file_ids_or_folder: Una lista de IDs de archivo, o el ID de una carpeta (se conserva la
+                                   estructura de subcarpetas bajo `prefix`).
+        :param bucket: Bucket de destino.
+        :param prefix: Prefijo de destino.
+        :param workers: Número de archivos transferidos en paralelo.
+        :param chunk_size: Tamaño de cada bloque descargado de Drive.
+        :param max_buffered_chunks: Bloques descargados que pueden esperar a ser subidos, por archivo. La memoria
+                                    por transferencia es como máximo max_buffered_chunks * chunk_size más una parte.
+        :param max_depth: Profundidad máxima al recorrer una carpeta (ver Drive.walk).
+        :return: Un informe {'succeeded': [claves], 'skipped': [claves], 'failed': {ID de Drive: mensaje de error}, 'bytes'}.
+        """
+        from .s3_stream import upload_chunks
+
+        files, failed = drive.resolve_files(file_ids_or_folder, max_depth=max_depth, workers=workers)
+        report = {'succeeded': [], 'skipped': [], 'failed': dict(failed), 'bytes': 0}
+        base = prefix.strip('/')
+
+        def dest_key(file_info: dict) -> str:
+            return f"{base}/{file_info['path']}" if base else file_info['path']
+
+        existing_metadata = self._existing_drive_copies(bucket, {dest_key(file_info): file_info for file_info in files})
+        pending = []
+        for file_info in files:
+            metadata = existing_metadata.get(dest_key(file_info))
+            if metadata and metadata.get('drive-md5') == file_info.get('md5Checksum') \
+                    and metadata.get('drive-modified-time') == file_info.get('modifiedTime'):
+                report['skipped'].append(dest_key(file_info))
+            else:
+                pending.append(file_info)
+
+        def transfer(file_info: dict):
+            key = dest_key(file_info)
+            extra_args = {
+                'Metadata': {
+                    'drive-id': file_info['id'],
+                    'drive-md5': file_info.get('md5Checksum') or '',
+                    'drive-modified-time': file_info.get('modifiedTime') or '',
+                },
+                'ContentType': file_info.get('mimeType') or 'application/octet-stream',
+            }
+            try:
+                size = upload_chunks(
+                    drive.iter_media_chunks(file_info, chunk_size), self.s3_client, bucket, key, self.part_size_mb * MB,
+                    max_buffered_chunks=max_buffered_chunks, extra_args=extra_args,
+                    expected_md5=file_info.get('md5Checksum'),
+                )
+                return file_info, key, size, None
+            except Exception as e:
+                return file_info, key, 0, str(e)
+            finally:
+                self._invalidate_metadata(bucket, key)
+
+        logging.info(
+            f"Transferencia de Drive a s3://{bucket}/{base}: {len(pending)} archivos por transferir, "
+            f"{len(report['skipped'])} sin cambios."
+        )
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                for file_info, key, size, error in executor.map(transfer, pending):
+                    if error is None:
+                        report['succeeded'].append(key)
+                        report['bytes'] += size
+                    else:
+                        report['failed'][file_info['id']] = error
+                        logging.error(f"Fallo al transferir '{file_info['path']}' ({file_info['id']}) a s3://{bucket}/{key}: {error}")
+        logging.info(
+            f"Transferencia de Drive a S3 finalizada: {len(report['succeeded'])} archivos transferidos "
+            f"({report['bytes'] / MB:.1f} MB), {len(report['skipped'])} sin cambios, {len(report['failed'])} con error."
+        )
+        return report
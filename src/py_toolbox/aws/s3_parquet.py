@@ -0,0 +1,516 @@
+# src/py_toolbox/aws/s3_parquet.py
+import bisect
+import logging
+import operator
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote
+
+# pandas y pyarrow son necesarios para escribir y leer datasets Parquet.
+# pip install pandas pyarrow
+try:
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pd = None
+    pa = None
+    pq = None
+
+MIN_MULTIPART_PART_SIZE = 5 * 1024 * 1024
+# Valor que Hive/Athena usan para las particiones cuyo valor es nulo.
+HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+# Los rangos de bytes separados por menos de este hueco se piden en un único GET.
+RANGE_COALESCE_GAP = 256 * 1024
+# Bytes finales que se leen de cada archivo para obtener el footer en una sola petición.
+FOOTER_READ_SIZE = 64 * 1024
+
+
+class S3MultipartSink:
+    """
+    Objeto tipo archivo de solo escritura que sube a S3 lo que recibe como una carga multipart.
+    Acumula como máximo `part_size` bytes en memoria antes de subir cada parte.
+    """
+    def __init__(self, s3_client, bucket: str, key: str, part_size: int, extra_args: dict | None = None):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_MULTIPART_PART_SIZE)
+        self.extra_args = extra_args or {}
+        self._buffer = bytearray()
+        self._parts = []
+        self._position = 0
+        self._upload_id = None
+        self.closed = False
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, data) -> int:
+        size = len(data)
+        self._buffer += data
+        self._position += size
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(self.part_size)
+        return size
+
+    def flush(self):
+        pass
+
+    def _upload_part(self, size: int):
+        if self._upload_id is None:
+            response = self.s3_client.create_multipart_upload(Bucket=self.bucket, Key=self.key, **self.extra_args)
+            self._upload_id = response["UploadId"]
+        part_number = len(self._parts) + 1
+        body = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self._upload_id, PartNumber=part_number, Body=body,
+        )
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def close(self):
+        """Sube los bytes pendientes y completa la carga. Los archivos pequeños se suben con un único put_object."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._upload_id is None:
+            self.s3_client.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), **self.extra_args)
+        else:
+            if self._buffer:
+                self._upload_part(len(self._buffer))
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id, MultipartUpload={"Parts": self._parts},
+            )
+        self._buffer = bytearray()
+
+    def abort(self):
+        """Cancela la carga multipart en curso, si la hay, y descarta los bytes pendientes."""
+        self.closed = True
+        self._buffer = bytearray()
+        if self._upload_id is not None:
+            try:
+                self.s3_client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+            except Exception as e:
+                logging.warning(f"No se pudo cancelar la carga multipart de s3://{self.bucket}/{self.key}: {e}")
+
+
+class _PartitionFile:
+    """Un archivo Parquet abierto de una partición: su escritor de pyarrow y su carga multipart."""
+    def __init__(self, s3_client, bucket: str, key: str, schema, part_size: int, compression: str):
+        self.key = key
+        self.sink = S3MultipartSink(s3_client, bucket, key, part_size)
+        self.writer = pq.ParquetWriter(pa.PythonFile(self.sink, mode="w"), schema, compression=compression)
+
+    @property
+    def bytes_written(self) -> int:
+        return self.sink.tell()
+
+    def close(self):
+        self.writer.close()
+        self.sink.close()
+
+    def abort(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+        self.sink.abort()
+
+
+def partition_path(partition_cols: list, values: tuple) -> str:
+    """Construye la ruta de partición estilo Hive ('col1=valor1/col2=valor2') para unos valores dados."""
+    parts = []
+    for column, value in zip(partition_cols, values):
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            value = HIVE_DEFAULT_PARTITION
+        parts.append(f"{column}={quote(str(value), safe='')}")
+    return "/".join(parts)
+
+
+def _conform_table(table, schema):
+    """Ordena y convierte las columnas de una tabla al esquema dado; las columnas que faltan se rellenan con nulos."""
+    extra = [name for name in table.column_names if schema.get_field_index(name) == -1]
+    if extra:
+        raise ValueError(f"El bloque tiene columnas que no están en el esquema del dataset: {extra}")
+    arrays = [
+        table.column(field.name).cast(field.type) if field.name in table.column_names
+        else pa.nulls(table.num_rows, type=field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class ParquetDatasetWriter:
+    """
+    Escribe un dataset Parquet particionado estilo Hive en S3 a partir de DataFrames que llegan por bloques.
+    Cada partición tiene a lo sumo un archivo abierto, que se sube por partes mientras se escribe y se
+    cierra al alcanzar `target_file_size`, abriendo uno nuevo para los siguientes bloques.
+
+    Sin `schema`, el esquema se toma del primer bloque. Una columna que en ese bloque es toda nula (tipo
+    null) toma el tipo del primer bloque que traiga valores: los archivos abiertos hasta entonces se
+    cierran con la columna como null y los siguientes se escriben con el esquema unificado. Cualquier
+    otro cambio de tipo entre bloques es un error. Con `schema` (sin las columnas de partición) todos
+    los archivos usan ese esquema y cada bloque se convierte a él.
+    """
+    def __init__(self, s3_client, bucket: str, prefix: str, partition_cols: list | None = None,
+                 target_file_size: int = 128 * 1024 * 1024, part_size: int = 8 * 1024 * 1024,
+                 row_group_size: int | None = None, compression: str = "snappy", schema=None):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.partition_cols = list(partition_cols or [])
+        self.target_file_size = target_file_size
+        self.part_size = part_size
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.schema = schema
+        self._fixed_schema = schema is not None
+        self.written_keys = []
+        self._open_files = {}  # ruta de partición -> _PartitionFile
+        self._file_counter = 0
+        self._run_id = uuid.uuid4().hex[:12]
+
+    def _new_key(self, partition: str) -> str:
+        self._file_counter += 1
+        name = f"part-{self._run_id}-{self._file_counter:05d}.parquet"
+        return "/".join(p for p in (self.prefix, partition, name) if p)
+
+    def _write_table(self, partition: str, table):
+        if self.schema is None:
+            self.schema = table.schema
+        elif not table.schema.equals(self.schema):
+            if not self._fixed_schema:
+                schema = pa.unify_schemas([self.schema, table.schema])
+                if not schema.equals(self.schema):
+                    # Los archivos abiertos tienen el esquema anterior fijado en su escritor.
+                    logging.info(f"El esquema del dataset en s3://{self.bucket}/{self.prefix} se amplió; se abren archivos nuevos.")
+                    for open_partition in list(self._open_files):
+                        self._close_file(open_partition)
+                    self.schema = schema
+            table = _conform_table(table, self.schema)
+
+        partition_file = self._open_files.get(partition)
+        if partition_file is None:
+            partition_file = _PartitionFile(
+                self.s3_client, self.bucket, self._new_key(partition), self.schema, self.part_size, self.compression,
+            )
+            self._open_files[partition] = partition_file
+        partition_file.writer.write_table(table, row_group_size=self.row_group_size)
+
+        if partition_file.bytes_written >= self.target_file_size:
+            self._close_file(partition)
+
+    def _close_file(self, partition: str):
+        partition_file = self._open_files.pop(partition)
+        partition_file.close()
+        self.written_keys.append(partition_file.key)
+        logging.info(f"Archivo Parquet completado: s3://{self.bucket}/{partition_file.key}")
+
+    def write(self, df):
+        """Escribe un bloque (DataFrame) en las particiones que le correspondan."""
+        if df.empty:
+            return
+        if not self.partition_cols:
+            self._write_table("", pa.Table.from_pandas(df, preserve_index=False))
+            return
+        for values, group in df.groupby(self.partition_cols, dropna=False, sort=False):
+            if not isinstance(values, tuple):
+                values = (values,)
+            data = group.drop(columns=self.partition_cols)
+            self._write_table(partition_path(self.partition_cols, values), pa.Table.from_pandas(data, preserve_index=False))
+
+    def close(self) -> list:
+        """Cierra todos los archivos abiertos y devuelve las claves S3 de todos los archivos escritos."""
+        for partition in list(self._open_files):
+            self._close_file(partition)
+        return self.written_keys
+
+    def abort(self):
+        """Cancela las cargas de los archivos abiertos. Los archivos ya completados no se eliminan."""
+        for partition_file in self._open_files.values():
+            partition_file.abort()
+        self._open_files.clear()
+
+
+class S3RangeFile:
+    """
+    Archivo de solo lectura con acceso aleatorio sobre un objeto de S3. Cada lectura se resuelve con un
+    GET por rangos, salvo las que caen dentro de rangos precargados con `prefetch` (en paralelo).
+    """
+    def __init__(self, s3_client, bucket: str, key: str, size: int, max_workers: int = 8):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.size = size
+        self.max_workers = max_workers
+        self.bytes_fetched = 0
+        self.requests = 0
+        self.closed = False
+        self._position = 0
+        self._block_starts = []
+        self._blocks = []
+        self._lock = threading.Lock()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 0:
+            self._position = offset
+        elif whence == 1:
+            self._position += offset
+        else:
+            self._position = self.size + offset
+        return self._position
+
+    def close(self):
+        self.closed = True
+        self._block_starts = []
+        self._blocks = []
+
+    def _get_range(self, start: int, end: int) -> bytes:
+        """Descarga los bytes [start, end) del objeto."""
+        response = self.s3_client.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={start}-{end - 1}")
+        data = response["Body"].read()
+        with self._lock:
+            self.bytes_fetched += len(data)
+            self.requests += 1
+        return data
+
+    def _store(self, start: int, data: bytes):
+        with self._lock:
+            index = bisect.bisect_left(self._block_starts, start)
+            self._block_starts.insert(index, start)
+            self._blocks.insert(index, data)
+
+    def prefetch(self, ranges: list):
+        """
+        Descarga en paralelo los rangos (inicio, fin) indicados, agrupando los que están próximos,
+        y los guarda para servir las lecturas posteriores sin nuevas peticiones.
+        """
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start - merged[-1][1] <= RANGE_COALESCE_GAP:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        if not merged:
+            return
+
+        def fetch(byte_range):
+            self._store(byte_range[0], self._get_range(*byte_range))
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(merged))) as executor:
+            list(executor.map(fetch, merged))
+
+    def _read_at(self, start: int, end: int) -> bytes:
+        chunks = []
+        position = start
+        while position < end:
+            with self._lock:
+                index = bisect.bisect_right(self._block_starts, position) - 1
+                block_start = self._block_starts[index] if index >= 0 else None
+                block = self._blocks[index] if index >= 0 else None
+                next_start = self._block_starts[index + 1] if index + 1 < len(self._block_starts) else None
+            if block is not None and position < block_start + len(block):
+                piece = block[position - block_start:end - block_start]
+            else:
+                fetch_end = min(end, next_start) if next_start is not None else end
+                piece = self._get_range(position, fetch_end)
+            chunks.append(piece)
+            position += len(piece)
+        return b"".join(chunks)
+
+    def read(self, size: int = -1) -> bytes:
+        end = self.size if size is None or size < 0 else min(self.size, self._position + size)
+        data = self._read_at(self._position, end) if end > self._position else b""
+        self._position += len(data)
+        return data
+
+
+_FILTER_OPERATORS = {
+    "=": operator.eq, "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+
+
+def _may_match(minimum, maximum, op: str, value) -> bool:
+    """Indica si algún valor entre minimum y maximum podría cumplir la condición `op value`."""
+    try:
+        if op in ("=", "=="):
+            return minimum <= value <= maximum
+        if op == "!=":
+            return not (minimum == maximum == value)
+        if op == "<":
+            return minimum < value
+        if op == "<=":
+            return minimum <= value
+        if op == ">":
+            return maximum > value
+        if op == ">=":
+            return maximum >= value
+        if op == "in":
+            return any(minimum <= v <= maximum for v in value)
+    except TypeError:
+        pass
+    return True
+
+
+def _row_group_may_match(row_group, column_indexes: dict, filters: list) -> bool:
+    """Descarta un row group si las estadísticas de alguna de sus columnas excluyen un filtro."""
+    for column, op, value in filters:
+        index = column_indexes.get(column)
+        if index is None:
+            continue
+        statistics = row_group.column(index).statistics
+        if statistics is None or not statistics.has_min_max:
+            continue
+        if not _may_match(statistics.min, statistics.max, op, value):
+            return False
+    return True
+
+
+def _coerce_partition_value(actual: str, value):
+    """Convierte el valor de partición (siempre un string en la ruta) al tipo del valor del filtro."""
+    if isinstance(value, bool):
+        if actual.lower() not in ("true", "false"):
+            raise ValueError(actual)
+        return actual.lower() == "true"
+    if isinstance(value, (int, float)):
+        return type(value)(actual)
+    return actual
+
+
+def _evaluate_partition_filter(actual, op: str, value) -> bool | None:
+    """
+    Evalúa un filtro sobre el valor de partición de un archivo. Devuelve None si no se puede decidir
+    con la ruta (operador desconocido o valor no convertible); en ese caso el filtro se aplica fila a fila.
+    """
+    if actual is None:
+        # Como en SQL y en los filtros de pyarrow, un nulo no cumple ninguna comparación.
+        return False
+    try:
+        if op in ("in", "not in"):
+            present = any(_coerce_partition_value(actual, v) == v for v in value)
+            return present if op == "in" else not present
+        if op in _FILTER_OPERATORS:
+            return bool(_FILTER_OPERATORS[op](_coerce_partition_value(actual, value), value))
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def _prune_partition(partition_values: dict, filters: list) -> tuple[bool, list]:
+    """
+    Evalúa los filtros sobre columnas de partición con los valores de la ruta del archivo. Devuelve si
+    el archivo puede tener filas que cumplan los filtros y los filtros que quedan por aplicar fila a fila:
+    los de columnas que no son de partición y los de partición que no se pudieron decidir.
+    """
+    remaining = []
+    for column, op, value in filters:
+        if column not in partition_values:
+            remaining.append((column, op, value))
+            continue
+        result = _evaluate_partition_filter(partition_values[column], op, value)
+        if result is False:
+            return False, []
+        if result is None:
+            remaining.append((column, op, value))
+    return True, remaining
+
+
+def parse_partition_values(key: str, prefix: str) -> dict:
+    """Extrae los valores de partición estilo Hive ('col=valor') de la ruta de un archivo relativa al prefijo."""
+    relative = key[len(prefix):] if key.startswith(prefix) else key
+    values = {}
+    for segment in relative.strip("/").split("/")[:-1]:
+        column, sep, value = segment.partition("=")
+        if sep:
+            value = unquote(value)
+            values[column] = None if value == HIVE_DEFAULT_PARTITION else value
+    return values
+
+
+def read_parquet_object(s3_client, bucket: str, key: str, size: int, columns: list | None = None,
+                        filters: list | None = None, partition_values: dict | None = None, max_workers: int = 8):
+    """
+    Lee un archivo Parquet de S3 descargando solo el footer y los column chunks necesarios de los
+    row groups cuyas estadísticas no excluyen los filtros. Devuelve una tabla de pyarrow, o None si
+    la partición o ningún row group pueden cumplir los filtros.
+    """
+    partition_values = partition_values or {}
+    may_match, filters = _prune_partition(partition_values, filters or [])
+    if not may_match:
+        return None
+    source = S3RangeFile(s3_client, bucket, key, size, max_workers=max_workers)
+    try:
+        footer_start = max(0, size - FOOTER_READ_SIZE)
+        source.prefetch([(footer_start, size)])
+        parquet_file = pq.ParquetFile(source)
+        metadata = parquet_file.metadata
+
+        file_columns = [metadata.schema.column(i).path.split(".")[0] for i in range(metadata.num_columns)]
+        column_indexes = {}
+        for index, name in enumerate(file_columns):
+            column_indexes.setdefault(name, index)
+        filter_columns = {column for column, _, _ in filters if column in column_indexes}
+        if columns is None:
+            read_columns = None
+        else:
+            read_columns = [c for c in dict.fromkeys(list(columns) + sorted(filter_columns)) if c in column_indexes]
+
+        row_groups = [
+            i for i in range(metadata.num_row_groups)
+            if _row_group_may_match(metadata.row_group(i), column_indexes, filters)
+        ]
+        if not row_groups:
+            return None
+
+        ranges = []
+        for i in row_groups:
+            row_group = metadata.row_group(i)
+            for j, name in enumerate(file_columns):
+                if read_columns is not None and name not in read_columns:
+                    continue
+                chunk = row_group.column(j)
+                start = chunk.data_page_offset
+                if chunk.has_dictionary_page and chunk.dictionary_page_offset:
+                    start = min(start, chunk.dictionary_page_offset)
+                ranges.append((start, start + chunk.total_compressed_size))
+        source.prefetch(ranges)
+
+        table = parquet_file.read_row_groups(row_groups, columns=read_columns, use_threads=True)
+        logging.info(
+            f"Leídos {len(row_groups)}/{metadata.num_row_groups} row groups de s3://{bucket}/{key} "
+            f"({source.bytes_fetched} de {size} bytes en {source.requests} peticiones)."
+        )
+    finally:
+        source.close()
+
+    for column, value in partition_values.items():
+        if column not in table.column_names:
+            table = table.append_column(column, pa.array([value] * table.num_rows, type=pa.string()))
+    missing = sorted({column for column, _, _ in filters if column not in table.column_names})
+    if missing:
+        # Una columna ausente equivale a una columna de nulos, que no cumple ningún filtro.
+        logging.warning(f"s3://{bucket}/{key} no tiene las columnas filtradas {missing}; se descarta el archivo.")
+        return None
+    if filters:
+        table = table.filter(pq.filters_to_expression(filters))
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    return table
@@ -0,0 +1,147 @@
+# src/py_toolbox/aws/s3_stream.py
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from .s3_parquet import S3MultipartSink
+
+# Marca de fin del flujo de bloques en la cola.
+_END = object()
+
+
+class _ChunkProducer(threading.Thread):
+    """
+    Hilo que consume un iterable de bloques (p. ej. una descarga en curso) y los deja en una cola acotada.
+    Si la cola está llena, espera: así la memoria retenida nunca supera `maxsize` bloques.
+    """
+    def __init__(self, chunks: Iterable[bytes], buffer: queue.Queue, name: str):
+        super().__init__(name=name, daemon=True)
+        self.chunks = chunks
+        self.buffer = buffer
+        self.stopped = threading.Event()
+
+    def _put(self, item) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        try:
+            for chunk in self.chunks:
+                if not self._put(chunk):
+                    return
+            self._put(_END)
+        except Exception as e:
+            self._put(e)
+
+
+def upload_chunks(chunks: Iterable[bytes], s3_client, bucket: str, key: str, part_size: int,
+                  max_buffered_chunks: int = 4, extra_args: dict | None = None, expected_md5: str | None = None) -> int:
+    """
+    Sube a S3 un flujo de bloques como una carga multipart, sin escribirlo a disco. Un hilo lee los bloques
+    hacia una cola acotada mientras el hilo actual sube las partes, de modo que la lectura y la subida se
+    solapan. La memoria retenida por flujo es como máximo `max_buffered_chunks` bloques más una parte.
+
+    :param chunks: Iterable de bloques de bytes (por ejemplo, Drive.iter_media_chunks).
+    :param s3_client: Cliente de S3.
+    :param bucket: Bucket de destino.
+    :param key: Clave de destino.
+    :param part_size: Tamaño de cada parte de la carga multipart.
+    :param max_buffered_chunks: Bloques leídos que pueden esperar en la cola a ser subidos.
+    :param extra_args: Argumentos adicionales de create_multipart_upload / put_object (Metadata, ContentType...).
+    :param expected_md5: md5 hexadecimal esperado del contenido. Si no coincide, la carga se cancela.
+    :return: Número de bytes subidos.
+    """
+    buffer = queue.Queue(maxsize=max(1, max_buffered_chunks))
+    producer = _ChunkProducer(chunks, buffer, name=f"s3-stream-{key}")
+    sink = S3MultipartSink(s3_client, bucket, key, part_size, extra_args)
+    digest = hashlib.md5() if expected_md5 else None
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            sink.write(item)
+            if digest is not None:
+                digest.update(item)
+        if digest is not None and digest.hexdigest() != expected_md5:
+            raise IOError(f"El md5 del contenido ({digest.hexdigest()}) no coincide con el esperado ({expected_md5}).")
+        sink.close()
+    except BaseException:
+        producer.stopped.set()
+        sink.abort()
+        logging.warning(f"Se canceló la subida en streaming a s3://{bucket}/{key}.")
+        raise
+    producer.join()
+    return sink.tell()
+
+
+class RangedReader(io.RawIOBase):
+    """
+    Lee un objeto de S3 como un archivo secuencial mediante GETs por rangos en paralelo: mantiene hasta
+    `max_workers` rangos de `part_size` bytes descargándose por delante de la posición de lectura y los
+    entrega en orden. La memoria retenida es como máximo `max_workers` partes más la que se está leyendo,
+    así que sirve para pasar objetos grandes a un parser sin tenerlos completos en memoria.
+
+        with RangedReader(s3_client, bucket, key, size, 8 * MB, 8) as reader:
+            table = pyarrow.csv.read_csv(reader)
+    """
+    def __init__(self, s3_client, bucket: str, key: str, size: int, part_size: int, max_workers: int):
+        super().__init__()
+        self._s3_client = s3_client
+        self._bucket = bucket
+        self._key = key
+        self._size = size
+        self._part_size = part_size
+        self._offsets = iter(range(0, size, part_size))
+        n_parts = -(-size // part_size) if size else 0
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, n_parts)), thread_name_prefix="s3-range")
+        self._pending = deque()
+        self._current = memoryview(b"")
+        for _ in range(max(1, min(max_workers, n_parts))):
+            self._submit_next()
+
+    def _fetch(self, start: int) -> bytes:
+        end = min(start + self._part_size, self._size) - 1
+        response = self._s3_client.get_object(Bucket=self._bucket, Key=self._key, Range=f"bytes={start}-{end}")
+        return response["Body"].read()
+
+    def _submit_next(self):
+        start = next(self._offsets, None)
+        if start is not None:
+            self._pending.append(self._executor.submit(self._fetch, start))
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._current:
+            if not self._pending:
+                return 0
+            self._current = memoryview(self._pending.popleft().result())
+            self._submit_next()
+        n = min(len(buffer), len(self._current))
+        buffer[:n] = self._current[:n]
+        self._current = self._current[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._pending.clear()
+            self._current = memoryview(b"")
+        super().close()
@@ -1,20 +1,287 @@
 # src/py_toolbox/aws/secrets_manager.py
+import copy
 import json
 import logging
-import boto3
+import random
+import threading
+import time
+from concurrent.futures import Future
 from typing import Union
+from .clients import get_client
+
+# Máximo de secretos que admite una llamada a batch_get_secret_value.
+_BATCH_GET_MAX_SECRETS = 20
 
 class SecretsManager:
-    def __init__(self, region_name: str):
-        self.client = boto3.client(service_name='secretsmanager', region_name=region_name)
+    # Espera tras el primer refresco fallido de un secreto; se duplica con cada fallo consecutivo.
+    REFRESH_BACKOFF_INITIAL = 5.0
+    REFRESH_BACKOFF_MAX = 300.0
+
+    def __init__(self, region_name: str, cache_ttl_seconds: float | None = 300,
+                 max_stale_seconds: float | None = 3600):
+        """
+        :param region_name: La región de AWS donde operará el cliente.
+        :param cache_ttl_seconds: Tiempo durante el que un secreto obtenido se considera vigente. Pasado ese
+                                  tiempo se sigue devolviendo el valor en caché mientras se refresca en segundo
+                                  plano. None desactiva la caché (cada llamada consulta Secrets Manager).
+        :param max_stale_seconds: Tiempo máximo, desde que vence, durante el que se sirve un valor vencido si
+                                  los refrescos fallan. Pasado ese tiempo el secreto se pide de forma síncrona
+                                  y, si falla, se lanza el error. None lo sirve indefinidamente.
+        """
+        self.region_name = region_name
+        self._client = None
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self._cache = {}  # nombre -> (valor, instante en que deja de estar vigente)
+        self._in_flight = {}  # nombre -> Future de la petición en curso
+        self._refresh_backoff = {}  # nombre -> (fallos consecutivos, instante del próximo intento permitido)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0, "refresh_failures": 0}
         logging.info(f"Cliente de AWS Secrets Manager inicializado para la región {region_name}.")
 
-    def get_secret(self, secret_name: str) -> Union[dict, None]:
+    @property
+    def client(self):
+        """Cliente de Secrets Manager compartido, obtenido del registro de clientes la primera vez que se usa."""
+        if self._client is None:
+            self._client = get_client('secretsmanager', self.region_name)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    def _fetch_secret(self, secret_name: str) -> dict:
+        get_secret_value_response = self.client.get_secret_value(SecretId=secret_name)
+        secret = get_secret_value_response['SecretString']
+        logging.info(f"Secreto '{secret_name}' obtenido exitosamente de Secrets Manager.")
+        return json.loads(secret)
+
+    def _store(self, secret_name: str, value: dict, ttl_seconds: float | None):
+        ttl = ttl_seconds if ttl_seconds is not None else self.cache_ttl_seconds
+        with self._lock:
+            self._cache[secret_name] = (value, time.monotonic() + ttl)
+            self._refresh_backoff.pop(secret_name, None)
+
+    def _claim(self, secret_name: str) -> tuple[Future, bool]:
+        """
+        Devuelve el Future de la petición en curso de un secreto y False, o registra uno nuevo y devuelve
+        True: quien lo registra debe hacer la petición y completarlo con _settle. Se llama con el lock tomado,
+        en la misma sección que la comprobación de la caché, para que dos hilos nunca pidan el mismo secreto.
+        """
+        future = self._in_flight.get(secret_name)
+        if future is not None:
+            return future, False
+        future = Future()
+        self._in_flight[secret_name] = future
+        return future, True
+
+    def _settle(self, secret_name: str, future: Future, value: dict | None = None, error: Exception | None = None,
+                ttl_seconds: float | None = None):
+        """Guarda en caché el resultado de una petición registrada con _claim y despierta a quienes la esperan."""
+        if error is None:
+            self._store(secret_name, value, ttl_seconds)
+        with self._lock:
+            if self._in_flight.get(secret_name) is future:
+                del self._in_flight[secret_name]
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+
+    def _load(self, secret_name: str, ttl_seconds: float | None) -> dict:
+        """
+        Obtiene un secreto de Secrets Manager y lo guarda en caché. Si ya hay una petición en curso para
+        el mismo secreto (individual, en lote o un refresco en segundo plano), espera su resultado en lugar
+        de lanzar otra.
+        """
+        with self._lock:
+            future, owner = self._claim(secret_name)
+        if not owner:
+            return future.result()
         try:
-            get_secret_value_response = self.client.get_secret_value(SecretId=secret_name)
-            secret = get_secret_value_response['SecretString']
-            logging.info(f"Secreto '{secret_name}' obtenido exitosamente de Secrets Manager.")
-            return json.loads(secret)
+            value = self._fetch_secret(secret_name)
+        except Exception as e:
+            self._settle(secret_name, future, error=e)
+            raise
+        self._settle(secret_name, future, value=value, ttl_seconds=ttl_seconds)
+        return value
+
+    def _refresh_in_background(self, secret_name: str, ttl_seconds: float | None):
+        """
+        Refresca un secreto vencido en un hilo aparte; mientras tanto se sigue sirviendo el valor anterior.
+        Tras un refresco fallido no se intenta otro hasta que pase una espera que crece exponencialmente,
+        para no insistir contra un Secrets Manager caído.
+        """
+        with self._lock:
+            if secret_name in self._in_flight:
+                return
+            failures, next_attempt = self._refresh_backoff.get(secret_name, (0, 0.0))
+            if time.monotonic() < next_attempt:
+                return
+            # Se registra como petición en curso antes de soltar el lock: otra lectura vencida no lanza otro refresco.
+            future, _ = self._claim(secret_name)
+            self._stats["refreshes"] += 1
+
+        def refresh():
+            try:
+                value = self._fetch_secret(secret_name)
+            except Exception as e:
+                delay = min(self.REFRESH_BACKOFF_MAX, self.REFRESH_BACKOFF_INITIAL * 2 ** failures)
+                delay *= random.uniform(0.5, 1)
+                with self._lock:
+                    self._stats["refresh_failures"] += 1
+                    self._refresh_backoff[secret_name] = (failures + 1, time.monotonic() + delay)
+                self._settle(secret_name, future, error=e)
+                logging.warning(
+                    f"No se pudo refrescar el secreto '{secret_name}'; se mantiene el valor en caché y se reintentará "
+                    f"en {delay:.0f}s. Error: {e}"
+                )
+                return
+            self._settle(secret_name, future, value=value, ttl_seconds=ttl_seconds)
+
+        threading.Thread(target=refresh, name=f"secret-refresh-{secret_name}", daemon=True).start()
+
+    def _from_cache(self, secret_name: str, cached: tuple, ttl_seconds: float | None) -> dict:
+        """
+        Devuelve el valor en caché de un secreto. Si está vencido, lanza su refresco en segundo plano; si
+        lleva vencido más de max_stale_seconds, lo pide de forma síncrona (y el error, si lo hay, se propaga).
+        """
+        value, fresh_until = cached
+        now = time.monotonic()
+        if now < fresh_until:
+            return value
+        if self.max_stale_seconds is not None and now - fresh_until >= self.max_stale_seconds:
+            logging.warning(f"El secreto '{secret_name}' en caché venció hace más de {self.max_stale_seconds}s; se pide de nuevo.")
+            return self._load(secret_name, ttl_seconds)
+        self._refresh_in_background(secret_name, ttl_seconds)
+        return value
+
+    def get_secret(self, secret_name: str, ttl_seconds: float | None = None) -> Union[dict, None]:
+        """
+        Obtiene un secreto (JSON) de Secrets Manager, usando la caché en memoria si está activada.
+        Solo la primera obtención de cada secreto bloquea: si el valor en caché está vencido, se devuelve
+        igualmente y se refresca en segundo plano, salvo que lleve vencido más de max_stale_seconds.
+
+        :param secret_name: Nombre o ARN del secreto.
+        :param ttl_seconds: Vigencia en caché de este secreto. Por defecto, cache_ttl_seconds.
+        :return: El secreto deserializado como diccionario.
+        """
+        try:
+            if self.cache_ttl_seconds is None:
+                return self._fetch_secret(secret_name)
+
+            with self._lock:
+                cached = self._cache.get(secret_name)
+                self._stats["hits" if cached is not None else "misses"] += 1
+            if cached is None:
+                return copy.deepcopy(self._load(secret_name, ttl_seconds))
+
+            return copy.deepcopy(self._from_cache(secret_name, cached, ttl_seconds))
         except Exception as e:
             logging.error(f"Error al obtener el secreto '{secret_name}' de Secrets Manager: {e}", exc_info=True)
-            raise e
\ No newline at end of file
+            raise e
+
+    def get_secrets(self, secret_names: list[str], ttl_seconds: float | None = None) -> dict:
+        """
+        Obtiene varios secretos a la vez. Los que no están en caché se piden con batch_get_secret_value
+        (hasta 20 por llamada) en lugar de una llamada por secreto; los que ya se están pidiendo en otro hilo
+        no se vuelven a pedir, se espera esa petición.
+
+        :param secret_names: Lista de nombres o ARNs de secretos.
+        :param ttl_seconds: Vigencia en caché de estos secretos. Por defecto, cache_ttl_seconds.
+        :return: Un diccionario nombre -> secreto deserializado.
+        """
+        results = {}
+        missing = []
+        for secret_name in dict.fromkeys(secret_names):
+            with self._lock:
+                cached = self._cache.get(secret_name) if self.cache_ttl_seconds is not None else None
+            if cached is None:
+                missing.append(secret_name)
+                continue
+            with self._lock:
+                self._stats["hits"] += 1
+            try:
+                results[secret_name] = copy.deepcopy(self._from_cache(secret_name, cached, ttl_seconds))
+            except Exception as e:
+                logging.error(f"Error al obtener el secreto '{secret_name}' de Secrets Manager: {e}", exc_info=True)
+                raise e
+
+        if not missing:
+            return results
+        with self._lock:
+            self._stats["misses"] += len(missing)
+        if self.cache_ttl_seconds is None:
+            try:
+                fetched = self._batch_fetch(missing)
+            except Exception as e:
+                logging.error(f"Error al obtener los secretos {missing} de Secrets Manager: {e}", exc_info=True)
+                raise e
+            results.update(fetched)
+            return results
+
+        with self._lock:
+            claims = {secret_name: self._claim(secret_name) for secret_name in missing}
+        owned = [secret_name for secret_name, (_, owner) in claims.items() if owner]
+        if owned:
+            try:
+                fetched = self._batch_fetch(owned)
+            except Exception as e:
+                for secret_name in owned:
+                    self._settle(secret_name, claims[secret_name][0], error=e)
+                logging.error(f"Error al obtener los secretos {owned} de Secrets Manager: {e}", exc_info=True)
+                raise e
+            for secret_name in owned:
+                if secret_name in fetched:
+                    self._settle(secret_name, claims[secret_name][0], value=fetched[secret_name], ttl_seconds=ttl_seconds)
+                else:
+                    error = Exception(f"Secrets Manager no devolvió el secreto '{secret_name}'.")
+                    self._settle(secret_name, claims[secret_name][0], error=error)
+        for secret_name in missing:
+            try:
+                results[secret_name] = copy.deepcopy(claims[secret_name][0].result())
+            except Exception as e:
+                logging.error(f"Error al obtener el secreto '{secret_name}' de Secrets Manager: {e}", exc_info=True)
+                raise e
+        return results
+
+    def _batch_fetch(self, secret_names: list[str]) -> dict:
+        """Obtiene varios secretos con batch_get_secret_value. Lanza una excepción si alguno falla."""
+        if not hasattr(self.client, 'batch_get_secret_value'):
+            # Versiones antiguas de botocore no incluyen la operación: se piden uno a uno.
+            return {secret_name: self._fetch_secret(secret_name) for secret_name in secret_names}
+        values = {}
+        errors = {}
+        for start in range(0, len(secret_names), _BATCH_GET_MAX_SECRETS):
+            batch = secret_names[start:start + _BATCH_GET_MAX_SECRETS]
+            params = {'SecretIdList': batch}
+            while True:
+                response = self.client.batch_get_secret_value(**params)
+                for secret in response.get('SecretValues', []):
+                    # El secreto pudo pedirse por nombre o por ARN: se devuelve con el identificador pedido.
+                    secret_id = secret['ARN'] if secret['ARN'] in batch else secret['Name']
+                    values[secret_id] = json.loads(secret['SecretString'])
+                for error in response.get('Errors', []):
+                    errors[error['SecretId']] = f"{error.get('ErrorCode')}: {error.get('Message')}"
+                if not response.get('NextToken'):
+                    break
+                params['NextToken'] = response['NextToken']
+        if errors:
+            raise Exception(f"No se pudieron obtener algunos secretos: {errors}")
+        logging.info(f"{len(values)} secretos obtenidos exitosamente de Secrets Manager en lote.")
+        return values
+
+    def invalidate(self, secret_name: str | None = None):
+        """Elimina de la caché un secreto (o todos, si no se indica ninguno) para forzar su próxima lectura."""
+        with self._lock:
+            if secret_name is None:
+                self._cache.clear()
+                self._refresh_backoff.clear()
+            else:
+                self._cache.pop(secret_name, None)
+                self._refresh_backoff.pop(secret_name, None)
+
+    def cache_stats(self) -> dict:
+        """Devuelve los contadores de la caché: aciertos, fallos, refrescos en segundo plano y refrescos fallidos."""
+        with self._lock:
+            return dict(self._stats)
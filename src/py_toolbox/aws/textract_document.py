@@ -0,0 +1,174 @@
+# src/py_toolbox/aws/textract_document.py
+from __future__ import annotations
+
+import logging
+from array import array
+from typing import Iterable
+
+from ..utils.lazy_import import lazy_import
+
+# pandas se carga de forma diferida, solo al extraer tablas como DataFrames.
+pd = lazy_import("pandas")
+
+BLOCK_TYPES = (
+    "PAGE", "LINE", "WORD", "TABLE", "CELL", "MERGED_CELL", "KEY_VALUE_SET", "SELECTION_ELEMENT",
+    "TABLE_TITLE", "TABLE_FOOTER", "QUERY", "QUERY_RESULT", "SIGNATURE", "LAYOUT_TEXT", "OTHER",
+)
+_BLOCK_TYPE_CODES = {name: code for code, name in enumerate(BLOCK_TYPES)}
+_OTHER = _BLOCK_TYPE_CODES["OTHER"]
+_NO_INDEX = -1
+
+# Marcas de entidad de los bloques KEY_VALUE_SET.
+_ENTITY_NONE, _ENTITY_KEY, _ENTITY_VALUE = 0, 1, 2
+
+
+class TextractDocument:
+    """
+    Modelo compacto e indexado de los bloques de un análisis de Textract. Los campos de cada bloque se
+    guardan en arrays columnares (no en un dict por bloque) y las relaciones CHILD y VALUE se resuelven
+    una única vez a índices, de modo que reconstruir tablas y formularios es lineal en el número de bloques.
+    """
+    __slots__ = (
+        "ids", "id_to_index", "_types", "_pages", "_texts", "_confidences", "_entities",
+        "_row_indexes", "_column_indexes", "_child_offsets", "_children", "_values",
+    )
+
+    def __init__(self):
+        self.ids = []
+        self.id_to_index = {}
+        self._types = array("B")
+        self._pages = array("I")
+        self._texts = []
+        self._confidences = array("f")
+        self._entities = array("B")
+        self._row_indexes = array("I")
+        self._column_indexes = array("I")
+        # Hijos (relación CHILD) en formato CSR: los hijos del bloque i son _children[_child_offsets[i]:_child_offsets[i + 1]].
+        self._child_offsets = array("I", [0])
+        self._children = array("i")
+        # Para cada bloque KEY, el índice de su bloque VALUE (o -1).
+        self._values = array("i")
+
+    @classmethod
+    def from_blocks(cls, blocks: Iterable[dict]) -> "TextractDocument":
+        """
+        Construye el modelo a partir de bloques de Textract (una lista o un generador, como
+        TextractProcessor.iter_blocks). Los bloques se consumen uno a uno y no se retienen.
+        """
+        document = cls()
+        child_ids = []
+        value_ids = []
+        for block in blocks:
+            index = len(document.ids)
+            document.ids.append(block["Id"])
+            document.id_to_index[block["Id"]] = index
+            block_type = block.get("BlockType")
+            document._types.append(_BLOCK_TYPE_CODES.get(block_type, _OTHER))
+            document._pages.append(block.get("Page", 1))
+            document._confidences.append(block.get("Confidence", 0.0))
+            document._row_indexes.append(block.get("RowIndex", 0))
+            document._column_indexes.append(block.get("ColumnIndex", 0))
+            if block_type == "SELECTION_ELEMENT":
+                document._texts.append("[X]" if block.get("SelectionStatus") == "SELECTED" else "[ ]")
+            else:
+                document._texts.append(block.get("Text"))
+            entity_types = block.get("EntityTypes") or ()
+            document._entities.append(
+                _ENTITY_KEY if "KEY" in entity_types else _ENTITY_VALUE if "VALUE" in entity_types else _ENTITY_NONE
+            )
+
+            value_id = None
+            for relationship in block.get("Relationships") or ():
+                if relationship["Type"] == "CHILD":
+                    child_ids.extend(relationship["Ids"])
+                elif relationship["Type"] == "VALUE" and relationship["Ids"]:
+                    value_id = relationship["Ids"][0]
+            document._child_offsets.append(len(child_ids))
+            value_ids.append(value_id)
+
+        # Las relaciones pueden apuntar a bloques que llegan después, por eso se resuelven al final.
+        id_to_index = document.id_to_index
+        document._children = array("i", (id_to_index.get(child_id, _NO_INDEX) for child_id in child_ids))
+        document._values = array("i", (
+            id_to_index.get(value_id, _NO_INDEX) if value_id is not None else _NO_INDEX for value_id in value_ids
+        ))
+        logging.info(f"Documento de Textract indexado con {len(document.ids)} bloques.")
+        return document
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def block_type(self, index: int) -> str:
+        return BLOCK_TYPES[self._types[index]]
+
+    def page(self, index: int) -> int:
+        return self._pages[index]
+
+    def confidence(self, index: int) -> float:
+        return self._confidences[index]
+
+    def children(self, index: int) -> array:
+        """Índices de los bloques hijos (relación CHILD) del bloque indicado."""
+        return self._children[self._child_offsets[index]:self._child_offsets[index + 1]]
+
+    def text(self, index: int) -> str:
+        """Texto del bloque: el propio si lo tiene (WORD, LINE) o el de sus palabras hijas (CELL, KEY, VALUE)."""
+        own_text = self._texts[index]
+        if own_text is not None:
+            return own_text
+        words = [self._texts[child] for child in self.children(index) if child != _NO_INDEX and self._texts[child]]
+        return " ".join(words)
+
+    def indexes_of_type(self, block_type: str) -> list[int]:
+        code = _BLOCK_TYPE_CODES[block_type]
+        return [index for index, value in enumerate(self._types) if value == code]
+
+    def table_rows(self, table_index: int) -> list[list[str]]:
+        """Devuelve la tabla indicada como una lista de filas de textos, ordenadas por RowIndex/ColumnIndex."""
+        cell_code = _BLOCK_TYPE_CODES["CELL"]
+        cells = [c for c in self.children(table_index) if c != _NO_INDEX and self._types[c] == cell_code]
+        if not cells:
+            return []
+        n_rows = max(self._row_indexes[c] for c in cells)
+        n_columns = max(self._column_indexes[c] for c in cells)
+        rows = [[""] * n_columns for _ in range(n_rows)]
+        for cell in cells:
+            rows[self._row_indexes[cell] - 1][self._column_indexes[cell] - 1] = self.text(cell)
+        return rows
+
+    def tables(self, header: bool = True) -> list:
+        """
+        Extrae todas las tablas del documento como DataFrames.
+
+        :param header: Si es True, la primera fila de cada tabla se usa como nombres de columna.
+        :return: Una lista de DataFrames, en el orden en que aparecen las tablas.
+        """
+        frames = []
+        for table_index in self.indexes_of_type("TABLE"):
+            rows = self.table_rows(table_index)
+            if header and rows:
+                frames.append(pd.DataFrame(rows[1:], columns=rows[0]))
+            else:
+                frames.append(pd.DataFrame(rows))
+        return frames
+
+    def form_pairs(self) -> list[tuple[str, str]]:
+        """Devuelve los pares (clave, valor) de formulario en el orden del documento, incluidas claves repetidas."""
+        pairs = []
+        for index, entity in enumerate(self._entities):
+            if entity != _ENTITY_KEY:
+                continue
+            value_index = self._values[index]
+            value = self.text(value_index) if value_index != _NO_INDEX else ""
+            pairs.append((self.text(index), value))
+        return pairs
+
+    def forms(self) -> dict:
+        """
+        Extrae los campos de formulario (KEY_VALUE_SET) como un diccionario clave -> valor.
+        Si una clave se repite, se conserva su primera aparición (ver form_pairs para obtenerlas todas).
+        """
+        fields = {}
+        for key, value in self.form_pairs():
+            fields.setdefault(key, value)
+        return fields
@@ -1,18 +1,98 @@
 # src/py_toolbox/aws/textract_processor.py
+import hashlib
 import logging
-import boto3
+import random
+import threading
 import time
 import json
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator
+from botocore.exceptions import ClientError
+from .clients import get_client
+from ..utils.instrumentation import record_event
+from .textract_document import TextractDocument
+
+# Códigos de error con los que Textract indica que se superó su límite de peticiones o de trabajos.
+_THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "LimitExceededException",
+    "TooManyRequestsException",
+}
+_TERMINAL_JOB_STATES = {"SUCCEEDED", "FAILED", "PARTIAL_SUCCESS"}
+
+
+class _TokenBucket:
+    """
+    Limitador de peticiones por segundo compartido entre hilos. Cuando Textract responde con un error
+    de throttling, la tasa se reduce a la mitad; cada petición exitosa la recupera poco a poco hasta
+    el máximo configurado.
+    """
+    def __init__(self, max_tps: float):
+        self.max_tps = max_tps
+        self.rate = max_tps
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_tps, self.rate + 0.05 * self.max_tps)
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(self.max_tps / 20, self.rate / 2)
+            self._tokens = 0.0
 
 class TextractProcessor:
     """
     Una clase para orquestar el análisis de documentos PDF usando AWS Textract.
     """
+    # Pausas (en segundos) del backoff exponencial al consultar el estado de un trabajo.
+    POLL_INITIAL_DELAY = 1.0
+    POLL_MAX_DELAY = 30.0
     def __init__(self, region_name: str):
-        self.textract_client = boto3.client("textract", region_name=region_name)
-        self.s3_client = boto3.client("s3", region_name=region_name)
+        self.region_name = region_name
+        self._textract_client = None
+        self._s3_client = None
         logging.info(f"TextractProcessor inicializado en la región {region_name}.")
 
+    @property
+    def textract_client(self):
+        """Cliente de Textract compartido, obtenido del registro de clientes la primera vez que se usa."""
+        if self._textract_client is None:
+            self._textract_client = get_client("textract", self.region_name)
+        return self._textract_client
+
+    @textract_client.setter
+    def textract_client(self, client):
+        self._textract_client = client
+
+    @property
+    def s3_client(self):
+        """Cliente de S3 compartido (el mismo que usan S3 y Athena en esta región)."""
+        if self._s3_client is None:
+            self._s3_client = get_client("s3", self.region_name)
+        return self._s3_client
+
+    @s3_client.setter
+    def s3_client(self, client):
+        self._s3_client = client
+
     def _upload_to_s3(self, local_pdf_path: str, bucket_name: str, s3_key: str) -> bool:
         """Sube el archivo PDF a S3."""
         try:
@@ -37,38 +117,208 @@ class TextractProcessor:
             logging.error(f"Error al iniciar el análisis de Textract: {e}")
             return None
 
+    def _next_poll_delay(self, delay: float | None) -> float:
+        """Devuelve la siguiente pausa del backoff exponencial, con jitter, partiendo de la anterior."""
+        delay = self.POLL_INITIAL_DELAY if delay is None else min(delay * 2, self.POLL_MAX_DELAY)
+        return delay / 2 + random.uniform(0, delay / 2)
+
     def wait_for_job_completion(self, job_id: str):
         """Espera a que un trabajo de Textract finalice."""
         logging.info("Esperando a que el trabajo de Textract finalice. Esto puede tardar varios minutos...")
+        delay = None
         while True:
-            response = self.textract_client.get_document_analysis(JobId=job_id)
+            response = self.textract_client.get_document_analysis(JobId=job_id, MaxResults=1)
+            record_event("textract", "polls")
             status = response['JobStatus']
             logging.info(f"Estado del trabajo: {status}")
-            if status in ['SUCCEEDED', 'FAILED']:
+            if status in _TERMINAL_JOB_STATES:
                 break
-            time.sleep(15) # Pausa de 15 segundos entre verificaciones
+            delay = self._next_poll_delay(delay)
+            time.sleep(delay) # Backoff exponencial entre verificaciones
         
         if status != 'SUCCEEDED':
             raise Exception(f"El trabajo de Textract falló. Estado final: {status}")
         logging.info("El trabajo de Textract finalizó con éxito.")
 
-    def get_full_results(self, job_id: str) -> list[dict]:
-        """Obtiene todos los resultados paginados de un trabajo de Textract."""
-        logging.info("Obteniendo resultados completos de Textract...")
-        all_blocks = []
+    def iter_blocks(self, job_id: str) -> Iterator[dict]:
+        """
+        Genera los bloques de un trabajo de Textract a medida que llegan las páginas de resultados,
+        sin acumular el documento completo en memoria.
+        """
+        return self._iter_blocks(job_id)
+
+    def _iter_blocks(self, job_id: str, limiter: _TokenBucket | None = None) -> Iterator[dict]:
+        """
+        Paginación de los resultados de un trabajo, compartida por iter_blocks, get_full_results y
+        process_documents. Con `limiter`, cada página pasa por el limitador de peticiones (ver _call_with_rate_limit).
+        """
         next_token = None
-        
+        n_blocks = 0
         while True:
             params = {'JobId': job_id}
             if next_token:
                 params['NextToken'] = next_token
-            
-            response = self.textract_client.get_document_analysis(**params)
-            all_blocks.extend(response.get('Blocks', []))
-            
+
+            if limiter is None:
+                response = self.textract_client.get_document_analysis(**params)
+            else:
+                response = self._call_with_rate_limit(limiter, self.textract_client.get_document_analysis, **params)
+            blocks = response.get('Blocks', [])
+            n_blocks += len(blocks)
+            yield from blocks
+
             next_token = response.get('NextToken')
             if not next_token:
                 break
-        
-        logging.info(f"Se obtuvieron {len(all_blocks)} bloques de Textract.")
-        return all_blocks
\ No newline at end of file
+        logging.info(f"Se obtuvieron {n_blocks} bloques de Textract.")
+
+    def get_full_results(self, job_id: str) -> list[dict]:
+        """Obtiene todos los resultados paginados de un trabajo de Textract."""
+        logging.info("Obteniendo resultados completos de Textract...")
+        return list(self.iter_blocks(job_id))
+
+    def get_document(self, job_id: str) -> TextractDocument:
+        """
+        Obtiene los resultados de un trabajo de Textract como un TextractDocument: un modelo compacto
+        e indexado que se construye a medida que llegan los bloques y permite extraer tablas y formularios
+        en tiempo lineal.
+        """
+        logging.info("Construyendo el documento indexado a partir de los resultados de Textract...")
+        return TextractDocument.from_blocks(self.iter_blocks(job_id))
+
+    def _call_with_rate_limit(self, limiter: _TokenBucket, operation, **params) -> dict:
+        """
+        Llama a una operación de Textract respetando el limitador de peticiones. Los errores de throttling
+        no se propagan: reducen la tasa del limitador y la llamada se reintenta.
+        """
+        attempt = 0
+        while True:
+            limiter.acquire()
+            try:
+                response = operation(**params)
+                limiter.on_success()
+                return response
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in _THROTTLING_ERROR_CODES:
+                    raise
+                limiter.on_throttle()
+                record_event("textract", "retries")
+                attempt += 1
+                logging.warning(f"Textract limitó la petición (intento {attempt}); se reduce la tasa a {limiter.rate:.2f} TPS.")
+                time.sleep(min(self.POLL_MAX_DELAY, 0.5 * 2 ** min(attempt, 6)) * random.uniform(0.5, 1))
+
+    def process_documents(self, local_pdf_paths: list, bucket_name: str, s3_prefix: str,
+                          max_concurrent_jobs: int = 10, max_tps: float = 2.0,
+                          upload_workers: int = 8) -> Iterator[dict]:
+        """
+        Analiza muchos PDFs locales con Textract de forma concurrente: los sube a S3 en paralelo, inicia
+        trabajos de start_document_analysis sin superar `max_concurrent_jobs` en curso, consulta el estado
+        de todos con backoff exponencial y devuelve los bloques de cada documento en cuanto su trabajo termina.
+        Todas las llamadas a Textract pasan por un limitador de `max_tps` peticiones por segundo que se
+        frena automáticamente cuando Textract responde con errores de throttling.
+
+        :param local_pdf_paths: Rutas de los PDFs a analizar.
+        :param bucket_name: Bucket de S3 donde se suben los PDFs.
+        :param s3_prefix: Prefijo de S3 bajo el que se suben los PDFs. Cada PDF va en una subcarpeta propia,
+                          derivada de su ruta local, para que dos archivos con el mismo nombre no se pisen.
+        :param max_concurrent_jobs: Número máximo de trabajos de Textract en curso a la vez.
+        :param max_tps: Peticiones por segundo máximas hacia Textract.
+        :param upload_workers: Número de subidas a S3 en paralelo.
+        :return: Un generador de diccionarios, en orden de finalización, con las claves 'Path', 'JobId',
+                 'Status', 'Blocks' (None si falló) y 'Error' (None si tuvo éxito).
+        """
+        limiter = _TokenBucket(max_tps)
+        prefix = s3_prefix.strip('/')
+
+        def result(path, job_id, status, blocks=None, error=None):
+            return {"Path": path, "JobId": job_id, "Status": status, "Blocks": blocks, "Error": error}
+
+        def upload(path):
+            path_hash = hashlib.sha256(str(Path(path).resolve()).encode()).hexdigest()[:16]
+            s3_key = f"{path_hash}/{Path(path).name}"
+            if prefix:
+                s3_key = f"{prefix}/{s3_key}"
+            self.s3_client.upload_file(str(path), bucket_name, s3_key)
+            return s3_key
+
+        def fetch_blocks(job_id):
+            return list(self._iter_blocks(job_id, limiter))
+
+        ready = deque()  # (ruta, clave S3) subidos y pendientes de iniciar
+        running = {}  # JobId -> [ruta, instante del próximo sondeo, última pausa]
+        fetching = {}  # Future -> (ruta, JobId, estado)
+
+        with ThreadPoolExecutor(max_workers=upload_workers) as upload_executor, \
+                ThreadPoolExecutor(max_workers=max_concurrent_jobs) as fetch_executor:
+            uploads = {upload_executor.submit(upload, path): path for path in local_pdf_paths}
+
+            while uploads or ready or running or fetching:
+                for future in [f for f in uploads if f.done()]:
+                    path = uploads.pop(future)
+                    try:
+                        ready.append((path, future.result()))
+                    except Exception as e:
+                        logging.error(f"Error al subir el archivo {path} a S3: {e}")
+                        yield result(path, None, "FAILED", error=str(e))
+
+                while ready and len(running) < max_concurrent_jobs:
+                    path, s3_key = ready.popleft()
+                    try:
+                        response = self._call_with_rate_limit(
+                            limiter, self.textract_client.start_document_analysis,
+                            DocumentLocation={'S3Object': {'Bucket': bucket_name, 'Name': s3_key}},
+                            FeatureTypes=['TABLES', 'FORMS'],
+                        )
+                    except Exception as e:
+                        logging.error(f"Error al iniciar el análisis de Textract para {path}: {e}")
+                        yield result(path, None, "FAILED", error=str(e))
+                        continue
+                    delay = self._next_poll_delay(None)
+                    running[response['JobId']] = [path, time.monotonic() + delay, delay]
+                    logging.info(f"Trabajo de análisis de Textract iniciado para {path} con JobId: {response['JobId']}")
+
+                for future in [f for f in fetching if f.done()]:
+                    path, job_id, status = fetching.pop(future)
+                    try:
+                        yield result(path, job_id, status, blocks=future.result())
+                    except Exception as e:
+                        logging.error(f"Error al obtener los resultados de Textract para {path}: {e}")
+                        yield result(path, job_id, "FAILED", error=str(e))
+
+                now = time.monotonic()
+                due = [job_id for job_id, (_, next_poll, _) in running.items() if next_poll <= now]
+                for job_id in due:
+                    path, _, delay = running[job_id]
+                    try:
+                        response = self._call_with_rate_limit(
+                            limiter, self.textract_client.get_document_analysis, JobId=job_id, MaxResults=1,
+                        )
+                        record_event("textract", "polls")
+                    except Exception as e:
+                        del running[job_id]
+                        logging.error(f"Error al consultar el trabajo de Textract {job_id}: {e}")
+                        yield result(path, job_id, "FAILED", error=str(e))
+                        continue
+                    status = response['JobStatus']
+                    if status not in _TERMINAL_JOB_STATES:
+                        delay = self._next_poll_delay(delay)
+                        running[job_id] = [path, time.monotonic() + delay, delay]
+                        continue
+                    del running[job_id]
+                    logging.info(f"El trabajo de Textract {job_id} ({path}) finalizó con estado: {status}")
+                    if status == 'FAILED':
+                        yield result(path, job_id, status, error=response.get('StatusMessage', 'Sin motivo informado.'))
+                    else:
+                        future = fetch_executor.submit(fetch_blocks, job_id)
+                        fetching[future] = (path, job_id, status)
+
+                # Espera hasta el próximo evento: un sondeo pendiente, o el fin de una subida o de una lectura.
+                pending_futures = list(uploads) + list(fetching)
+                next_poll = min((next_poll for _, next_poll, _ in running.values()), default=None)
+                timeout = max(0.0, next_poll - time.monotonic()) if next_poll is not None else None
+                if ready and len(running) < max_concurrent_jobs:
+                    timeout = 0.0
+                if pending_futures:
+                    wait(pending_futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                elif timeout:
+                    time.sleep(timeout)
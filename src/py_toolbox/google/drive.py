@@ -1,35 +1,118 @@
 # src/py_toolbox/google/drive.py
 import os
 import io
+import hashlib
+import json
 import logging
-from typing import Union
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Iterator, Union
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 from googleapiclient.errors import HttpError
+from ..utils.instrumentation import record_event, timed
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+# Estados HTTP de las subpeticiones de un lote que indican límite de cuota o error transitorio; se reintentan.
+_RETRYABLE_STATUS_CODES = {403, 429, 500, 502, 503, 504}
+# Campos de archivo necesarios para descargar y detectar cambios.
+_DOWNLOAD_FIELDS = 'id, name, mimeType, md5Checksum, modifiedTime, size'
+# Archivo de manifiesto que download_many guarda en el directorio de destino.
+MANIFEST_FILE_NAME = '.drive_manifest.json'
+MB = 1024 * 1024
+# Caracteres que no pueden aparecer en un componente de ruta local (separadores, caracteres de control y,
+# en Windows, los reservados por el sistema de archivos).
+_UNSAFE_PATH_CHARS = re.compile(r'[\x00-\x1f/\\<>:"|?*]' if os.name == 'nt' else r'[\x00-\x1f/\\]')
+
+
+def _safe_path_component(name: str) -> str:
+    """Convierte un nombre de Drive en un componente de ruta local válido que no sale de su carpeta."""
+    component = _UNSAFE_PATH_CHARS.sub('_', name).strip()
+    if os.name == 'nt':
+        component = component.rstrip('. ')
+    if component in ('', '.', '..'):
+        component = component.replace('.', '_') or '_'
+    return component
+
 
 class Drive:
     """
     Una clase de utilidad para interactuar con la API de Google Drive.
     """
-    def __init__(self, credentials_dict: dict):
+    # Máximo de subpeticiones por lote de la API de Drive (el límite documentado es 100).
+    BATCH_SIZE = 50
+    # Intentos de listar una carpeta antes de dar el error por definitivo.
+    MAX_LIST_ATTEMPTS = 5
+    # Reintentos de googleapiclient para cada bloque descargado.
+    DOWNLOAD_NUM_RETRIES = 5
+
+    def __init__(self, credentials_dict: dict, folder_cache_size: int = 1024, folder_cache_ttl_seconds: float = 600):
         """
         Inicializa el cliente de Google Drive usando un diccionario de credenciales.
         
         :param credentials_dict: Un diccionario que contiene las credenciales de la cuenta de servicio de Google.
+        :param folder_cache_size: Número máximo de IDs de carpeta (padre, nombre) -> ID recordados.
+        :param folder_cache_ttl_seconds: Vigencia de cada ID de carpeta recordado.
         """
+        self.folder_cache_size = folder_cache_size
+        self.folder_cache_ttl_seconds = folder_cache_ttl_seconds
+        self._folder_cache = OrderedDict()  # (padre, nombre) -> (ID, instante de expiración)
+        self._folder_cache_lock = threading.Lock()
+        # El objeto http de googleapiclient no es seguro entre hilos: cada hilo de trabajo usa su propio servicio.
+        self._thread_local = threading.local()
         self.service = self._create_drive_service(credentials_dict)
         logging.info("Servicio de Google Drive inicializado correctamente.")
 
     def _create_drive_service(self, credentials_dict: dict):
         """Método privado para construir el objeto de servicio de la API de Drive."""
         try:
-            credentials = service_account.Credentials.from_service_account_info(credentials_dict)
-            return build('drive', 'v3', credentials=credentials)
+            self._credentials = service_account.Credentials.from_service_account_info(credentials_dict)
+            return self._build_service()
         except Exception as e:
             logging.error(f"No se pudo crear el servicio de Google Drive: {e}", exc_info=True)
             raise e
 
+    def _build_service(self):
+        return build('drive', 'v3', credentials=self._credentials, cache_discovery=False)
+
+    def _thread_service(self):
+        """Devuelve el servicio de Drive del hilo actual, creándolo la primera vez."""
+        service = getattr(self._thread_local, 'service', None)
+        if service is None:
+            service = self._build_service()
+            self._thread_local.service = service
+        return service
+
+    def _cache_folder_id(self, parent_folder_id: str, folder_name: str, folder_id: str):
+        with self._folder_cache_lock:
+            key = (parent_folder_id, folder_name)
+            self._folder_cache[key] = (folder_id, time.monotonic() + self.folder_cache_ttl_seconds)
+            self._folder_cache.move_to_end(key)
+            while len(self._folder_cache) > self.folder_cache_size:
+                self._folder_cache.popitem(last=False)
+
+    def _cached_folder_id(self, parent_folder_id: str, folder_name: str) -> Union[str, None]:
+        with self._folder_cache_lock:
+            key = (parent_folder_id, folder_name)
+            entry = self._folder_cache.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._folder_cache[key]
+                return None
+            self._folder_cache.move_to_end(key)
+            return entry[0]
+
+    def clear_folder_cache(self):
+        """Olvida los IDs de carpeta recordados (p. ej. tras renombrar o mover carpetas)."""
+        with self._folder_cache_lock:
+            self._folder_cache.clear()
+
     def get_folder_id_by_name(self, folder_name: str, parent_folder_id: str) -> Union[str, None]:
         """
         Busca el ID de una carpeta por su nombre exacto dentro de una carpeta padre.
@@ -38,6 +121,9 @@ class Drive:
         :param parent_folder_id: El ID de la carpeta donde se debe buscar.
         :return: El ID de la carpeta si se encuentra, o None si no existe.
         """
+        folder_id = self._cached_folder_id(parent_folder_id, folder_name)
+        if folder_id is not None:
+            return folder_id
         query = (
             f"mimeType='application/vnd.google-apps.folder' "
             f"and name='{folder_name}' "
@@ -45,15 +131,17 @@ class Drive:
             f"and trashed=false"
         )
         try:
-            response = self.service.files().list(
-                q=query,
-                spaces='drive',
-                fields='files(id, name)'
-            ).execute()
+            with timed("drive", "files.list"):
+                response = self.service.files().list(
+                    q=query,
+                    spaces='drive',
+                    fields='files(id, name)'
+                ).execute()
             
             folders = response.get('files', [])
             if folders:
                 folder_id = folders[0].get('id')
+                self._cache_folder_id(parent_folder_id, folder_name, folder_id)
                 logging.info(f"Se encontró la carpeta '{folder_name}' con ID: {folder_id} dentro de la carpeta padre {parent_folder_id}.")
                 return folder_id
             else:
@@ -73,12 +161,13 @@ class Drive:
         try:
             page_token = None
             while True:
-                response = self.service.files().list(
-                    q=f"'{folder_id}' in parents and trashed=false",
-                    spaces='drive',
-                    fields='nextPageToken, files(id, name, mimeType)',
-                    pageToken=page_token
-                ).execute()
+                with timed("drive", "files.list"):
+                    response = self.service.files().list(
+                        q=f"'{folder_id}' in parents and trashed=false",
+                        spaces='drive',
+                        fields='nextPageToken, files(id, name, mimeType)',
+                        pageToken=page_token
+                    ).execute()
                 all_items.extend(response.get('files', []))
                 page_token = response.get('nextPageToken', None)
                 if page_token is None:
@@ -88,6 +177,97 @@ class Drive:
             raise error
         return all_items
 
+    def _list_folders_batch(self, tasks: list) -> list:
+        """
+        Lista una página de cada carpeta de `tasks` en un único lote HTTP (new_batch_http_request).
+        Cada tarea es un diccionario con folder_id, page_token, fields y attempt. Devuelve una lista de
+        pares (tarea, respuesta o excepción).
+        """
+        attempt = max(task['attempt'] for task in tasks)
+        if attempt:
+            time.sleep(min(30.0, 2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+        service = self._thread_service()
+        results = {}
+
+        def callback(request_id, response, exception):
+            results[request_id] = exception if exception is not None else response
+
+        batch = service.new_batch_http_request(callback=callback)
+        for index, task in enumerate(tasks):
+            batch.add(service.files().list(
+                q=f"'{task['folder_id']}' in parents and trashed=false",
+                spaces='drive',
+                pageSize=1000,
+                fields=f"nextPageToken, files({task['fields']})",
+                pageToken=task['page_token']
+            ), request_id=str(index))
+        with timed("drive", "batch.files.list"):
+            batch.execute()
+        return [(task, results.get(str(index))) for index, task in enumerate(tasks)]
+
+    def walk(self, root_folder_id: str, max_depth: int | None = None, workers: int = 8,
+             fields: str = 'id, name, mimeType') -> Iterator[dict]:
+        """
+        Recorre recursivamente el árbol de una carpeta de Drive. Las carpetas se expanden en paralelo y las
+        consultas de carpetas hermanas se agrupan en lotes HTTP, pidiendo 1000 elementos por página y solo
+        los campos indicados. Los elementos se devuelven a medida que llegan, sin un orden garantizado.
+
+        :param root_folder_id: El ID de la carpeta raíz.
+        :param max_depth: Profundidad máxima a recorrer (1 = solo el contenido directo de la raíz). None para no limitarla.
+        :param workers: Número de lotes que se ejecutan en paralelo.
+        :param fields: Campos de cada archivo a pedir a la API. Debe incluir id, name y mimeType.
+        :return: Un generador de diccionarios con los campos pedidos más 'path' (ruta relativa a la raíz,
+                 separada por '/'), 'path_parts' (tupla con los nombres de cada nivel, que pueden contener '/')
+                 y 'depth' (1 para el contenido directo de la raíz).
+        """
+        if not root_folder_id:
+            return
+        pending = deque([{'folder_id': root_folder_id, 'path': '', 'path_parts': (), 'depth': 1, 'page_token': None,
+                          'fields': fields, 'attempt': 0}])
+        in_flight = {}  # Future -> tareas del lote
+        folders_listed = 0
+        items_found = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while pending or in_flight:
+                while pending and len(in_flight) < workers:
+                    tasks = [pending.popleft() for _ in range(min(self.BATCH_SIZE, len(pending)))]
+                    in_flight[executor.submit(self._list_folders_batch, tasks)] = tasks
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tasks = in_flight.pop(future)
+                    try:
+                        outcomes = future.result()
+                    except Exception as e:
+                        # Falló el lote completo (p. ej. un error de red): se reintentan todas sus carpetas.
+                        outcomes = [(task, e) for task in tasks]
+                    for task, outcome in outcomes:
+                        if isinstance(outcome, Exception) or outcome is None:
+                            status = getattr(getattr(outcome, 'resp', None), 'status', None)
+                            retryable = outcome is None or status is None or status in _RETRYABLE_STATUS_CODES
+                            if retryable and task['attempt'] + 1 < self.MAX_LIST_ATTEMPTS:
+                                record_event("drive", "retries")
+                                pending.append({**task, 'attempt': task['attempt'] + 1})
+                                continue
+                            logging.error(f"Ocurrió un error al listar la carpeta {task['folder_id']}: {outcome}")
+                            raise outcome if isinstance(outcome, Exception) else RuntimeError(
+                                f"Sin respuesta al listar la carpeta {task['folder_id']}")
+                        if outcome.get('nextPageToken'):
+                            pending.append({**task, 'page_token': outcome['nextPageToken'], 'attempt': 0})
+                        else:
+                            folders_listed += 1
+                        for item in outcome.get('files', []):
+                            item_path = f"{task['path']}/{item['name']}" if task['path'] else item['name']
+                            item_parts = task['path_parts'] + (item['name'],)
+                            if item.get('mimeType') == FOLDER_MIME_TYPE:
+                                self._cache_folder_id(task['folder_id'], item['name'], item['id'])
+                                if max_depth is None or task['depth'] < max_depth:
+                                    pending.append({'folder_id': item['id'], 'path': item_path, 'path_parts': item_parts,
+                                                    'depth': task['depth'] + 1, 'page_token': None, 'fields': fields,
+                                                    'attempt': 0})
+                            items_found += 1
+                            yield {**item, 'path': item_path, 'path_parts': item_parts, 'depth': task['depth']}
+        logging.info(f"Recorrido de la carpeta {root_folder_id} completado: {folders_listed} carpetas, {items_found} elementos.")
+
     def download_file(self, file_id: str, local_path: str) -> Union[str, None]:
         """Descarga un archivo de Google Drive por su ID a una ruta específica."""
         logging.info(f"Iniciando descarga del archivo de Drive ID: {file_id} en {local_path}")
@@ -97,7 +277,10 @@ class Drive:
                 downloader = MediaIoBaseDownload(fh, request)
                 done = False
                 while not done:
-                    status, done = downloader.next_chunk()
+                    with timed("drive", "files.get_media") as timer:
+                        position = fh.tell()
+                        status, done = downloader.next_chunk()
+                        timer.add_bytes(fh.tell() - position)
                     if status:
                         file_name = os.path.basename(local_path)
                         logging.info(f"Descargando {file_name}: {int(status.progress() * 100)}%.")
@@ -105,4 +288,258 @@ class Drive:
             return local_path
         except HttpError as error:
             logging.error(f"Error de API al descargar el archivo {file_id}: {error}", exc_info=True)
-            return None
\ No newline at end of file
+            return None
+
+    def _get_files_metadata(self, file_ids: list, fields: str = _DOWNLOAD_FIELDS) -> tuple[list, dict]:
+        """
+        Obtiene los metadatos de varios archivos con lotes HTTP. Devuelve la lista de metadatos
+        encontrados y un diccionario ID -> error de los que no se pudieron obtener.
+        """
+        found = []
+        errors = {}
+        for start in range(0, len(file_ids), self.BATCH_SIZE):
+            batch_ids = file_ids[start:start + self.BATCH_SIZE]
+
+            def callback(request_id, response, exception):
+                if exception is not None:
+                    errors[request_id] = str(exception)
+                else:
+                    found.append(response)
+
+            batch = self.service.new_batch_http_request(callback=callback)
+            for file_id in batch_ids:
+                batch.add(self.service.files().get(fileId=file_id, fields=fields), request_id=file_id)
+            with timed("drive", "batch.files.get"):
+                batch.execute()
+        return found, errors
+
+    def resolve_files(self, file_ids_or_folder: Union[str, list], max_depth: int | None = None,
+                      workers: int = 8) -> tuple[list, dict]:
+        """
+        Obtiene los metadatos (id, name, mimeType, md5Checksum, modifiedTime, size, 'path' y 'path_parts') de los archivos
+        descargables de una lista de IDs o de todo el árbol de una carpeta. Las carpetas y los documentos
+        nativos de Google (que deben exportarse) se excluyen.
+
+        :param file_ids_or_folder: Una lista de IDs de archivo, o el ID de una carpeta. En el segundo caso,
+                                   'path' es la ruta relativa a la carpeta; en el primero, el nombre del archivo.
+        :param max_depth: Profundidad máxima al recorrer una carpeta (ver walk).
+        :param workers: Número de lotes de listado en paralelo al recorrer una carpeta.
+        :return: Una tupla (lista de metadatos de archivo, diccionario ID -> error de los que no se pudieron obtener).
+        """
+        if isinstance(file_ids_or_folder, str):
+            files = list(self.walk(file_ids_or_folder, max_depth=max_depth, workers=workers, fields=_DOWNLOAD_FIELDS))
+            failed = {}
+        else:
+            files, failed = self._get_files_metadata(list(dict.fromkeys(file_ids_or_folder)))
+            for file_info in files:
+                file_info['path'] = file_info['name']
+                file_info['path_parts'] = (file_info['name'],)
+        downloadable = []
+        for file_info in files:
+            mime_type = file_info.get('mimeType', '')
+            if not mime_type.startswith('application/vnd.google-apps.'):
+                downloadable.append(file_info)
+            elif mime_type != FOLDER_MIME_TYPE:
+                logging.warning(f"Se omite '{file_info['path']}': los documentos nativos de Google deben exportarse.")
+        return downloadable, failed
+
+    def iter_media_chunks(self, file_info: dict, chunk_size: int = 32 * MB, offset: int = 0) -> Iterator[bytes]:
+        """
+        Descarga el contenido de un archivo por rangos de `chunk_size` bytes, desde `offset`, y devuelve cada
+        bloque a medida que llega. Usa el servicio de Drive del hilo actual.
+
+        :param file_info: Metadatos del archivo con al menos 'id' y 'size' (ver resolve_files).
+        :param chunk_size: Tamaño en bytes de cada bloque.
+        :param offset: Byte desde el que empezar.
+        """
+        size = int(file_info.get('size', 0))
+        service = self._thread_service()
+        while offset < size:
+            end = min(offset + chunk_size, size) - 1
+            request = service.files().get_media(fileId=file_info['id'])
+            request.headers['range'] = f"bytes={offset}-{end}"
+            with timed("drive", "files.get_media") as timer:
+                data = request.execute(num_retries=self.DOWNLOAD_NUM_RETRIES)
+                timer.add_bytes(len(data))
+            if not data:
+                raise IOError(f"Drive devolvió un bloque vacío en el byte {offset} de {size}.")
+            offset += len(data)
+            yield data
+
+    def _download_ranged(self, file_info: dict, local_path: str, chunk_size: int, progress) -> int:
+        """
+        Descarga un archivo por rangos de `chunk_size` bytes a un '.part' junto al destino y lo renombra al
+        terminar. Si el '.part' de la misma versión (mismo md5) ya existe, la descarga continúa donde quedó.
+        Verifica el md5 del resultado. Devuelve los bytes descargados en esta llamada.
+        """
+        size = int(file_info.get('size', 0))
+        md5 = file_info.get('md5Checksum')
+        part_path = f"{local_path}.{md5}.part" if md5 else f"{local_path}.part"
+        digest = hashlib.md5()
+        offset = 0
+        if os.path.exists(part_path):
+            offset = os.path.getsize(part_path)
+            if offset > size:
+                offset = 0
+            else:
+                with open(part_path, 'rb') as f:
+                    for block in iter(lambda: f.read(MB), b''):
+                        digest.update(block)
+                if offset:
+                    logging.info(f"Reanudando la descarga de {file_info['name']} desde el byte {offset} de {size}.")
+        downloaded = 0
+        with open(part_path, 'ab' if offset else 'wb') as fh:
+            for data in self.iter_media_chunks(file_info, chunk_size, offset):
+                fh.write(data)
+                digest.update(data)
+                downloaded += len(data)
+                progress(len(data))
+        if md5 and digest.hexdigest() != md5:
+            os.remove(part_path)
+            raise IOError(f"El md5 descargado ({digest.hexdigest()}) no coincide con el de Drive ({md5}).")
+        os.replace(part_path, local_path)
+        return downloaded
+
+    @staticmethod
+    def _plan_local_paths(files: list, dest_dir: str) -> tuple[dict, dict]:
+        """
+        Asigna a cada archivo su ruta local dentro de `dest_dir`. Cada nombre de Drive se sanea como componente
+        de ruta, y los archivos que acabarían en la misma ruta (nombres repetidos en una carpeta, o que coinciden
+        tras sanear) llevan su ID en el nombre para que ninguno sobrescriba a otro. Las rutas que resolverían
+        fuera de `dest_dir` se rechazan.
+
+        :return: Una tupla (ID -> (ruta relativa separada por '/', ruta local), ID -> error de los rechazados).
+        """
+        root = os.path.realpath(dest_dir)
+        by_path = {}
+        for file_info in files:
+            parts = tuple(_safe_path_component(name) for name in file_info['path_parts'])
+            by_path.setdefault(os.path.normcase('/'.join(parts)), []).append((file_info, parts))
+
+        planned = {}
+        rejected = {}
+        for key, group in by_path.items():
+            # Todos los archivos del grupo (y uno que coincidiera con el manifiesto) llevan el ID: la ruta de cada
+            # uno no depende del orden en que los devuelva Drive y se mantiene entre ejecuciones.
+            duplicated = len(group) > 1 or key == os.path.normcase(MANIFEST_FILE_NAME)
+            for file_info, parts in group:
+                if duplicated:
+                    stem, extension = os.path.splitext(parts[-1])
+                    parts = parts[:-1] + (f"{stem} ({_safe_path_component(file_info['id'])}){extension}",)
+                local_path = os.path.join(dest_dir, *parts)
+                if os.path.commonpath([root, os.path.realpath(local_path)]) != root:
+                    rejected[file_info['id']] = f"La ruta '{file_info['path']}' queda fuera del directorio de destino."
+                    continue
+                planned[file_info['id']] = ('/'.join(parts), local_path)
+        return planned, rejected
+
+    def download_many(self, file_ids_or_folder: Union[str, list], dest_dir: str, workers: int = 8,
+                      chunk_size: int = 32 * MB, max_depth: int | None = None) -> dict:
+        """
+        Descarga en paralelo varios archivos de Drive, o todo el contenido de una carpeta, a un directorio local.
+        Mantiene en el destino un manifiesto con el md5Checksum y el modifiedTime de cada archivo, de modo que
+        los que no cambiaron desde la última ejecución no se vuelven a descargar. Las descargas interrumpidas
+        se reanudan desde el último bloque guardado. Los nombres se sanean para usarlos como rutas locales y,
+        si varios archivos acabarían en la misma ruta, se les añade su ID (ver _plan_local_paths).
+
+        :param file_ids_or_folder: Una lista de IDs de archivo, o el ID de una carpeta (se recorre con walk
+                                   y se conserva la estructura de subcarpetas).
+        :param dest_dir: El directorio local de destino.
+        :param workers: Número de descargas simultáneas. Cada hilo usa su propio servicio de Drive.
+        :param chunk_size: Tamaño en bytes de cada bloque descargado.
+        :param max_depth: Profundidad máxima al recorrer una carpeta (ver walk).
+        :return: Un diccionario con 'downloaded' y 'skipped' (listas de rutas locales), 'failed'
+                 (ID -> error), 'bytes', 'elapsed_seconds' y 'throughput_mb_s'.
+        """
+        started = time.monotonic()
+        os.makedirs(dest_dir, exist_ok=True)
+        report = {'downloaded': [], 'skipped': [], 'failed': {}, 'bytes': 0}
+
+        files, report['failed'] = self.resolve_files(file_ids_or_folder, max_depth=max_depth, workers=workers)
+        local_paths, rejected = self._plan_local_paths(files, dest_dir)
+        for file_id, error in rejected.items():
+            logging.error(f"Se omite el archivo {file_id}: {error}")
+        report['failed'].update(rejected)
+
+        manifest_path = os.path.join(dest_dir, MANIFEST_FILE_NAME)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+
+        to_download = []
+        for file_info in files:
+            if file_info['id'] not in local_paths:
+                continue
+            relative_path, local_path = local_paths[file_info['id']]
+            entry = manifest.get(file_info['id'])
+            unchanged = (
+                entry is not None
+                and entry.get('md5Checksum') == file_info.get('md5Checksum')
+                and entry.get('modifiedTime') == file_info.get('modifiedTime')
+                # Los manifiestos anteriores solo guardaban la ruta de Drive, que era también la ruta local.
+                and entry.get('local_path', entry.get('path')) == relative_path
+                and os.path.exists(local_path)
+                and os.path.getsize(local_path) == int(file_info.get('size', 0))
+            )
+            if unchanged:
+                report['skipped'].append(local_path)
+            else:
+                to_download.append((file_info, local_path))
+
+        total_bytes = sum(int(file_info.get('size', 0)) for file_info, _ in to_download)
+        lock = threading.Lock()
+
+        def progress(n_bytes: int):
+            with lock:
+                report['bytes'] += n_bytes
+
+        def download(file_info: dict, local_path: str) -> int:
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            return self._download_ranged(file_info, local_path, chunk_size, progress)
+
+        logging.info(
+            f"Descarga desde Drive: {len(to_download)} archivos ({total_bytes / MB:.1f} MB) por descargar, "
+            f"{len(report['skipped'])} sin cambios."
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = {executor.submit(download, file_info, local_path): (file_info, local_path)
+                           for file_info, local_path in to_download}
+                for done_count, future in enumerate(as_completed(futures), start=1):
+                    file_info, local_path = futures[future]
+                    try:
+                        future.result()
+                        report['downloaded'].append(local_path)
+                        manifest[file_info['id']] = {
+                            'path': file_info['path'],
+                            'local_path': local_paths[file_info['id']][0],
+                            'md5Checksum': file_info.get('md5Checksum'),
+                            'modifiedTime': file_info.get('modifiedTime'),
+                            'size': int(file_info.get('size', 0)),
+                        }
+                    except Exception as e:
+                        report['failed'][file_info['id']] = str(e)
+                        logging.error(f"Error al descargar '{file_info['path']}' ({file_info['id']}): {e}")
+                    elapsed = time.monotonic() - started
+                    with lock:
+                        downloaded_bytes = report['bytes']
+                    logging.info(
+                        f"Progreso de descarga: {done_count}/{len(to_download)} archivos, "
+                        f"{downloaded_bytes / MB:.1f}/{total_bytes / MB:.1f} MB, {downloaded_bytes / MB / max(elapsed, 1e-9):.1f} MB/s."
+                    )
+        finally:
+            # El manifiesto se reemplaza de forma atómica para no dejarlo a medio escribir si el proceso se interrumpe.
+            tmp_manifest = f"{manifest_path}.tmp"
+            with open(tmp_manifest, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp_manifest, manifest_path)
+
+        report['elapsed_seconds'] = time.monotonic() - started
+        report['throughput_mb_s'] = report['bytes'] / MB / max(report['elapsed_seconds'], 1e-9)
+        logging.info(
+            f"Descarga desde Drive terminada: {len(report['downloaded'])} descargados, {len(report['skipped'])} sin cambios, "
+            f"{len(report['failed'])} con errores, {report['bytes'] / MB:.1f} MB a {report['throughput_mb_s']:.1f} MB/s."
+        )
+        return report
@@ -1,27 +1,113 @@
 # src/py_toolbox/processing/html_parser.py
+import importlib.util
 import logging
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from bs4 import BeautifulSoup
+from typing import Callable, Iterator
+from bs4 import BeautifulSoup, SoupStrainer
+from ..utils.lazy_import import lazy_import
+
+# pandas se carga de forma diferida, solo al devolver tablas como DataFrames.
+pd = lazy_import("pandas")
+
+# lxml es opcional: si está instalado se usa como parser por ser bastante más rápido que html.parser.
+_HAS_LXML = importlib.util.find_spec("lxml") is not None
+# Etiquetas que separan palabras dentro de una celda aunque el HTML no tenga espacios entre ellas.
+_CELL_BREAK_TAGS = ("br", "p", "div", "li", "table", "tr", "td", "th")
+# Etiquetas cuyo contenido no es texto visible de la celda.
+_CELL_SKIP_TAGS = ("script", "style")
+
+
+def _normalize_cell_text(fragments: Iterator[str]) -> str:
+    """Une los fragmentos de texto de una celda y colapsa los espacios; es la misma regla con lxml y sin él."""
+    return " ".join("".join(fragments).split())
+
+
+def _lxml_cell_text(cell) -> str:
+    """Texto de una celda de lxml: el texto de los elementos en línea se une sin separador, como en el navegador."""
+    if not len(cell):
+        # Caso más común (celda sin etiquetas internas): no hace falta recorrer el subárbol.
+        return " ".join(cell.text.split()) if cell.text else ""
+    from lxml import etree
+
+    etree.strip_elements(cell, *_CELL_SKIP_TAGS, with_tail=False)
+    for elem in cell.iter(*_CELL_BREAK_TAGS):
+        elem.text = " " + (elem.text or "")
+        elem.tail = " " + (elem.tail or "")
+    return _normalize_cell_text(cell.itertext())
+
+
+def _soup_cell_text(cell) -> str:
+    """Texto de una celda de BeautifulSoup, con las mismas reglas que _lxml_cell_text."""
+    for elem in cell.find_all(_CELL_SKIP_TAGS):
+        elem.decompose()
+    for elem in cell.find_all(_CELL_BREAK_TAGS):
+        elem.insert_before(" ")
+        elem.insert_after(" ")
+    return _normalize_cell_text(cell.strings)
+
+def _parse_html(path_obj: Path, parser: str, only: str | list | None, attrs: dict | None) -> BeautifulSoup:
+    """Parsea un archivo HTML. A diferencia de HtmlParser.get_soup, propaga las excepciones."""
+    if parser == 'auto':
+        parser = HtmlParser.best_parser()
+    parse_only = SoupStrainer(only, attrs=attrs or {}) if only is not None or attrs else None
+    # Se pasan los bytes tal cual: el parser decodifica directamente, sin una copia intermedia en str.
+    return BeautifulSoup(path_obj.read_bytes(), parser, parse_only=parse_only, from_encoding="utf-8")
+
+
+def _extract_chunk(html_paths: list, extractor: Callable, parser: str, only, attrs, pickled: bool = False) -> list[dict]:
+    """
+    Parsea un grupo de archivos y aplica el extractor a cada uno; los errores de un archivo solo afectan
+    a ese archivo. Solo se devuelve el resultado del extractor (el objeto BeautifulSoup no sale del proceso).
+    Con `pickled`, como se usa en el pool, cada resultado se devuelve ya serializado con pickle: un resultado
+    que no se puede serializar falla solo en su archivo en lugar de hacer fallar la tarea completa.
+    """
+    results = []
+    for html_path in html_paths:
+        try:
+            soup = _parse_html(Path(html_path), parser, only, attrs)
+            result = extractor(soup)
+            if pickled:
+                result = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            results.append({"Path": html_path, "Result": result, "Error": None})
+        except Exception as e:
+            # Se guarda el error como texto: no todas las excepciones se pueden serializar entre procesos.
+            results.append({"Path": html_path, "Result": None, "Error": f"{type(e).__name__}: {e}"})
+    return results
+
 
 class HtmlParser:
     """
     Una clase de utilidad para cargar y parsear contenido HTML desde un archivo.
     """
+    # Por debajo de este volumen total de HTML, arrancar el pool de procesos cuesta más de lo que ahorra.
+    PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
     @staticmethod
-    def get_soup(html_path: str | Path, parser: str = 'html.parser') -> BeautifulSoup | None:
+    def best_parser() -> str:
+        """Devuelve el parser más rápido disponible para BeautifulSoup: 'lxml' si está instalado, si no 'html.parser'."""
+        return 'lxml' if _HAS_LXML else 'html.parser'
+
+    @staticmethod
+    def get_soup(html_path: str | Path, parser: str = 'html.parser', only: str | list | None = None,
+                 attrs: dict | None = None) -> BeautifulSoup | None:
         """
         Lee un archivo HTML y devuelve un objeto BeautifulSoup para su análisis.
 
         :param html_path: La ruta al archivo HTML de entrada.
         :param parser: El parser que BeautifulSoup debe usar. 'html.parser' es el
-                       integrado en Python.
+                       integrado en Python; 'auto' elige el más rápido disponible (lxml si está instalado).
+        :param only: Etiqueta o lista de etiquetas a conservar (p. ej. ['table', 'p']). Si se indica, solo se
+                     construyen los subárboles que coinciden, lo que reduce el tiempo y la memoria del parseo.
+        :param attrs: Filtro opcional de atributos de las etiquetas a conservar (p. ej. {'class': 'page'}).
         :return: Un objeto BeautifulSoup o None si el archivo no se encuentra o hay un error.
         """
         try:
             path_obj = Path(html_path)
             logging.info(f"Cargando archivo HTML desde: {path_obj}")
-            content = path_obj.read_text(encoding="utf-8")
-            soup = BeautifulSoup(content, parser)
+            soup = _parse_html(path_obj, parser, only, attrs)
             logging.info("Archivo HTML cargado y parseado exitosamente en BeautifulSoup.")
             return soup
         except FileNotFoundError:
@@ -29,4 +115,140 @@ class HtmlParser:
             return None
         except Exception as e:
             logging.error(f"Ocurrió un error al leer o parsear el archivo HTML: {e}", exc_info=True)
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def parse_many(html_paths: list, extractor: Callable, workers: int | None = None, chunksize: int | None = None,
+                   parser: str = 'auto', only: str | list | None = None, attrs: dict | None = None) -> Iterator[dict]:
+        """
+        Parsea muchos archivos HTML en un pool de procesos y aplica a cada uno una función de extracción.
+        Los resultados se devuelven a medida que terminan (no en el orden de entrada). Si el lote es pequeño
+        se procesa en serie en el proceso actual.
+
+        :param html_paths: Rutas de los archivos HTML.
+        :param extractor: Función que recibe el objeto BeautifulSoup de un archivo y devuelve un resultado
+                          serializable con pickle. Debe estar definida a nivel de módulo para poder enviarse al pool.
+        :param workers: Número de procesos. Por defecto, el número de CPUs.
+        :param chunksize: Archivos enviados a cada proceso por tarea. Por defecto se calcula según el lote.
+        :param parser: El parser de BeautifulSoup; 'auto' elige el más rápido disponible.
+        :param only: Etiqueta o lista de etiquetas a conservar al parsear (ver get_soup).
+        :param attrs: Filtro opcional de atributos de las etiquetas a conservar.
+        :return: Un generador de diccionarios con las claves Path, Result y Error (None si no hubo error).
+        """
+        html_paths = [str(html_path) for html_path in html_paths]
+        if not html_paths:
+            return
+        workers = workers or os.cpu_count() or 1
+        total_bytes = sum(os.path.getsize(html_path) for html_path in html_paths if os.path.exists(html_path))
+        if workers <= 1 or len(html_paths) < 2 or total_bytes < HtmlParser.PARALLEL_MIN_BYTES:
+            logging.info(f"Parseando {len(html_paths)} archivos HTML en serie ({total_bytes} bytes).")
+            for html_path in html_paths:
+                yield _extract_chunk([html_path], extractor, parser, only, attrs)[0]
+            return
+
+        if chunksize is None:
+            # Unas 4 tareas por proceso reparten la carga sin multiplicar el coste de serialización.
+            chunksize = max(1, min(64, len(html_paths) // (workers * 4)))
+        chunks = [html_paths[start:start + chunksize] for start in range(0, len(html_paths), chunksize)]
+        workers = min(workers, len(chunks))
+        logging.info(f"Parseando {len(html_paths)} archivos HTML con {workers} procesos en {len(chunks)} tareas.")
+        failed = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_extract_chunk, chunk, extractor, parser, only, attrs, True): chunk for chunk in chunks
+            }
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except Exception as e:
+                    # Solo ocurre si falla la tarea completa (un proceso caído o el extractor no serializable).
+                    results = [{"Path": html_path, "Result": None, "Error": f"{type(e).__name__}: {e}"} for html_path in futures[future]]
+                for result in results:
+                    if result["Error"] is None:
+                        try:
+                            result["Result"] = pickle.loads(result["Result"])
+                        except Exception as e:
+                            result["Result"] = None
+                            result["Error"] = f"{type(e).__name__}: {e}"
+                    if result["Error"] is not None:
+                        failed += 1
+                    yield result
+        logging.info(f"Parseo en paralelo terminado: {len(html_paths) - failed} archivos correctos, {failed} con errores.")
+
+    @staticmethod
+    def _iter_table_rows_lxml(path_obj: Path):
+        """
+        Recorre el archivo con lxml.etree.iterparse y devuelve, por cada tabla de primer nivel, sus filas
+        como listas de textos. Los elementos ya procesados se liberan a medida que se avanza.
+        """
+        from lxml import etree
+
+        depth = 0
+        for event, elem in etree.iterparse(str(path_obj), events=("start", "end"), html=True, recover=True):
+            if elem.tag == "table":
+                if event == "start":
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth == 0:
+                    rows = []
+                    for tr in elem.iter("tr"):
+                        # Las filas de tablas anidadas pertenecen a su propia tabla, no a esta.
+                        if next(tr.iterancestors("table"), None) is not elem:
+                            continue
+                        rows.append([_lxml_cell_text(cell) for cell in tr if cell.tag in ("td", "th")])
+                    yield rows
+            if event == "end" and depth == 0:
+                elem.clear()
+                parent = elem.getparent()
+                while parent is not None and elem.getprevious() is not None:
+                    del parent[0]
+
+    @staticmethod
+    def _iter_table_rows_soup(path_obj: Path):
+        """Alternativa sin lxml: parsea solo las tablas con html.parser y un SoupStrainer."""
+        soup = BeautifulSoup(path_obj.read_bytes(), 'html.parser', parse_only=SoupStrainer('table'), from_encoding="utf-8")
+        for table in soup.find_all('table'):
+            if table.find_parent('table') is not None:
+                continue
+            rows = []
+            for tr in table.find_all('tr'):
+                if tr.find_parent('table') is not table:
+                    continue
+                rows.append([_soup_cell_text(cell) for cell in tr.find_all(['td', 'th'], recursive=False)])
+            yield rows
+
+    @staticmethod
+    def extract_tables(html_path: str | Path, as_dataframe: bool = True, header: bool = True) -> list | None:
+        """
+        Extrae las tablas de un archivo HTML sin construir un objeto BeautifulSoup, con una pasada
+        incremental de lxml (o, si lxml no está instalado, parseando solo las etiquetas <table>).
+
+        :param html_path: La ruta al archivo HTML de entrada.
+        :param as_dataframe: Si es True, devuelve DataFrames; si es False, listas de filas de textos.
+        :param header: Si es True, la primera fila de cada tabla se usa como nombres de columna (solo DataFrames).
+        :return: Una lista con las tablas en el orden del documento, o None si hay un error.
+        """
+        try:
+            path_obj = Path(html_path)
+            logging.info(f"Extrayendo tablas del archivo HTML: {path_obj}")
+            iter_tables = HtmlParser._iter_table_rows_lxml if _HAS_LXML else HtmlParser._iter_table_rows_soup
+            tables = []
+            for rows in iter_tables(path_obj):
+                # Las filas con menos celdas se completan para que la tabla sea rectangular.
+                width = max((len(row) for row in rows), default=0)
+                rows = [row + [""] * (width - len(row)) for row in rows]
+                if not as_dataframe:
+                    tables.append(rows)
+                elif header and rows:
+                    tables.append(pd.DataFrame(rows[1:], columns=rows[0]))
+                else:
+                    tables.append(pd.DataFrame(rows))
+            logging.info(f"Se extrajeron {len(tables)} tablas del archivo HTML.")
+            return tables
+        except FileNotFoundError:
+            logging.error(f"No se encontró el archivo HTML en la ruta: {html_path}")
+            return None
+        except Exception as e:
+            logging.error(f"Ocurrió un error al extraer las tablas del archivo HTML: {e}", exc_info=True)
+            return None
@@ -0,0 +1,128 @@
+# src/py_toolbox/processing/tika_cache.py
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+
+# Tamaño de los bloques con que se lee el PDF al calcular su hash.
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str | Path) -> str:
+    """Calcula el SHA-256 de un archivo leyéndolo por bloques, sin cargarlo completo en memoria."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_conversion_key(pdf_hash: str, tika_version: str, accept: str) -> str:
+    """Genera la clave de caché de una conversión: el mismo PDF convertido por otra versión de Tika o a otro formato no comparte entrada."""
+    payload = f"{pdf_hash}\0{tika_version}\0{accept}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _link_or_copy(src: Path, dest: Path):
+    """
+    Coloca `src` en `dest` de forma atómica: crea un enlace duro (o, si no es posible, una copia) con un
+    nombre temporal junto al destino y lo renombra. Si `dest` ya existía, se reemplaza.
+    """
+    tmp_path = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            # Distinto sistema de archivos o sin soporte de enlaces duros.
+            shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dest)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class TikaConversionCache:
+    """
+    Caché en disco de conversiones de Tika. Cada entrada es el HTML resultante de convertir un PDF, indexado
+    por el hash de su contenido, la versión del servidor Tika y el tipo Accept pedido. El directorio se
+    mantiene por debajo de `max_bytes` eliminando las entradas usadas hace más tiempo.
+
+    Los aciertos se entregan como enlaces duros cuando es posible: el HTML de salida comparte el archivo con
+    la caché, por lo que no debe modificarse en el mismo lugar.
+    """
+    def __init__(self, cache_dir: str | Path, max_bytes: int = 5 * 1024 ** 3):
+        """
+        :param cache_dir: Directorio donde se guardan los archivos de la caché.
+        :param max_bytes: Tamaño máximo total de los archivos de la caché.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.html"
+
+    def get(self, key: str, dest_path: str | Path) -> bool:
+        """
+        Si la conversión está en caché, la coloca en `dest_path` y devuelve True. En caso contrario devuelve False.
+        """
+        path = self._path(key)
+        try:
+            _link_or_copy(path, Path(dest_path))
+            os.utime(path)  # Marca la entrada como usada recientemente para la expulsión LRU.
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return False
+        except Exception as e:
+            logging.warning(f"No se pudo recuperar la entrada {key} de la caché de Tika; se convertirá de nuevo. Error: {e}")
+            with self._lock:
+                self._misses += 1
+            return False
+        with self._lock:
+            self._hits += 1
+        return True
+
+    def put(self, key: str, html_path: str | Path):
+        """Guarda en la caché el HTML generado para la clave indicada."""
+        try:
+            _link_or_copy(Path(html_path), self._path(key))
+        except Exception as e:
+            logging.warning(f"No se pudo guardar la conversión en la caché de Tika: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta que la caché quede por debajo de max_bytes."""
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*.html"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def stats(self) -> dict:
+        """Devuelve los contadores de la caché: aciertos, fallos y tasa de aciertos."""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+            }
@@ -1,49 +1,172 @@
 # src/py_toolbox/processing/tika_parser.py
+import hashlib
 import logging
-import requests 
+import os
+import random
+import threading
+import time
+import uuid
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from ..utils.instrumentation import record_event, timed
+from .tika_cache import TikaConversionCache, hash_file, make_conversion_key
+
+# Códigos HTTP con los que un servidor Tika saturado o reiniciándose puede responder; se reintentan.
+_RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
 
 class TikaParser:
     """
     Una clase de utilidad para interactuar con un servidor Apache Tika.
     Actúa como un cliente HTTP, enviando archivos a un servidor ya en ejecución.
+    Cada instancia mantiene un pool de conexiones keep-alive con el servidor.
     """
     # El servidor Tika se ejecutará en localhost dentro del mismo contenedor
     TIKA_SERVER_URL = "http://localhost:9998/tika"
+    # Tamaño de los bloques en que se escribe a disco la respuesta de Tika.
+    STREAM_CHUNK_SIZE = 64 * 1024
+    # Formato pedido al servidor; forma parte de la clave de la caché de conversiones.
+    ACCEPT_TYPE = "text/html"
 
-    @staticmethod
-    def pdf_to_html(pdf_path: str, output_dir: str) -> str | None:
+    _default_instance = None
+    _default_instance_lock = threading.Lock()
+
+    def __init__(self, server_url: str | None = None, connect_timeout: float = 10.0, read_timeout: float = 300.0,
+                 pool_size: int = 10, max_retries: int = 3, backoff_seconds: float = 1.0,
+                 cache: TikaConversionCache | None = None, tika_version: str | None = None):
         """
-        Envía un archivo PDF a un servidor Tika para su conversión a HTML
-        y lo guarda en un directorio. La lógica de negocio no cambia:
-        recibe una ruta de PDF y devuelve una ruta de HTML.
+        :param server_url: URL del endpoint /tika del servidor. Por defecto, TIKA_SERVER_URL.
+        :param connect_timeout: Segundos máximos para establecer la conexión con el servidor.
+        :param read_timeout: Segundos máximos de espera entre bloques de la respuesta.
+        :param pool_size: Número de conexiones keep-alive que se mantienen con el servidor.
+        :param max_retries: Reintentos ante errores de red o respuestas 429/502/503/504.
+        :param backoff_seconds: Pausa base del backoff exponencial entre reintentos.
+        :param cache: Caché de conversiones opcional. Si un PDF ya se convirtió con la misma versión de Tika,
+                      el HTML se toma de la caché sin contactar al servidor.
+        :param tika_version: Versión del servidor Tika usada en la clave de la caché. Si no se indica, se
+                             consulta una vez al endpoint /version del servidor.
+        """
+        self.server_url = server_url or self.TIKA_SERVER_URL
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cache = cache
+        self._tika_version = tika_version
+        self._tika_version_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def _default(cls) -> "TikaParser":
+        """Instancia compartida usada por el método estático pdf_to_html."""
+        if cls._default_instance is None:
+            with cls._default_instance_lock:
+                if cls._default_instance is None:
+                    cls._default_instance = cls()
+        return cls._default_instance
+
+    @property
+    def tika_version(self) -> str:
+        """Versión del servidor Tika, consultada al endpoint /version la primera vez que se necesita."""
+        if self._tika_version is None:
+            with self._tika_version_lock:
+                if self._tika_version is None:
+                    base_url = self.server_url[:-len("/tika")] if self.server_url.endswith("/tika") else self.server_url.rstrip("/")
+                    with timed("tika", "version"):
+                        response = self.session.get(f"{base_url}/version", timeout=self.timeout)
+                    response.raise_for_status()
+                    self._tika_version = response.text.strip()
+                    logging.info(f"Tika Client: Versión del servidor Tika: {self._tika_version}")
+        return self._tika_version
+
+    def close(self):
+        """Cierra las conexiones del pool."""
+        self.session.close()
+
+    def _put_streaming(self, pdf_path_obj: Path, html_out_path: Path) -> int:
+        """
+        Envía el PDF al servidor y escribe la respuesta por bloques en un archivo temporal, que se renombra
+        al destino al terminar. Devuelve el número de bytes escritos. Reintenta con backoff exponencial
+        los errores de red y las respuestas de servidor saturado.
+        """
+        tmp_path = html_out_path.with_name(f".{html_out_path.name}.{uuid.uuid4().hex}.tmp")
+        attempt = 0
+        while True:
+            try:
+                with open(pdf_path_obj, 'rb') as f, timed("tika", "put") as timer:
+                    headers = { "Accept": self.ACCEPT_TYPE }
+                    with self.session.put(self.server_url, data=f, headers=headers, stream=True, timeout=self.timeout) as response:
+                        if response.status_code in _RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                            raise requests.exceptions.RetryError(f"El servidor Tika respondió {response.status_code}")
+                        response.raise_for_status()
+                        written = 0
+                        with open(tmp_path, 'wb') as out:
+                            for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+                                out.write(chunk)
+                                written += len(chunk)
+                    timer.add_bytes(f.tell() + written)
+                if written:
+                    os.replace(tmp_path, html_out_path)
+                else:
+                    tmp_path.unlink(missing_ok=True)
+                return written
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError, requests.exceptions.RetryError) as e:
+                tmp_path.unlink(missing_ok=True)
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                record_event("tika", "retries")
+                delay = self.backoff_seconds * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logging.warning(f"Tika Client: Error al convertir {pdf_path_obj.name} (intento {attempt}); se reintenta en {delay:.1f}s. Error: {e}")
+                time.sleep(delay)
+            except Exception:
+                tmp_path.unlink(missing_ok=True)
+                raise
+
+    def convert(self, pdf_path: str, output_dir: str, html_file_name: str | None = None) -> str | None:
+        """
+        Envía un archivo PDF al servidor Tika para su conversión a HTML y guarda la respuesta,
+        escrita por bloques directamente a disco, en un directorio.
 
         :param pdf_path: La ruta al archivo PDF de entrada.
         :param output_dir: El directorio donde se guardará el archivo HTML.
+        :param html_file_name: Nombre del archivo HTML. Por defecto, el nombre del PDF con extensión .html.
         :return: La ruta al archivo HTML generado o None si falla.
         """
         pdf_path_obj = Path(pdf_path)
         output_dir_obj = Path(output_dir)
         output_dir_obj.mkdir(parents=True, exist_ok=True)
 
-        html_file_name = pdf_path_obj.stem + ".html"
+        html_file_name = html_file_name or pdf_path_obj.stem + ".html"
         html_out_path = output_dir_obj / html_file_name
 
-        logging.info(f"Tika Client: Enviando {pdf_path} al servidor Tika en {TikaParser.TIKA_SERVER_URL}")
-        
-        try:
-            with open(pdf_path_obj, 'rb') as f:
-                headers = { "Accept": "text/html" }
-                response = requests.put(TikaParser.TIKA_SERVER_URL, data=f, headers=headers)
-                response.raise_for_status() 
+        cache_key = None
+        if self.cache is not None:
+            try:
+                cache_key = make_conversion_key(hash_file(pdf_path_obj), self.tika_version, self.ACCEPT_TYPE)
+                if self.cache.get(cache_key, html_out_path):
+                    logging.info(f"Tika Client: HTML de {pdf_path} recuperado de la caché en: {html_out_path}")
+                    return str(html_out_path)
+            except Exception as e:
+                # Sin clave de caché (p. ej. /version no responde) se convierte igualmente, sin guardar el resultado.
+                logging.warning(f"Tika Client: No se pudo consultar la caché de conversiones para {pdf_path}: {e}")
+                cache_key = None
 
-            html = response.text
-            if not html:
+        logging.info(f"Tika Client: Enviando {pdf_path} al servidor Tika en {self.server_url}")
+
+        try:
+            written = self._put_streaming(pdf_path_obj, html_out_path)
+            if not written:
                 logging.error("Tika Server no devolvió contenido del PDF.")
                 return None
 
-            html_out_path.write_text(html, encoding="utf-8")
             logging.info(f"Tika Client: HTML recibido y guardado en: {html_out_path}")
+            if cache_key is not None:
+                self.cache.put(cache_key, html_out_path)
             return str(html_out_path)
 
         except requests.exceptions.RequestException as e:
@@ -51,4 +174,65 @@ class TikaParser:
             return None
         except Exception as e:
             logging.error(f"Tika Client: Ocurrió un error inesperado procesando el PDF: {e}", exc_info=True)
-            return None
\ No newline at end of file
+            return None
+
+    def cache_stats(self) -> dict | None:
+        """Devuelve los contadores de la caché de conversiones, o None si no hay caché configurada."""
+        return self.cache.stats() if self.cache is not None else None
+
+    def convert_many(self, pdf_paths: list, output_dir: str, workers: int = 4) -> dict:
+        """
+        Convierte varios PDFs a HTML con `workers` peticiones simultáneas al servidor Tika, reutilizando
+        las conexiones del pool. Cada conversión se reintenta con backoff si el servidor está saturado.
+        Si varios PDFs del lote tienen el mismo nombre (p. ej. en carpetas distintas), sus HTML llevan además
+        un hash de la ruta del PDF, para que ninguno sobrescriba a otro; un mismo PDF se convierte una sola vez.
+
+        :param pdf_paths: Rutas de los PDFs a convertir.
+        :param output_dir: El directorio donde se guardarán los archivos HTML.
+        :param workers: Número máximo de conversiones en paralelo.
+        :return: Un diccionario ruta del PDF -> ruta del HTML generado (o None si falló).
+        """
+        results = {}
+        if not pdf_paths:
+            return results
+        by_file = {}  # Ruta resuelta del PDF -> rutas con que se pidió
+        for pdf_path in pdf_paths:
+            by_file.setdefault(Path(pdf_path).resolve(), []).append(pdf_path)
+        by_stem = {}
+        for resolved in by_file:
+            by_stem.setdefault(os.path.normcase(resolved.stem), []).append(resolved)
+        html_names = {}
+        for group in by_stem.values():
+            for resolved in group:
+                if len(group) == 1:
+                    html_names[resolved] = f"{resolved.stem}.html"
+                else:
+                    path_hash = hashlib.sha256(str(resolved).encode()).hexdigest()[:16]
+                    html_names[resolved] = f"{resolved.stem}_{path_hash}.html"
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(by_file))) as executor:
+            futures = {
+                executor.submit(self.convert, requested[0], output_dir, html_names[resolved]): requested
+                for resolved, requested in by_file.items()
+            }
+            for future in as_completed(futures):
+                html_path = future.result()
+                for pdf_path in futures[future]:
+                    results[pdf_path] = html_path
+        failed = sum(1 for html_path in results.values() if html_path is None)
+        logging.info(f"Tika Client: {len(results) - failed} de {len(results)} PDFs convertidos a HTML.")
+        return results
+
+    @staticmethod
+    def pdf_to_html(pdf_path: str, output_dir: str) -> str | None:
+        """
+        Envía un archivo PDF a un servidor Tika para su conversión a HTML
+        y lo guarda en un directorio. La lógica de negocio no cambia:
+        recibe una ruta de PDF y devuelve una ruta de HTML.
+        Usa una instancia compartida, por lo que las llamadas sucesivas reutilizan la conexión.
+
+        :param pdf_path: La ruta al archivo PDF de entrada.
+        :param output_dir: El directorio donde se guardará el archivo HTML.
+        :return: La ruta al archivo HTML generado o None si falla.
+        """
+        return TikaParser._default().convert(pdf_path, output_dir)
@@ -1,7 +1,205 @@
 # src/py_toolbox/utils/file_handler.py
+import gzip
+import io
+import itertools
 import json
 import logging
+import os
+import uuid
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator
+from .lazy_import import lazy_import
+
+# Backends opcionales: orjson serializa JSON bastante más rápido que json (se usa si se pide con use_orjson);
+# zstandard habilita la compresión zstd.
+orjson = lazy_import("orjson")
+zstandard = lazy_import("zstandard")
+
+_COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.gzip': 'gzip', '.zst': 'zstd', '.zstd': 'zstd'}
+
+
+def _dumps(data, pretty: bool = False, use_orjson: bool = False) -> bytes:
+    """
+    Serializa a JSON (UTF-8). Por defecto usa json, de modo que el resultado no depende de lo que haya
+    instalado. Con use_orjson usa orjson, bastante más rápido pero con su propio formato: indentación de
+    2 espacios, sin espacios tras ',' y ':', y NaN/Infinity escritos como null.
+    """
+    if use_orjson:
+        if orjson is None:
+            raise ImportError("use_orjson requiere el paquete 'orjson' (pip install orjson).")
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, ensure_ascii=False, indent=4 if pretty else None).encode('utf-8')
+
+
+def _iter_json_chunks(data, pretty: bool = False, batch_size: int = 1000) -> Iterator[str]:
+    """
+    Serializa a JSON con json por fragmentos, con el mismo resultado que json.dumps. Los elementos de una
+    lista o dict de primer nivel se serializan en grupos de `batch_size` con el codificador en C (json.dump
+    solo lo usa sin indentación y en una sola llamada; por partes recurre al de Python, varias veces más
+    lento), así que en memoria solo está el texto de un grupo.
+    """
+    indent = 4 if pretty else None
+    if isinstance(data, dict):
+        items, wrap, opening, closing = iter(data.items()), dict, '{', '}'
+    elif isinstance(data, (list, tuple)):
+        items, wrap, opening, closing = iter(data), list, '[', ']'
+    else:
+        yield json.dumps(data, ensure_ascii=False, indent=indent)
+        return
+    # Cada grupo se serializa como un contenedor y se le quitan los delimitadores: así las claves no string
+    # y la indentación del primer nivel quedan exactamente como las escribe json.dumps.
+    strip = 2 if pretty else 1
+    separator = ',\n' if pretty else ', '
+    first = True
+    while True:
+        batch = wrap(itertools.islice(items, batch_size))
+        if not batch:
+            break
+        body = json.dumps(batch, ensure_ascii=False, indent=indent)[strip:-strip]
+        if first:
+            yield f"{opening}\n{body}" if pretty else f"{opening}{body}"
+            first = False
+        else:
+            yield separator + body
+    if first:
+        yield opening + closing
+    else:
+        yield f"\n{closing}" if pretty else closing
+
+
+def _loads(data: bytes | str):
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rechaza NaN e Infinity, que json sí escribe y lee.
+            pass
+    return json.loads(data)
+
+
+def _resolve_compression(file_path: Path, compression: str | None) -> str | None:
+    if compression == 'auto':
+        compression = _COMPRESSION_SUFFIXES.get(file_path.suffix.lower())
+    if compression not in (None, 'gzip', 'zstd'):
+        raise ValueError(f"Compresión no soportada: {compression}. Use None, 'gzip', 'zstd' o 'auto'.")
+    if compression == 'zstd' and zstandard is None:
+        raise ImportError("La compresión zstd requiere el paquete 'zstandard' (pip install zstandard).")
+    return compression
+
+
+def _atomic_write(path_obj: Path, writer: Callable[[BinaryIO], None]):
+    """
+    Llama a `writer` con un archivo temporal abierto en modo binario junto al destino y, si termina sin
+    errores, lo renombra al destino, para no dejar nunca un archivo truncado. `writer` puede escribir el
+    contenido por partes, sin tenerlo completo en memoria.
+    """
+    path_obj.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path_obj.with_name(f".{path_obj.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            writer(f)
+        os.replace(tmp_path, path_obj)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class JsonLinesWriter:
+    """
+    Escribe registros en formato JSON Lines (un objeto JSON por línea) a medida que llegan, con escritura
+    en búfer y compresión gzip/zstd opcional. Se escribe a un archivo temporal que solo se renombra al
+    destino al cerrar sin errores. Se usa como gestor de contexto:
+
+        with JsonLinesWriter("salida.jsonl.gz") as writer:
+            writer.write_many(registros)
+    """
+    def __init__(self, file_path: str | Path, compression: str | None = 'auto', buffer_size: int = 1024 * 1024,
+                 compression_level: int | None = None, use_orjson: bool = False):
+        """
+        :param file_path: Ruta del archivo de salida.
+        :param compression: None, 'gzip', 'zstd' o 'auto' (según la extensión: .gz o .zst).
+        :param buffer_size: Bytes acumulados en memoria antes de cada escritura al archivo.
+        :param compression_level: Nivel de compresión. Por defecto, 6 para gzip y 3 para zstd.
+        :param use_orjson: Serializa con orjson (más rápido; NaN/Infinity se escriben como null).
+        """
+        if use_orjson and orjson is None:
+            raise ImportError("use_orjson requiere el paquete 'orjson' (pip install orjson).")
+        self.path = Path(file_path)
+        self.compression = _resolve_compression(self.path, compression)
+        self.buffer_size = buffer_size
+        self.use_orjson = use_orjson
+        self.records_written = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.tmp")
+        self._raw = open(self._tmp_path, 'wb')
+        if self.compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=compression_level or 6)
+        elif self.compression == 'zstd':
+            self._stream = zstandard.ZstdCompressor(level=compression_level or 3).stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+        self._buffer = bytearray()
+        self.closed = False
+
+    def write(self, record):
+        """Añade un registro (cualquier objeto serializable a JSON)."""
+        self._buffer += _dumps(record, use_orjson=self.use_orjson)
+        self._buffer += b"\n"
+        self.records_written += 1
+        if len(self._buffer) >= self.buffer_size:
+            self._flush_buffer()
+
+    def write_many(self, records: Iterable) -> int:
+        """Añade todos los registros de un iterable (que puede ser un generador) y devuelve cuántos se escribieron."""
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def _flush_buffer(self):
+        if self._buffer:
+            self._stream.write(self._buffer)
+            self._buffer = bytearray()
+
+    def close(self):
+        """Escribe lo pendiente, cierra el archivo y lo renombra a su ruta definitiva."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._flush_buffer()
+            if self._stream is not self._raw:
+                self._stream.close()
+            self._raw.close()
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self._raw.close()
+            self._tmp_path.unlink(missing_ok=True)
+            raise
+        logging.info(f"Archivo JSON Lines guardado en: {self.path} ({self.records_written} registros).")
+
+    def abort(self):
+        """Descarta lo escrito sin tocar el archivo de destino."""
+        if self.closed:
+            return
+        self.closed = True
+        self._buffer = bytearray()
+        self._raw.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            logging.error(f"Error al escribir el archivo JSON Lines {self.path}; se descarta el archivo temporal: {exc}")
+            self.abort()
+        return False
+
 
 class FileHandler:
     """
@@ -19,34 +217,90 @@ class FileHandler:
     @staticmethod
     def write_text(file_path: str | Path, content: str, encoding: str = 'utf-8'):
         """
-        Escribe contenido de texto a un archivo.
+        Escribe contenido de texto a un archivo. La escritura es atómica: el archivo se escribe
+        primero con un nombre temporal y luego se renombra.
         """
         try:
-            path_obj = Path(file_path)
-            # Asegurarse de que el directorio padre existe
-            path_obj.parent.mkdir(parents=True, exist_ok=True)
-            path_obj.write_text(content, encoding=encoding)
+            _atomic_write(Path(file_path), lambda f: f.write(content.encode(encoding)))
             logging.info(f"Archivo de texto guardado en: {file_path}")
         except Exception as e:
             logging.error(f"Error al escribir archivo de texto en {file_path}: {e}")
 
     @staticmethod
-    def write_json(file_path: str | Path, data: dict | list, pretty: bool = True, encoding: str = 'utf-8'):
+    def write_json(file_path: str | Path, data: dict | list, pretty: bool = True, encoding: str = 'utf-8',
+                   use_orjson: bool = False):
         """
-        Escribe un diccionario o lista a un archivo JSON.
+        Escribe un diccionario o lista a un archivo JSON. La escritura es atómica (archivo temporal y
+        renombrado), por lo que un fallo nunca deja un archivo truncado.
 
         :param file_path: Ruta del archivo de salida.
         :param data: El objeto de Python (dict o list) a serializar.
-        :param pretty: Si es True, el JSON se guardará con indentación para fácil lectura.
+        :param pretty: Si es True, el JSON se guardará con indentación (4 espacios) para fácil lectura.
+        :param use_orjson: Serializa con orjson, varias veces más rápido en archivos grandes, pero arma el
+                           documento completo en memoria (json lo escribe por partes). El formato cambia:
+                           indentación de 2 espacios y NaN/Infinity escritos como null.
         """
+        def write_orjson(f: BinaryIO):
+            content = _dumps(data, pretty, use_orjson=True)
+            if encoding.lower().replace('-', '') != 'utf8':
+                content = content.decode('utf-8').encode(encoding)
+            f.write(content)
+
+        def write_json_module(f: BinaryIO):
+            # El documento se escribe por fragmentos a medida que se serializa: nunca está completo en memoria.
+            for chunk in _iter_json_chunks(data, pretty):
+                f.write(chunk.encode(encoding))
+
         try:
-            path_obj = Path(file_path)
-            # Asegurarse de que el directorio padre existe
-            path_obj.parent.mkdir(parents=True, exist_ok=True)
-            
-            indent = 4 if pretty else None
-            with open(path_obj, 'w', encoding=encoding) as f:
-                json.dump(data, f, ensure_ascii=False, indent=indent)
+            _atomic_write(Path(file_path), write_orjson if use_orjson else write_json_module)
             logging.info(f"Archivo JSON guardado en: {file_path}")
         except Exception as e:
-            logging.error(f"Error al escribir archivo JSON en {file_path}: {e}")
\ No newline at end of file
+            logging.error(f"Error al escribir archivo JSON en {file_path}: {e}")
+
+    @staticmethod
+    def read_json(file_path: str | Path):
+        """
+        Lee un archivo JSON, con orjson si está instalado (y json si el archivo contiene NaN o Infinity).
+
+        :param file_path: Ruta del archivo.
+        :return: El objeto deserializado.
+        """
+        return _loads(Path(file_path).read_bytes())
+
+    @staticmethod
+    def write_json_lines(file_path: str | Path, records: Iterable, compression: str | None = 'auto',
+                         use_orjson: bool = False) -> int:
+        """
+        Escribe los registros de un iterable en formato JSON Lines, sin materializarlos en una lista.
+
+        :param file_path: Ruta del archivo de salida.
+        :param records: Iterable (o generador) de objetos serializables a JSON.
+        :param compression: None, 'gzip', 'zstd' o 'auto' (según la extensión: .gz o .zst).
+        :param use_orjson: Serializa con orjson (más rápido; NaN/Infinity se escriben como null).
+        :return: Número de registros escritos.
+        """
+        with JsonLinesWriter(file_path, compression=compression, use_orjson=use_orjson) as writer:
+            return writer.write_many(records)
+
+    @staticmethod
+    def iter_json_lines(file_path: str | Path, compression: str | None = 'auto') -> Iterator:
+        """
+        Lee un archivo JSON Lines (opcionalmente comprimido con gzip o zstd) registro a registro.
+
+        :param file_path: Ruta del archivo.
+        :param compression: None, 'gzip', 'zstd' o 'auto' (según la extensión: .gz o .zst).
+        :return: Un generador de los objetos deserializados; las líneas vacías se ignoran.
+        """
+        path_obj = Path(file_path)
+        compression = _resolve_compression(path_obj, compression)
+        with open(path_obj, 'rb') as raw:
+            if compression == 'gzip':
+                stream = gzip.GzipFile(fileobj=raw, mode='rb')
+            elif compression == 'zstd':
+                stream = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw))
+            else:
+                stream = raw
+            with stream:
+                for line in stream:
+                    if line.strip():
+                        yield _loads(line)
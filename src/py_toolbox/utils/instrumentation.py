@@ -0,0 +1,323 @@
+# src/py_toolbox/utils/instrumentation.py
+"""
+Capa de instrumentación de las llamadas remotas del toolbox (AWS, Google Drive, Tika).
+
+Cada llamada se mide con `timed(servicio, operación)` y los eventos puntuales (reintentos, limitaciones
+de cuota, consultas de estado) se registran con `record_event`. Los datos se entregan a los hooks
+registrados con `add_hook`; sin hooks, ambas funciones retornan de inmediato sin medir nada.
+
+Uso típico al final de un job:
+
+    metrics = enable_metrics()
+    ...  # trabajo
+    metrics.log_summary()
+"""
+import bisect
+import logging
+import threading
+import time
+
+# Hooks registrados. Es una tupla que se reemplaza entera al cambiar, así los lectores no necesitan lock.
+_hooks = ()
+_hooks_lock = threading.Lock()
+
+# Límites superiores (en segundos) de los buckets del histograma de latencias: de 1 ms a ~17 min, duplicando.
+_LATENCY_BUCKETS = tuple(0.001 * 2 ** exponent for exponent in range(21))
+
+# Códigos de error de AWS que indican limitación de cuota.
+_THROTTLING_ERROR_CODES = {
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottledException",
+    "TooManyRequestsException", "ProvisionedThroughputExceededException", "RequestLimitExceeded",
+    "SlowDown", "ProvisionedThroughputExceeded", "RequestThrottled", "LimitExceededException",
+}
+
+
+class InstrumentationHook:
+    """
+    Interfaz de los receptores de métricas. Las subclases sobrescriben los métodos que les interesen
+    (por ejemplo, para reenviar las medidas como spans de OpenTelemetry). Los métodos se llaman desde
+    el hilo que hizo la llamada, así que deben ser rápidos y thread-safe.
+    """
+    def on_call(self, service: str, operation: str, seconds: float, nbytes: int = 0, error: str | None = None):
+        """Una llamada remota terminó, con su duración, los bytes transferidos y el error, si lo hubo."""
+
+    def on_event(self, service: str, name: str, count: int = 1):
+        """Ocurrió un evento contable: 'retries', 'throttles', 'polls'..."""
+
+
+def add_hook(hook: InstrumentationHook) -> InstrumentationHook:
+    """Registra un hook para todas las llamadas instrumentadas del proceso y lo devuelve."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+    return hook
+
+
+def remove_hook(hook: InstrumentationHook):
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+def clear_hooks():
+    global _hooks
+    with _hooks_lock:
+        _hooks = ()
+
+
+def is_enabled() -> bool:
+    return bool(_hooks)
+
+
+def _emit_call(service: str, operation: str, seconds: float, nbytes: int, error: str | None):
+    for hook in _hooks:
+        try:
+            hook.on_call(service, operation, seconds, nbytes, error)
+        except Exception as e:
+            logging.warning(f"Error en el hook de instrumentación {hook!r}: {e}")
+
+
+def record_event(service: str, name: str, count: int = 1):
+    """Registra un evento contable (reintento, limitación de cuota, consulta de estado...)."""
+    if not _hooks:
+        return
+    for hook in _hooks:
+        try:
+            hook.on_event(service, name, count)
+        except Exception as e:
+            logging.warning(f"Error en el hook de instrumentación {hook!r}: {e}")
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def add_bytes(self, nbytes: int):
+        pass
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class _Timer:
+    __slots__ = ("service", "operation", "nbytes", "_start")
+
+    def __init__(self, service: str, operation: str):
+        self.service = service
+        self.operation = operation
+        self.nbytes = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        _emit_call(self.service, self.operation, seconds, self.nbytes, exc_type.__name__ if exc_type else None)
+        return False
+
+    def add_bytes(self, nbytes: int):
+        self.nbytes += nbytes
+
+
+def timed(service: str, operation: str):
+    """
+    Gestor de contexto que mide una llamada remota y la notifica a los hooks al salir (con el nombre de
+    la excepción, si la hubo). Los bytes transferidos se suman con `add_bytes`. Sin hooks registrados
+    devuelve un objeto compartido que no hace nada.
+
+        with timed("tika", "put") as timer:
+            ...
+            timer.add_bytes(len(data))
+    """
+    if not _hooks:
+        return _NOOP_TIMER
+    return _Timer(service, operation)
+
+
+def _body_size(body) -> int:
+    if body is None:
+        return 0
+    try:
+        return len(body)
+    except TypeError:
+        pass
+    try:
+        # Cuerpos tipo archivo (BytesIO, archivos abiertos): bytes que quedan desde la posición actual.
+        position = body.tell()
+        end = body.seek(0, 2)
+        body.seek(position)
+        return end - position
+    except Exception:
+        return 0
+
+
+def _before_call(model, params, context, **kwargs):
+    if _hooks:
+        context["instrumentation"] = (
+            model.service_model.endpoint_prefix, model.name, time.perf_counter(), _body_size(params.get("body")),
+        )
+
+
+def _after_call(http_response, parsed, context, **kwargs):
+    started = context.pop("instrumentation", None)
+    if started is None or not _hooks:
+        return
+    service, operation, start, sent = started
+    received = int(http_response.headers.get("content-length") or 0) if http_response is not None else 0
+    error = parsed.get("Error", {}).get("Code") if isinstance(parsed, dict) and "Error" in parsed else None
+    _emit_call(service, operation, time.perf_counter() - start, sent + received, error)
+    retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts") if isinstance(parsed, dict) else None
+    if retries:
+        record_event(service, "retries", retries)
+
+
+def _after_call_error(exception, context, **kwargs):
+    started = context.pop("instrumentation", None)
+    if started is None or not _hooks:
+        return
+    service, operation, start, _ = started
+    _emit_call(service, operation, time.perf_counter() - start, 0, type(exception).__name__)
+
+
+def _response_received(parsed_response, context, **kwargs):
+    # Se emite en cada intento, incluidos los que botocore reintenta.
+    if not _hooks or not isinstance(parsed_response, dict) or "instrumentation" not in context:
+        return
+    if parsed_response.get("Error", {}).get("Code") in _THROTTLING_ERROR_CODES:
+        record_event(context["instrumentation"][0], "throttles")
+
+
+def instrument_client(client):
+    """
+    Conecta un cliente de boto3 a la instrumentación mediante su sistema de eventos: cada llamada a la API
+    (con sus reintentos) se mide y se notifica como (servicio, operación), y cada intento rechazado por
+    limitación de cuota cuenta como 'throttles'. Mientras no haya hooks el coste es una comprobación por llamada.
+    """
+    events = client.meta.events
+    events.register("before-call", _before_call, unique_id="py_toolbox-instrumentation-before-call")
+    events.register("after-call", _after_call, unique_id="py_toolbox-instrumentation-after-call")
+    events.register("after-call-error", _after_call_error, unique_id="py_toolbox-instrumentation-after-call-error")
+    events.register("response-received", _response_received, unique_id="py_toolbox-instrumentation-response-received")
+    return client
+
+
+class _OperationStats:
+    __slots__ = ("count", "errors", "total_seconds", "min_seconds", "max_seconds", "nbytes", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.min_seconds = float("inf")
+        self.max_seconds = 0.0
+        self.nbytes = 0
+        self.buckets = [0] * (len(_LATENCY_BUCKETS) + 1)
+
+    def percentile(self, fraction: float) -> float:
+        """Estimación del percentil: el límite superior del bucket que lo contiene (acotado por el máximo)."""
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                upper = _LATENCY_BUCKETS[index] if index < len(_LATENCY_BUCKETS) else self.max_seconds
+                return min(upper, self.max_seconds)
+        return self.max_seconds
+
+
+class MetricsAggregator(InstrumentationHook):
+    """
+    Hook que acumula en memoria, por (servicio, operación), el número de llamadas y errores, un
+    histograma de latencias y los bytes transferidos, además de los contadores de eventos por servicio.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations = {}  # (servicio, operación) -> _OperationStats
+        self._events = {}  # (servicio, evento) -> contador
+        self.started_at = time.monotonic()
+
+    def on_call(self, service: str, operation: str, seconds: float, nbytes: int = 0, error: str | None = None):
+        bucket = bisect.bisect_left(_LATENCY_BUCKETS, seconds)
+        with self._lock:
+            stats = self._operations.get((service, operation))
+            if stats is None:
+                stats = self._operations[(service, operation)] = _OperationStats()
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.min_seconds = min(stats.min_seconds, seconds)
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.nbytes += nbytes
+            stats.buckets[bucket] += 1
+            if error is not None:
+                stats.errors += 1
+
+    def on_event(self, service: str, name: str, count: int = 1):
+        with self._lock:
+            self._events[(service, name)] = self._events.get((service, name), 0) + count
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+            self._events.clear()
+            self.started_at = time.monotonic()
+
+    def summary(self) -> dict:
+        """
+        Devuelve las métricas acumuladas: 'operations' (lista ordenada por tiempo total, con count, errors,
+        total_seconds, mean/p50/p95/p99/max en segundos y bytes), 'events' ({servicio: {evento: n}}) y
+        'elapsed_seconds' desde la creación o el último reset.
+        """
+        with self._lock:
+            operations = []
+            for (service, operation), stats in self._operations.items():
+                operations.append({
+                    "service": service,
+                    "operation": operation,
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "total_seconds": stats.total_seconds,
+                    "mean_seconds": stats.total_seconds / stats.count,
+                    "p50_seconds": stats.percentile(0.50),
+                    "p95_seconds": stats.percentile(0.95),
+                    "p99_seconds": stats.percentile(0.99),
+                    "max_seconds": stats.max_seconds,
+                    "bytes": stats.nbytes,
+                })
+            events = {}
+            for (service, name), count in self._events.items():
+                events.setdefault(service, {})[name] = count
+        operations.sort(key=lambda row: row["total_seconds"], reverse=True)
+        return {"operations": operations, "events": events, "elapsed_seconds": time.monotonic() - self.started_at}
+
+    def format_summary(self) -> str:
+        """Devuelve el resumen como una tabla de texto."""
+        summary = self.summary()
+        lines = [
+            f"{'servicio':<16}{'operación':<32}{'llamadas':>9}{'errores':>8}{'total s':>10}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'MB':>10}"
+        ]
+        for row in summary["operations"]:
+            lines.append(
+                f"{row['service']:<16}{row['operation'][:31]:<32}{row['count']:>9}{row['errors']:>8}"
+                f"{row['total_seconds']:>10.2f}{row['p50_seconds'] * 1000:>9.1f}{row['p95_seconds'] * 1000:>9.1f}"
+                f"{row['p99_seconds'] * 1000:>9.1f}{row['bytes'] / (1024 * 1024):>10.1f}"
+            )
+        for service, events in sorted(summary["events"].items()):
+            lines.append(f"{service}: " + ", ".join(f"{name}={count}" for name, count in sorted(events.items())))
+        lines.append(f"Tiempo transcurrido: {summary['elapsed_seconds']:.1f}s")
+        return "\n".join(lines)
+
+    def log_summary(self):
+        """Escribe el resumen en el log (nivel INFO)."""
+        logging.info("Resumen de instrumentación de llamadas remotas:\n" + self.format_summary())
+
+
+def enable_metrics() -> MetricsAggregator:
+    """Crea un MetricsAggregator, lo registra como hook y lo devuelve."""
+    return add_hook(MetricsAggregator())
@@ -0,0 +1,57 @@
+# src/py_toolbox/utils/lazy_import.py
+import importlib
+import importlib.util
+import sys
+import threading
+
+
+class _LazyModule:
+    """
+    Representa a un módulo que se importa en el primer acceso a uno de sus atributos. La importación
+    la hace el sistema normal de imports bajo un lock propio, así que varios hilos que lo usen por
+    primera vez a la vez esperan a que termine y nunca ven un módulo a medio inicializar. El módulo
+    no se registra en sys.modules hasta que su importación termina.
+    """
+    def __init__(self, module_name: str):
+        self.__dict__["_module_name"] = module_name
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_module_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value):
+        setattr(self._load(), name, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "cargado" if self.__dict__["_module"] is not None else "diferido"
+        return f"<módulo {self.__dict__['_module_name']!r} ({state})>"
+
+
+def lazy_import(module_name: str):
+    """
+    Devuelve un módulo cuya importación se difiere hasta el primer acceso a uno de sus atributos,
+    o None si el módulo no está instalado. Permite que importar py_toolbox no cargue librerías
+    pesadas (pandas, pyarrow...) que la tarea quizá nunca use. El primer acceso es thread-safe.
+
+    :param module_name: Nombre del módulo a importar (ej. 'pandas').
+    :return: El módulo (o su representante diferido) o None si no se encuentra.
+    """
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    if importlib.util.find_spec(module_name) is None:
+        return None
+    return _LazyModule(module_name)